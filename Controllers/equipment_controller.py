@@ -1,12 +1,269 @@
+import csv
+import hashlib
+import io
+import json
 import logging
-from typing import Dict, List, Union
+from contextlib import closing
+from typing import Dict, Iterator, List, Union
 import cherrypy
 from Services.equipment_service import EquipmentService
 from Utils.decorators import log_and_handle_errors 
+from Utils.metrics import REGISTRY, CONTENT_TYPE
 
 logger = logging.getLogger(__name__)
 
 
+FILTER_KEYS = ("type_id", "serial_number", "note")
+# Максимальное количество ID в одном пакетном запросе
+MAX_BATCH_IDS = 10000
+
+
+def _extract_filters(params: Dict[str, str]) -> Dict[str, str]:
+    """
+    Формирует фильтры списка оборудования из query-параметров.
+    """
+    return {key: params[key] for key in FILTER_KEYS if params.get(key) is not None}
+
+
+def _list_etag(*parts) -> str:
+    """
+    Формирует ETag списка по версии данных и параметрам запроса.
+    """
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def _check_etag(etag: str):
+    """
+    Устанавливает ETag ответа. Если он совпадает с If-None-Match, запрос
+    завершается ответом 304 Not Modified без формирования тела.
+    """
+    cherrypy.response.headers['ETag'] = etag
+    if cherrypy.request.method not in ("GET", "HEAD"):
+        return
+    # Слабое сравнение (RFC 7232): сжатые ответы отдают ETag с префиксом W/
+    conditions = [str(element) for element in cherrypy.request.headers.elements('If-None-Match')]
+    if "*" in conditions or etag in (condition[2:] if condition.startswith("W/") else condition for condition in conditions):
+        raise cherrypy.HTTPRedirect([], 304)
+
+
+def _parse_positive_int(name: str, value) -> int:
+    """
+    Разбирает положительное целое число из query-параметра (page, limit).
+    """
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        parsed = 0
+    if parsed < 1:
+        raise cherrypy.HTTPError(400, f"{name} must be a positive integer.")
+    return parsed
+
+
+def _parse_ids(ids: Union[str, List]) -> List[int]:
+    """
+    Разбирает список ID из строки "1,2,3" или JSON-массива.
+    """
+    if isinstance(ids, str):
+        ids = [part for part in ids.split(",") if part.strip()]
+    if not isinstance(ids, list) or not ids:
+        raise cherrypy.HTTPError(400, "ids must be a non-empty list of integers.")
+    try:
+        parsed = [int(value) for value in ids]
+    except (TypeError, ValueError):
+        raise cherrypy.HTTPError(400, "ids must be a non-empty list of integers.")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise cherrypy.HTTPError(400, f"No more than {MAX_BATCH_IDS} ids are allowed per request.")
+    return parsed
+
+
+@cherrypy.expose
+class EquipmentExportController:
+    """
+    Потоковая выгрузка таблицы оборудования в NDJSON или CSV.
+    Ответ передаётся чанками (response.stream), поэтому первый байт уходит сразу,
+    а потребление памяти не зависит от размера таблицы.
+    """
+
+    _cp_config = {
+        'response.stream': True,
+        'tools.json_in.on': False,
+        'tools.json_out.on': False,
+    }
+
+    CONTENT_TYPES = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv; charset=utf-8",
+    }
+
+    def __init__(self, service: EquipmentService):
+        self.service = service
+
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling GET equipment export request")
+    def GET(self, format: str = "ndjson", batch_size: int = 1000, **kwargs):
+        """
+        GET /api/equipment/export?format=ndjson|csv - Выгрузка всего оборудования.
+        Поддерживает фильтры type_id, serial_number, note.
+        """
+        if format not in self.CONTENT_TYPES:
+            raise cherrypy.HTTPError(400, f"Unsupported export format '{format}'. Use ndjson or csv.")
+        cherrypy.response.headers['Content-Type'] = self.CONTENT_TYPES[format]
+        cherrypy.response.headers['Content-Disposition'] = f'attachment; filename="equipment.{format}"'
+        batches = self.service.stream_equipment(_extract_filters(kwargs), int(batch_size))
+        if format == "csv":
+            return self._render_csv(batches)
+        return self._render_ndjson(batches)
+
+    def _render_ndjson(self, batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+        fields = self.service.EXPORT_FIELDS
+        # Пустая строка (её пропускает и импорт) отправляет заголовки ответа
+        # до первой пачки из базы данных, как заголовок CSV
+        yield b"\n"
+        # При отключении клиента выгрузка закрывается сразу, а не при сборке мусора
+        with closing(batches):
+            for rows in batches:
+                yield "".join(
+                    json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in rows
+                ).encode("utf-8")
+
+    def _render_csv(self, batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.service.EXPORT_FIELDS)
+        # Заголовок отправляется до первого запроса к базе данных
+        yield buffer.getvalue().encode("utf-8")
+        with closing(batches):
+            for rows in batches:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue().encode("utf-8")
+
+
+@cherrypy.expose
+class EquipmentImportController:
+    """
+    Потоковый импорт оборудования из NDJSON.
+    Тело запроса читается построчно без буферизации целиком, записи вставляются
+    пачками с фиксацией каждой пачки, а отчёт по пачкам возвращается в виде NDJSON.
+    """
+
+    _cp_config = {
+        'request.process_request_body': False,
+        'response.stream': True,
+        'tools.json_in.on': False,
+        'tools.json_out.on': False,
+    }
+
+    READ_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, service: EquipmentService):
+        self.service = service
+
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling POST equipment import request")
+    def POST(self, chunk_size: int = 1000, **kwargs):
+        """
+        POST /api/equipment/import?chunk_size=N - Импорт оборудования из NDJSON.
+        """
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise cherrypy.HTTPError(400, "chunk_size must be greater than 0.")
+        lines = self._read_lines(cherrypy.request.rfile)
+        cherrypy.response.headers['Content-Type'] = "application/x-ndjson"
+        reports = self.service.import_equipment_stream(lines, chunk_size)
+        return (json.dumps(report, ensure_ascii=False).encode("utf-8") + b"\n" for report in reports)
+
+    def _read_lines(self, rfile) -> Iterator[bytes]:
+        """
+        Разбивает тело запроса на строки, читая его блоками.
+        readline() у ChunkedRFile cheroot не продвигается дальше перевода строки,
+        поэтому строки выделяются здесь для обоих видов тела (Content-Length и chunked).
+        """
+        pending = b""
+        while True:
+            block = rfile.read(self.READ_BLOCK_SIZE)
+            if not block:
+                break
+            pending += block
+            *lines, pending = pending.split(b"\n")
+            yield from lines
+        if pending:
+            yield pending
+
+
+@cherrypy.expose
+class EquipmentBatchController:
+    """
+    Получение оборудования по списку ID, не помещающемуся в query-строку.
+    """
+
+    def __init__(self, service: EquipmentService):
+        self.service = service
+
+    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling POST equipment batch request")
+    def POST(self, **kwargs):
+        """
+        POST /api/equipment/batch - Получение оборудования по списку ID.
+        Тело запроса: {"ids": [ID, ...]}. Ответ — записи в порядке запроса,
+        для отсутствующих ID — {"id": ID, "not_found": true}.
+        """
+        input_data = cherrypy.request.json
+        ids = input_data.get("ids") if isinstance(input_data, dict) else None
+        return self.service.get_equipment_by_ids(_parse_ids(ids))
+
+
+@cherrypy.expose
+class MetricsController:
+    """
+    Метрики в текстовом формате Prometheus: длительность запросов по методам
+    контроллера, длительность и число строк запросов к БД по отпечатку SQL,
+    состояние пулов соединений.
+    """
+
+    _cp_config = {
+        'tools.json_in.on': False,
+        'tools.json_out.on': False,
+    }
+
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling GET metrics request")
+    def GET(self, **kwargs) -> str:
+        """
+        GET /api/metrics - Все метрики реестра.
+        """
+        cherrypy.response.headers['Content-Type'] = CONTENT_TYPE
+        return REGISTRY.render()
+
+
+@cherrypy.expose
+class EquipmentBulkDeleteController:
+    """
+    Пакетное мягкое удаление оборудования.
+    """
+
+    def __init__(self, service: EquipmentService):
+        self.service = service
+
+    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling POST equipment bulk delete request")
+    def POST(self, **kwargs):
+        """
+        POST /api/equipment/bulk_delete - Мягкое удаление списка оборудования.
+        Тело запроса: {"ids": [ID, ...]}. Возвращает результат по каждому ID.
+        """
+        try:
+            return self.service.bulk_soft_delete_equipment(cherrypy.request.json)
+        except ValueError as e:
+            raise cherrypy.HTTPError(400, str(e))
+
+
 @cherrypy.expose
 class EquipmentController:
     """
@@ -14,25 +271,60 @@ class EquipmentController:
     Использует MethodDispatcher для маршрутизации HTTP-методов.
     """
 
-    def __init__(self, config):
-        self.service = EquipmentService(config)
+    def __init__(self, config, pool_config=None, replica_configs=None):
+        self.service = EquipmentService(config, pool_config=pool_config, replica_configs=replica_configs)
+        self.export = EquipmentExportController(self.service)
+        # "import" — ключевое слово Python, поэтому атрибут задаётся через setattr
+        setattr(self, "import", EquipmentImportController(self.service))
+        self.bulk_delete = EquipmentBulkDeleteController(self.service)
+        self.batch = EquipmentBatchController(self.service)
+        self.metrics = MetricsController()
 
     @cherrypy.tools.json_out()
     @cherrypy.tools.auth()
     @log_and_handle_errors("Handling GET equipment request")
-    def GET(self, id: int = None, page: int = 1, limit: int = 10, **kwargs):
+    def GET(
+        self, id: int = None, page: int = 1, limit: int = 10, cursor: str = None, ids: str = None,
+        with_total: str = None, **kwargs
+    ):
         """
         Получение списка оборудования или конкретной записи по ID.
+        При передаче cursor (пустого для первой страницы) используется keyset-пагинация,
+        ответ содержит items и next_cursor.
+        При передаче ids=1,2,3 возвращаются записи в порядке запроса с маркерами not_found.
+        При with_total=1 ответ списка содержит total и total_exact (False, если количество
+        для текстовых фильтров взято из кэша и может быть приблизительным).
         """
         if id:
-            return self.service.get_equipment_by_id(int(id))
+            equipment = self.service.get_equipment_by_id(int(id))
+            if equipment:
+                _check_etag(f'"equipment-{equipment["id"]}-{equipment.get("version")}"')
+            return equipment
+        if ids is not None:
+            return self.service.get_equipment_by_ids(_parse_ids(ids))
         # Формируем фильтры из query-параметров
-        filters = {}
-        for key in ("type_id", "serial_number", "note"):
-            value = kwargs.get(key)
-            if value is not None:
-                filters[key] = value
-        return self.service.get_all_equipment(int(page), int(limit), filters)
+        filters = _extract_filters(kwargs)
+        include_total = str(with_total).lower() in ("1", "true")
+        page, limit = _parse_positive_int("page", page), _parse_positive_int("limit", limit)
+        # Версия и страница читаются с одного пула: иначе ETag мог бы описывать
+        # данные другой (более или менее отстающей) реплики
+        with self.service.pinned_reads():
+            _check_etag(_list_etag(
+                "equipment", self.service.get_equipment_list_version(filters), page, limit, cursor, filters, include_total
+            ))
+            if cursor is not None:
+                try:
+                    result = self.service.get_equipment_by_cursor(cursor, limit, filters)
+                except ValueError:
+                    raise cherrypy.HTTPError(400, "Invalid pagination cursor")
+            else:
+                result = self.service.get_all_equipment(page, limit, filters)
+        if not include_total:
+            return result
+        total, exact = self.service.get_equipment_total(filters)
+        if cursor is None:
+            result = {"items": result}
+        return {**result, "total": total, "total_exact": exact}
 
     @cherrypy.tools.json_in()
     @cherrypy.tools.json_out()
@@ -64,6 +356,21 @@ class EquipmentController:
             raise cherrypy.HTTPError(400, message)
         return {"success": success, "message": message}
 
+    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.auth()
+    @log_and_handle_errors("Handling PATCH equipment request")
+    def PATCH(self, **kwargs):
+        """
+        PATCH /api/equipment - Пакетное обновление оборудования.
+        Тело запроса: [{"id": ID, "fields": {"type_id", "serial_number", "note"}}, ...].
+        Возвращает результат по каждому ID.
+        """
+        try:
+            return self.service.bulk_update_equipment(cherrypy.request.json)
+        except ValueError as e:
+            raise cherrypy.HTTPError(400, str(e))
+
     @cherrypy.tools.json_out()
     @cherrypy.tools.auth()
     @log_and_handle_errors("Handling DELETE equipment request")
@@ -82,10 +389,27 @@ class EquipmentController:
     @cherrypy.tools.json_out()
     @cherrypy.tools.allow(methods=['GET'])
     @log_and_handle_errors("Handling GET equipment types request")
-    def equipment_type(self, page: int = 1, limit: int = 10, **kwargs) -> List[Dict[str, Union[int, str]]]:
+    def equipment_type(self, page: int = 1, limit: int = 10, cursor: str = None, **kwargs) -> List[Dict[str, Union[int, str]]]:
         """
         GET /api/equipment-type - Получение списка типов оборудования.
+        При передаче cursor используется keyset-пагинация.
         """
-        return self.service.get_all_equipment_types(int(page), int(limit))
-
+        page, limit = _parse_positive_int("page", page), _parse_positive_int("limit", limit)
+        with self.service.pinned_reads():
+            _check_etag(_list_etag("equipment_type", self.service.get_equipment_types_version(), page, limit, cursor))
+            if cursor is not None:
+                try:
+                    return self.service.get_equipment_types_by_cursor(cursor, limit)
+                except ValueError:
+                    raise cherrypy.HTTPError(400, "Invalid pagination cursor")
+            return self.service.get_all_equipment_types(page, limit)
 
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.allow(methods=['GET'])
+    @log_and_handle_errors("Handling GET cache stats request")
+    def cache_stats(self, **kwargs) -> Dict[str, int]:
+        """
+        GET /api/cache_stats - Счётчики кэша записей оборудования (hits, misses, evictions).
+        """
+        return self.service.get_cache_stats()
@@ -0,0 +1,299 @@
+import mysql.connector
+from mysql.connector import errors
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import os
+import re
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqlite_schema.sql")
+
+
+class DatabaseBackend:
+    """
+    Интерфейс бэкенда хранения: создание соединений и диалект SQL.
+
+    Соединения бэкенда поддерживают подмножество API mysql.connector, которое
+    используют ConnectionPoolManager, TransactionManager, QueryExecutor и сервисы:
+    cursor(dictionary=..., buffered=..., prepared=...), start_transaction(), commit(),
+    rollback(), in_transaction, ping() и close(). Ошибки выбрасываются как
+    mysql.connector.Error, поэтому обработка ошибок не зависит от бэкенда.
+    """
+
+    name = ""
+    # Ключи конфигурации, обязательные для подключения
+    required_keys: Tuple[str, ...] = ()
+
+    def validate_config(self, config: Dict[str, Any]):
+        """
+        Проверяет параметры подключения.
+
+        :param config: Параметры подключения.
+        :raises ValueError: Если отсутствует обязательный параметр.
+        """
+        for key in self.required_keys:
+            if key not in config:
+                raise ValueError(f"Missing required database configuration key: {key}")
+
+    def connect(self, config: Dict[str, Any]):
+        """
+        Открывает новое соединение.
+
+        :param config: Параметры подключения (без ключа backend).
+        :return: Соединение с API mysql.connector.
+        """
+        raise NotImplementedError
+
+    def translate(self, query: str) -> str:
+        """
+        Переводит запрос из диалекта MySQL (плейсхолдеры %s, FOR UPDATE, INSERT IGNORE)
+        в диалект бэкенда.
+
+        :param query: SQL-запрос в диалекте MySQL.
+        :return: SQL-запрос для бэкенда.
+        """
+        return query
+
+
+class MySQLBackend(DatabaseBackend):
+    """
+    Бэкенд MySQL через mysql.connector. Запросы выполняются без изменений.
+    """
+
+    name = "mysql"
+    required_keys = ("user", "password", "host", "database")
+
+    def connect(self, config: Dict[str, Any]):
+        return mysql.connector.connect(**config)
+
+
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r"^(\s*)INSERT\s+IGNORE\b", re.IGNORECASE)
+_ON_DUPLICATE_KEY = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+
+# Соответствие исключений sqlite3 классам mysql.connector.errors
+_SQLITE_ERRORS = (
+    (sqlite3.IntegrityError, errors.IntegrityError),
+    (sqlite3.OperationalError, errors.OperationalError),
+    (sqlite3.ProgrammingError, errors.ProgrammingError),
+    (sqlite3.DataError, errors.DataError),
+    (sqlite3.NotSupportedError, errors.NotSupportedError),
+    (sqlite3.InterfaceError, errors.InterfaceError),
+)
+
+
+def _mysql_error(error: sqlite3.Error) -> errors.Error:
+    for sqlite_error, mysql_error in _SQLITE_ERRORS:
+        if isinstance(error, sqlite_error):
+            return mysql_error(msg=str(error))
+    return errors.DatabaseError(msg=str(error))
+
+
+@lru_cache(maxsize=1024)
+def translate_to_sqlite(query: str) -> str:
+    """
+    Переводит запрос из диалекта MySQL в диалект SQLite.
+
+    - %s заменяется на ?;
+    - FOR UPDATE удаляется: запись в SQLite сериализуется блокировкой базы,
+      которую транзакция берёт при BEGIN IMMEDIATE;
+    - INSERT IGNORE заменяется на INSERT OR IGNORE;
+    - ON DUPLICATE KEY UPDATE col = VALUES(col) заменяется на
+      ON CONFLICT DO UPDATE SET col = excluded.col.
+
+    :param query: SQL-запрос в диалекте MySQL.
+    :return: SQL-запрос для SQLite.
+    """
+    query = _FOR_UPDATE.sub("", query)
+    query = _INSERT_IGNORE.sub(r"\1INSERT OR IGNORE", query)
+    upsert = _ON_DUPLICATE_KEY.search(query)
+    if upsert:
+        assignments = _VALUES_FUNCTION.sub(r"excluded.\1", query[upsert.end():])
+        query = query[:upsert.start()] + "ON CONFLICT DO UPDATE SET" + assignments
+    return query.replace("%s", "?")
+
+
+class SQLiteCursor:
+    """
+    Курсор SQLite с API курсора mysql.connector: перевод запросов,
+    строки-словари (dictionary=True), поддержка with и with_rows.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        if dictionary:
+            cursor.row_factory = lambda raw, row: {column[0]: value for column, value in zip(raw.description, row)}
+
+    def __enter__(self) -> "SQLiteCursor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None):
+        try:
+            self._cursor.execute(translate_to_sqlite(query), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def executemany(self, query: str, seq_params: Sequence[Sequence[Any]]):
+        try:
+            self._cursor.executemany(translate_to_sqlite(query), [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def fetchone(self) -> Optional[Union[Tuple, Dict[str, Any]]]:
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = 1) -> List[Union[Tuple, Dict[str, Any]]]:
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self) -> List[Union[Tuple, Dict[str, Any]]]:
+        return self._cursor.fetchall()
+
+    @property
+    def with_rows(self) -> bool:
+        return self._cursor.description is not None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Соединение SQLite с API соединения mysql.connector.
+    Транзакции управляются явно (isolation_level=None): start_transaction()
+    выполняет BEGIN IMMEDIATE, вне транзакции запросы выполняются в режиме autocommit.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, dictionary: bool = False, buffered: Optional[bool] = None, prepared: bool = False) -> SQLiteCursor:
+        # Разобранные операторы SQLite кэширует сам (cached_statements), поэтому prepared не требуется
+        return SQLiteCursor(self._connection.cursor(), dictionary=dictionary)
+
+    def start_transaction(self):
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+
+    def commit(self):
+        try:
+            self._connection.commit()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def rollback(self):
+        try:
+            self._connection.rollback()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def ping(self, reconnect: bool = False):
+        try:
+            self._connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def close(self):
+        try:
+            self._connection.close()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    Встроенный бэкенд SQLite: база в локальном файле (параметр database), без сервера БД.
+    Файл открывается в режиме WAL, поэтому чтения не блокируются записью.
+    При первом подключении к файлу создаётся схема (Database/sqlite_schema.sql).
+    """
+
+    name = "sqlite"
+    required_keys = ("database",)
+
+    def __init__(self, schema_path: str = SQLITE_SCHEMA_PATH):
+        self.schema_path = schema_path
+        self._initialized: set = set()
+        self._lock = threading.Lock()
+
+    def connect(self, config: Dict[str, Any]) -> SQLiteConnection:
+        database = config["database"]
+        try:
+            connection = sqlite3.connect(
+                database,
+                timeout=float(config.get("connection_timeout", 10)),
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._ensure_schema(database, connection)
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        return SQLiteConnection(connection)
+
+    def _ensure_schema(self, database: str, connection: sqlite3.Connection):
+        with self._lock:
+            if database in self._initialized:
+                return
+            with open(self.schema_path, "r", encoding="utf-8") as file:
+                connection.executescript(file.read())
+            self._initialized.add(database)
+            logger.info(f"SQLite schema ensured for database {database}.")
+
+    def translate(self, query: str) -> str:
+        return translate_to_sqlite(query)
+
+
+BACKENDS = {
+    MySQLBackend.name: MySQLBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+_instances: Dict[str, DatabaseBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None) -> DatabaseBackend:
+    """
+    Возвращает бэкенд хранения по имени (один экземпляр на процесс).
+
+    :param name: Имя бэкенда: mysql (по умолчанию) или sqlite.
+    :return: Экземпляр DatabaseBackend.
+    """
+    name = name or MySQLBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {name}. Use one of: {', '.join(BACKENDS)}")
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = BACKENDS[name]()
+        return backend
@@ -1,13 +1,106 @@
 import mysql.connector
-from mysql.connector import pooling
-from typing import Union, Optional
+from mysql.connector import errors
+from Database.backends import get_backend
+from Database.prepared_statement_cache import PreparedStatementCache
+from Utils.metrics import REGISTRY, POOL_CHECKOUT_WAIT
+from collections import deque
+from typing import Union, Optional, Any, Dict, List
+import threading
+import time
+import weakref
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class PooledConnection:
+    """
+    Обёртка над соединением из пула.
+    Делегирует все вызовы исходному соединению, а close() возвращает соединение в пул.
+    """
+
+    def __init__(self, pool: "ConnectionPoolManager", connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        if self._connection is None:
+            raise errors.InterfaceError("Connection has already been returned to the pool.")
+        return getattr(self._connection, name)
+
+    @property
+    def raw_connection(self):
+        """
+        Исходное соединение с базой данных.
+        """
+        return self._connection
+
+    def statement_cache(self, max_size: int) -> PreparedStatementCache:
+        """
+        Возвращает кэш prepared statements соединения.
+        Кэш живёт вместе с исходным соединением и переживает возврат в пул.
+
+        :param max_size: Максимальное количество подготовленных операторов.
+        """
+        cache = getattr(self._connection, "_statement_cache", None)
+        if cache is None:
+            cache = PreparedStatementCache(self._connection, max_size)
+            self._connection._statement_cache = cache
+        return cache
+
+    def close(self):
+        """
+        Возвращает соединение в пул. Повторный вызов ничего не делает.
+        """
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool._release(connection)
+
+    def discard(self):
+        """
+        Закрывает исходное соединение вместо возврата в пул (например, если
+        небуферизованный результат прочитан не до конца). Последующий close() ничего не делает.
+        """
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool._discard(connection)
+
+
+# Все созданные пулы для сбора метрик (пул удаляется из набора при сборке мусора)
+_POOLS: "weakref.WeakSet[ConnectionPoolManager]" = weakref.WeakSet()
+
+# Метрики состояния пулов: (имя, тип, описание, ключ в stats())
+_POOL_METRICS = (
+    ("db_pool_size", "gauge", "Open connections in the pool.", "size"),
+    ("db_pool_in_use", "gauge", "Connections checked out of the pool.", "in_use"),
+    ("db_pool_idle", "gauge", "Idle connections in the pool.", "idle"),
+    ("db_pool_waiting", "gauge", "Callers waiting for a connection.", "waiting"),
+    ("db_pool_checkouts_total", "counter", "Connections handed out by the pool.", "checkouts"),
+    ("db_pool_timeouts_total", "counter", "Checkouts that timed out.", "timeouts"),
+    ("db_pool_wait_seconds_total", "counter", "Total time spent waiting for connections.", "wait_time_total"),
+)
+
+
+def _collect_pool_metrics():
+    """
+    Сборщик метрик для MetricsRegistry: состояние всех пулов соединений.
+    """
+    pool_stats = [(pool.pool_name, pool.stats()) for pool in list(_POOLS)]
+    for name, metric_type, documentation, key in _POOL_METRICS:
+        yield name, metric_type, documentation, [({"pool": pool_name}, stats[key]) for pool_name, stats in pool_stats]
+
+
+REGISTRY.register_collector(_collect_pool_metrics)
+
+
 class ConnectionPoolManager:
     """
     Класс для управления пулом соединений с базой данных.
+
+    Пул растёт от min_size до max_size по мере необходимости, закрывает соединения,
+    простаивающие дольше idle_timeout, и ставит вызывающих в очередь, если все
+    соединения заняты. Если соединение не освободилось за acquire_timeout секунд,
+    выбрасывается PoolError.
     """
 
     def __init__(self, db_config: dict[str, Union[str, int]], pool_config: Optional[dict[str, Union[str, int]]] = None):
@@ -15,33 +108,195 @@ class ConnectionPoolManager:
         Инициализация пула соединений с базой данных.
 
         :param db_config: Словарь с параметрами подключения к базе данных.
-        :param pool_config: Словарь с параметрами пула соединений (например, pool_size, pool_name).
-        """
-        required_keys = ["user", "password", "host", "database"]
-        for key in required_keys:
-            if key not in db_config:
-                raise ValueError(f"Missing required database configuration key: {key}")
-
-        pool_name = pool_config.get("pool_name", "db_pool") if pool_config else "db_pool"
-        pool_size = pool_config.get("pool_size", 5) if pool_config else 5
-        connection_timeout = pool_config.get("connection_timeout", 10) if pool_config else 10
-
-        self.pool: pooling.MySQLConnectionPool = pooling.MySQLConnectionPool(
-            pool_name=pool_name,
-            pool_size=pool_size,
-            connection_timeout=connection_timeout,
-            **db_config
+            Ключ backend выбирает бэкенд хранения: mysql (по умолчанию) или sqlite.
+        :param pool_config: Словарь с параметрами пула соединений:
+            pool_name, min_size, max_size (или pool_size), acquire_timeout,
+            idle_timeout, validate_after, connection_timeout.
+        """
+        db_config = dict(db_config)
+        self.backend = get_backend(db_config.pop("backend", None))
+        self.backend.validate_config(db_config)
+
+        pool_config = pool_config or {}
+        self.pool_name = pool_config.get("pool_name", "db_pool")
+        self.max_size = int(pool_config.get("max_size", pool_config.get("pool_size", 10)))
+        self.min_size = int(pool_config.get("min_size", 1))
+        self.acquire_timeout = float(pool_config.get("acquire_timeout", 5))
+        self.idle_timeout = float(pool_config.get("idle_timeout", 300))
+        self.validate_after = float(pool_config.get("validate_after", 30))
+        connection_timeout = pool_config.get("connection_timeout", 10)
+
+        if self.max_size < 1 or not 0 <= self.min_size <= self.max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+
+        self._connect_config = dict(db_config, connection_timeout=connection_timeout)
+        self._condition = threading.Condition()
+        # Свободные соединения: (соединение, время возврата в пул)
+        self._idle: deque = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._stats = {
+            "checkouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "closed": 0,
+            "validation_failures": 0,
+        }
+
+        _POOLS.add(self)
+
+        for _ in range(self.min_size):
+            connection = self._create_connection()
+            with self._condition:
+                self._size += 1
+                self._idle.append((connection, time.monotonic()))
+
+        logger.info(
+            f"Connection pool initialized with pool_name={self.pool_name}, min_size={self.min_size}, "
+            f"max_size={self.max_size}, acquire_timeout={self.acquire_timeout}, connection_timeout={connection_timeout}."
         )
-        logger.info(f"Connection pool initialized with pool_name={pool_name}, pool_size={pool_size}, connection_timeout={connection_timeout}.")
 
-    def get_connection(self):
+    def _create_connection(self):
+        connection = self.backend.connect(self._connect_config)
+        with self._condition:
+            self._stats["created"] += 1
+        return connection
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except mysql.connector.Error as e:
+            logger.warning(f"Failed to close pooled connection: {e}")
+        with self._condition:
+            self._stats["closed"] += 1
+
+    def _is_alive(self, connection) -> bool:
+        """
+        Проверяет соединение перед выдачей после простоя.
+        """
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            with self._condition:
+                self._stats["validation_failures"] += 1
+            return False
+
+    def get_connection(self) -> PooledConnection:
         """
-        Получает соединение из пула.
+        Получает соединение из пула. Если свободных соединений нет и пул достиг
+        max_size, ожидает освобождения соединения не дольше acquire_timeout.
 
-        :return: Объект соединения MySQL.
+        :return: Объект соединения, close() которого возвращает его в пул.
         """
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        connection, last_used = None, None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    # LIFO: чаще используемые соединения остаются «тёплыми»
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    logger.error(f"Failed to get connection from pool: timed out after {self.acquire_timeout}s.")
+                    raise errors.PoolError(
+                        f"Failed getting connection; pool '{self.pool_name}' exhausted for {self.acquire_timeout}s"
+                    )
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+            wait_time = time.monotonic() - started
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+        POOL_CHECKOUT_WAIT.observe(wait_time, self.pool_name)
+
         try:
-            return self.pool.get_connection()
+            if connection is not None and time.monotonic() - last_used >= self.validate_after \
+                    and not self._is_alive(connection):
+                self._close_quietly(connection)
+                connection = None
+            if connection is None:
+                connection = self._create_connection()
         except mysql.connector.Error as e:
             logger.error(f"Failed to get connection from pool: {e}")
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
             raise
+        return PooledConnection(self, connection)
+
+    def _release(self, connection):
+        """
+        Возвращает соединение в пул и закрывает соединения, простаивающие дольше idle_timeout.
+        """
+        try:
+            if getattr(connection, "unread_result", False):
+                # Следующий получатель соединения получил бы ошибку "Unread result found"
+                logger.warning("Discarding pooled connection with an unread result.")
+                reusable = False
+            else:
+                if getattr(connection, "in_transaction", False):
+                    connection.rollback()
+                reusable = True
+        except mysql.connector.Error as e:
+            logger.warning(f"Discarding pooled connection after failed rollback: {e}")
+            reusable = False
+
+        now = time.monotonic()
+        expired: List[Any] = []
+        with self._condition:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((connection, now))
+            else:
+                self._size -= 1
+                expired.append(connection)
+            while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+                self._size -= 1
+            self._condition.notify()
+
+        for stale in expired:
+            self._close_quietly(stale)
+
+    def _discard(self, connection):
+        """
+        Закрывает выданное соединение и освобождает его место в пуле.
+        """
+        with self._condition:
+            self._in_use -= 1
+            self._size -= 1
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Возвращает состояние пула: размер, занятые и свободные соединения,
+        число ожидающих и статистику времени ожидания соединения.
+        """
+        with self._condition:
+            result = dict(self._stats)
+            result.update({
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return result
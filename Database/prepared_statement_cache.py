@@ -0,0 +1,77 @@
+import mysql.connector
+from collections import OrderedDict
+from typing import Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedStatementCache:
+    """
+    LRU-кэш серверных prepared statements одного соединения, ключ — текст SQL.
+
+    Для каждого запроса хранится отдельный prepared-курсор. Курсор MySQL
+    повторно использует подготовленный оператор, только если ему передаётся
+    тот же объект строки запроса, поэтому кэш возвращает и курсор, и
+    сохранённую строку.
+    """
+
+    def __init__(self, connection, max_size: int = 64):
+        """
+        Инициализация кэша.
+
+        :param connection: Соединение MySQL, которому принадлежат prepared statements.
+        :param max_size: Максимальное количество подготовленных операторов на соединение.
+        """
+        self._connection = connection
+        self.max_size = max_size
+        self._statements: "OrderedDict[str, Tuple[str, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, query: str) -> Tuple[str, object]:
+        """
+        Возвращает сохранённую строку запроса и prepared-курсор для неё.
+
+        :param query: SQL-запрос.
+        :return: Кортеж (строка запроса, курсор).
+        """
+        entry = self._statements.get(query)
+        if entry is not None:
+            self._statements.move_to_end(query)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = (query, self._connection.cursor(prepared=True, dictionary=True))
+        self._statements[query] = entry
+        while len(self._statements) > self.max_size:
+            _, (_, evicted) = self._statements.popitem(last=False)
+            self._close_cursor(evicted)
+        return entry
+
+    def discard(self, query: str):
+        """
+        Удаляет оператор из кэша (например, после ошибки выполнения).
+        """
+        entry = self._statements.pop(query, None)
+        if entry is not None:
+            self._close_cursor(entry[1])
+
+    def clear(self):
+        """
+        Закрывает все подготовленные операторы соединения.
+        """
+        while self._statements:
+            _, (_, cursor) = self._statements.popitem()
+            self._close_cursor(cursor)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except mysql.connector.Error as e:
+            logger.warning(f"Failed to close prepared statement: {e}")
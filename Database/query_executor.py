@@ -1,7 +1,10 @@
 import mysql.connector
 from typing import Any, Optional, Union, Tuple, List, Dict
+from Database.replica_router import REPLICA_FAILURE_ERRORS
 from Database.transaction_manager import TransactionManager
+from Utils.metrics import observe_query
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -10,13 +13,22 @@ class QueryExecutor:
     Класс для выполнения SQL-запросов.
     """
 
-    def __init__(self, db_config: dict[str, Union[str, int]], pool_config: Optional[dict[str, Union[str, int]]] = None):
+    def __init__(
+        self,
+        db_config: dict[str, Union[str, int]],
+        pool_config: Optional[dict[str, Union[str, int]]] = None,
+        replica_configs: Optional[List[dict[str, Union[str, int]]]] = None
+    ):
         """
         Инициализация QueryExecutor.
 
-        :param transaction_manager: Экземпляр TransactionManager для управления транзакциями.
+        :param db_config: Словарь с параметрами подключения к базе данных.
+        :param pool_config: Параметры пула соединений. Ключ statement_cache_size > 0 включает
+            кэш серверных prepared statements указанного размера на каждое соединение.
+        :param replica_configs: Параметры подключения к репликам для запросов read_only.
         """
-        self.transaction_manager = TransactionManager(db_config, pool_config)
+        self.transaction_manager = TransactionManager(db_config, pool_config, replica_configs)
+        self.statement_cache_size = int((pool_config or {}).get("statement_cache_size", 0))
 
     def execute(
         self,
@@ -24,7 +36,8 @@ class QueryExecutor:
         params: Optional[Tuple[Any, ...]] = None,
         fetchone: bool = False,
         fetchall: bool = False,
-        commit: bool = False
+        commit: bool = False,
+        read_only: bool = False
     ) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
         """
         Выполняет SQL-запрос.
@@ -34,25 +47,118 @@ class QueryExecutor:
         :param fetchone: Если True, возвращает одну запись.
         :param fetchall: Если True, возвращает все записи.
         :param commit: Если True, фиксирует изменения в базе данных.
+        :param read_only: Если True, запрос выполняется на соединении для чтения
+            в режиме autocommit, без START TRANSACTION/COMMIT.
         :return: Результат запроса (если fetchone или fetchall указаны).
         """
         if not query:
             raise ValueError("Query cannot be empty.")
+        if read_only and commit:
+            raise ValueError("Read-only query cannot be committed.")
+
+        started = time.perf_counter()
+        result, failed = None, True
+        try:
+            result = self._execute(query, params, fetchone, fetchall, commit, read_only)
+            failed = False
+            return result
+        finally:
+            # Длительность (включая ожидание соединения) и число строк по отпечатку запроса
+            observe_query(query, started, result, failed)
+
+    def ping(self):
+        """
+        Проверяет, что пул primary выдаёт соединение и сервер отвечает на ping.
+        Исчерпанный (например, утечкой соединений) пул или недоступная БД приводят к исключению.
+        """
+        connection = self.transaction_manager.connection_pool.get_connection()
+        try:
+            connection.ping(reconnect=False)
+        finally:
+            connection.close()
+
+    def _execute(
+        self,
+        query: str,
+        params: Optional[Tuple[Any, ...]],
+        fetchone: bool,
+        fetchall: bool,
+        commit: bool,
+        read_only: bool
+    ) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        if not read_only:
+            with self.transaction_manager.transaction_context() as connection:
+                return self._run(connection, query, params, fetchone, fetchall, commit)
+        try:
+            with self.transaction_manager.read_context() as connection:
+                return self._run(connection, query, params, fetchone, fetchall, commit)
+        except REPLICA_FAILURE_ERRORS as e:
+            if not self.transaction_manager.last_read_from_replica():
+                raise
+            # Реплика уже исключена из ротации в read_context
+            logger.warning(f"Read on replica failed, retrying on primary: {e}")
+            with self.transaction_manager.read_context(use_primary=True) as connection:
+                return self._run(connection, query, params, fetchone, fetchall, commit)
+
+    def _run(
+        self,
+        connection,
+        query: str,
+        params: Optional[Tuple[Any, ...]],
+        fetchone: bool,
+        fetchall: bool,
+        commit: bool
+    ) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        if self.statement_cache_size > 0:
+            return self._execute_prepared(connection, query, params, fetchone, fetchall, commit)
+        with connection.cursor(dictionary=True) as cursor:
+            try:
+                cursor.execute(query, params)
+                result = None
+                if fetchone:
+                    result = cursor.fetchone()
+                elif fetchall:
+                    result = cursor.fetchall()
+
+                if commit:
+                    connection.commit()
+
+                return result
+            except mysql.connector.Error as e:
+                logger.error(f"Error executing query: {e}")
+                raise
+
+    def _execute_prepared(
+        self,
+        connection,
+        query: str,
+        params: Optional[Tuple[Any, ...]],
+        fetchone: bool,
+        fetchall: bool,
+        commit: bool
+    ) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Выполняет SQL-запрос через закэшированный серверный prepared statement соединения.
+        Повторные выполнения того же текста запроса не требуют его разбора сервером.
+        """
+        cache = connection.statement_cache(self.statement_cache_size)
+        prepared_query, cursor = cache.get(query)
+        try:
+            cursor.execute(prepared_query, params)
+            result = None
+            if fetchone:
+                result = cursor.fetchone()
+            elif fetchall:
+                result = cursor.fetchall()
+            if not fetchall and cursor.with_rows:
+                # Непрочитанные строки блокируют соединение для следующих команд
+                cursor.fetchall()
+
+            if commit:
+                connection.commit()
 
-        with self.transaction_manager.transaction_context() as connection:
-            with connection.cursor(dictionary=True) as cursor:
-                try:
-                    cursor.execute(query, params)
-                    result = None
-                    if fetchone:
-                        result = cursor.fetchone()
-                    elif fetchall:
-                        result = cursor.fetchall()
-
-                    if commit:
-                        connection.commit()
-
-                    return result
-                except mysql.connector.Error as e:
-                    logger.error(f"Error executing query: {e}")
-                    raise
+            return result
+        except mysql.connector.Error as e:
+            cache.discard(query)
+            logger.error(f"Error executing prepared query: {e}")
+            raise
@@ -0,0 +1,187 @@
+import mysql.connector
+from contextvars import ContextVar
+from itertools import count
+from typing import Dict, List, Optional
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ошибки чтения, после которых реплика исключается из ротации, а чтение повторяется на primary.
+# Ошибки самого запроса (ProgrammingError и т.п.) повторились бы и на primary.
+REPLICA_FAILURE_ERRORS = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+
+# Ключ сессии текущего запроса для read-your-writes (например, хэш Bearer-токена)
+_session_key: ContextVar[Optional[str]] = ContextVar("db_session_key", default=None)
+# Время последней записи клиента (time.time()): передаётся клиентом (например, в cookie)
+# и обновляется записью в текущем запросе, чтобы read-your-writes работал между процессами
+_client_last_write: ContextVar[Optional[float]] = ContextVar("db_client_last_write", default=None)
+
+
+def set_session_key(key: Optional[str]):
+    """
+    Привязывает текущий поток (контекст) к сессии клиента.
+    Чтения сессии, выполнившей запись, в течение sticky_seconds направляются на primary.
+
+    :param key: Ключ сессии или None.
+    """
+    _session_key.set(key)
+
+
+def get_session_key() -> Optional[str]:
+    """
+    Возвращает ключ сессии текущего контекста.
+    """
+    return _session_key.get()
+
+
+def set_client_last_write(written_at: Optional[float]):
+    """
+    Задаёт время последней записи клиента, которое он передал с запросом.
+    Отметки ReplicaRouter хранятся в памяти процесса, поэтому при нескольких
+    процессах (launcher.py) или серверах о записи, выполненной другим процессом,
+    известно только из этого значения.
+
+    :param written_at: Время записи (time.time()) или None.
+    """
+    _client_last_write.set(written_at)
+
+
+def get_client_last_write() -> Optional[float]:
+    """
+    Возвращает время последней записи клиента: переданное им или время записи
+    в текущем контексте (его нужно вернуть клиенту).
+    """
+    return _client_last_write.get()
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор чтений между primary и репликами.
+
+    Чтения распределяются по здоровым репликам (round_robin или least_loaded).
+    После записи в сессии её чтения sticky_seconds секунд идут на primary.
+    Отметки записей хранятся в памяти процесса и в другие процессы не попадают;
+    между процессами read-your-writes обеспечивает время записи, которое клиент
+    возвращает с запросами (set_client_last_write).
+    Реплика, не прошедшая проверку, исключается из ротации на retry_after секунд.
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+    # Порог, после которого устаревшие отметки записей удаляются
+    MAX_TRACKED_SESSIONS = 10000
+
+    def __init__(
+        self,
+        primary_pool,
+        replica_pools: Optional[List] = None,
+        strategy: str = "round_robin",
+        sticky_seconds: float = 5.0,
+        retry_after: float = 30.0
+    ):
+        """
+        Инициализация маршрутизатора.
+
+        :param primary_pool: Пул чтения primary (используется, если реплик нет или все недоступны).
+        :param replica_pools: Пулы соединений реплик.
+        :param strategy: Стратегия выбора реплики: round_robin или least_loaded.
+        :param sticky_seconds: Время после записи, в течение которого чтения сессии идут на primary.
+        :param retry_after: Время исключения неработающей реплики из ротации.
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica routing strategy: {strategy}")
+        self.primary_pool = primary_pool
+        self.replica_pools = list(replica_pools or [])
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.retry_after = retry_after
+        self._counter = count()
+        self._lock = threading.Lock()
+        self._down_until: Dict[int, float] = {}
+        self._last_write: Dict[Optional[str], float] = {}
+
+    def mark_write(self):
+        """
+        Отмечает запись в текущей сессии.
+        """
+        now = time.monotonic()
+        _client_last_write.set(time.time())
+        with self._lock:
+            self._last_write[get_session_key()] = now
+            if len(self._last_write) > self.MAX_TRACKED_SESSIONS:
+                self._last_write = {
+                    key: written_at for key, written_at in self._last_write.items()
+                    if now - written_at < self.sticky_seconds
+                }
+
+    def _is_sticky(self, now: float) -> bool:
+        written_at = self._last_write.get(get_session_key())
+        if written_at is not None and now - written_at < self.sticky_seconds:
+            return True
+        client_written_at = _client_last_write.get()
+        # Время из будущего (подделанное или при расхождении часов) не продлевает окно
+        return client_written_at is not None and 0 <= time.time() - client_written_at < self.sticky_seconds
+
+    def healthy_replicas(self) -> List:
+        """
+        Возвращает реплики, не исключённые из ротации.
+        """
+        now = time.monotonic()
+        return [pool for pool in self.replica_pools if self._down_until.get(id(pool), 0) <= now]
+
+    def choose_pool(self):
+        """
+        Выбирает пул для чтения.
+
+        :return: Пул реплики или пул чтения primary.
+        """
+        if not self.replica_pools or self._is_sticky(time.monotonic()):
+            return self.primary_pool
+        replicas = self.healthy_replicas()
+        if not replicas:
+            return self.primary_pool
+        if self.strategy == "least_loaded":
+            return min(replicas, key=self._load)
+        return replicas[next(self._counter) % len(replicas)]
+
+    @staticmethod
+    def _load(pool) -> int:
+        stats = pool.stats()
+        return stats["in_use"] + stats["waiting"]
+
+    def report_failure(self, pool):
+        """
+        Исключает реплику из ротации на retry_after секунд.
+        """
+        if pool is self.primary_pool:
+            return
+        with self._lock:
+            self._down_until[id(pool)] = time.monotonic() + self.retry_after
+        logger.warning(f"Replica pool '{getattr(pool, 'pool_name', pool)}' taken out of rotation for {self.retry_after}s.")
+
+    def report_success(self, pool):
+        """
+        Возвращает реплику в ротацию.
+        """
+        with self._lock:
+            if self._down_until.pop(id(pool), None) is not None:
+                logger.info(f"Replica pool '{getattr(pool, 'pool_name', pool)}' returned to rotation.")
+
+    def check_health(self):
+        """
+        Проверяет все реплики запросом ping и обновляет ротацию.
+        Предназначена для периодического вызова (например, из cherrypy.process.plugins.Monitor).
+        """
+        for pool in self.replica_pools:
+            connection = None
+            try:
+                connection = pool.get_connection()
+                connection.ping(reconnect=False)
+                self.report_success(pool)
+            except mysql.connector.Error as e:
+                logger.error(f"Replica health check failed: {e}")
+                self.report_failure(pool)
+            finally:
+                if connection is not None:
+                    connection.close()
@@ -0,0 +1,65 @@
+-- Схема для встроенного бэкенда SQLite, эквивалентная миграциям migrations/*.sql.
+-- Применяется SQLiteBackend при первом подключении, все операторы идемпотентны.
+
+CREATE TABLE IF NOT EXISTS equipment_type (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    serial_mask VARCHAR(50) NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+-- COLLATE NOCASE повторяет сравнение без учёта регистра стандартной collation MySQL
+CREATE TABLE IF NOT EXISTS equipment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type_id INTEGER NOT NULL REFERENCES equipment_type(id) ON DELETE CASCADE,
+    serial_number VARCHAR(255) NOT NULL UNIQUE COLLATE NOCASE,
+    note TEXT,
+    is_deleted BOOLEAN NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_deleted_updated_at ON equipment (is_deleted, updated_at);
+CREATE INDEX IF NOT EXISTS idx_equipment_type_id ON equipment (type_id);
+
+-- Аналог ON UPDATE CURRENT_TIMESTAMP(6)
+CREATE TRIGGER IF NOT EXISTS trg_equipment_updated_at AFTER UPDATE ON equipment
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE equipment SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_type_updated_at AFTER UPDATE ON equipment_type
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE equipment_type SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS equipment_search_trigram (
+    field VARCHAR(32) NOT NULL,
+    trigram CHAR(3) NOT NULL,
+    equipment_id INTEGER NOT NULL,
+    PRIMARY KEY (field, trigram, equipment_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_equipment_search_trigram_equipment_id ON equipment_search_trigram (equipment_id);
+
+CREATE TABLE IF NOT EXISTS api_token (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    token_hash CHAR(64) NOT NULL UNIQUE,
+    revoked BOOLEAN NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Счётчики неудалённого оборудования по типам (см. Services/equipment_counters.py)
+CREATE TABLE IF NOT EXISTS equipment_type_counter (
+    type_id INTEGER PRIMARY KEY REFERENCES equipment_type(id) ON DELETE CASCADE,
+    active_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- Начальное заполнение для существующих данных; уже заведённые счётчики не меняются
+INSERT OR IGNORE INTO equipment_type_counter (type_id, active_count)
+SELECT type_id, COUNT(*) FROM equipment WHERE is_deleted = 0 GROUP BY type_id;
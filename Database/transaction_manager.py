@@ -1,23 +1,70 @@
 import mysql.connector
 from contextlib import contextmanager
+from contextvars import ContextVar
 from mysql.connector.connection import MySQLConnection
 from Database.connection_pool_manager import ConnectionPoolManager
+from Database.replica_router import REPLICA_FAILURE_ERRORS, ReplicaRouter
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, List
 logger = logging.getLogger(__name__)
 
+# Выполнялось ли последнее чтение текущего контекста на реплике
+_read_from_replica: ContextVar[bool] = ContextVar("read_from_replica", default=False)
+# Пул, закреплённый за чтениями текущего контекста (см. TransactionManager.pinned_reads)
+_pinned_read_pool: ContextVar[Optional[list]] = ContextVar("pinned_read_pool", default=None)
+
 class TransactionManager:
     """
     Класс для управления транзакциями в базе данных.
     """
 
-    def __init__(self,DbConfig: dict[str, str], pool_config: Optional[dict[str, str]] = None):
+    def __init__(
+        self,
+        DbConfig: dict[str, str],
+        pool_config: Optional[dict[str, str]] = None,
+        replica_configs: Optional[List[dict[str, str]]] = None
+    ):
         """
         Инициализация менеджера транзакций.
 
-        :param connection_pool: Экземпляр ConnectionPoolManager для получения соединений.
+        :param DbConfig: Словарь с параметрами подключения к базе данных (primary).
+        :param pool_config: Параметры пула соединений. Пул для чтения получает имя
+            <pool_name>_read и размер read_max_size (по умолчанию равен max_size).
+            Ключи replica_strategy, replica_sticky_seconds и replica_retry_after
+            настраивают ReplicaRouter.
+        :param replica_configs: Параметры подключения к репликам. Чтения распределяются между ними.
         """
+        pool_config = pool_config or {}
         self.connection_pool = ConnectionPoolManager(DbConfig, pool_config)
+        self.read_pool = ConnectionPoolManager(
+            dict(DbConfig, autocommit=True), self._read_pool_config(pool_config)
+        )
+        replica_pools = [
+            ConnectionPoolManager(
+                dict(replica_config, autocommit=True),
+                # Недоступная при старте реплика не должна мешать запуску приложения
+                dict(self._read_pool_config(pool_config, f"replica{index}"), min_size=0)
+            )
+            for index, replica_config in enumerate(replica_configs or [])
+        ]
+        self.router = ReplicaRouter(
+            self.read_pool,
+            replica_pools,
+            strategy=pool_config.get("replica_strategy", "round_robin"),
+            sticky_seconds=float(pool_config.get("replica_sticky_seconds", 5)),
+            retry_after=float(pool_config.get("replica_retry_after", 30)),
+        )
+
+    @staticmethod
+    def _read_pool_config(pool_config: Optional[dict[str, str]], suffix: str = "read") -> dict[str, str]:
+        """
+        Формирует параметры пула соединений, зарезервированных для чтения.
+        """
+        read_config = dict(pool_config or {})
+        read_config["pool_name"] = f"{read_config.get('pool_name', 'db_pool')}_{suffix}"
+        if "read_max_size" in read_config:
+            read_config["max_size"] = read_config["read_max_size"]
+        return read_config
 
     @contextmanager
     def transaction_context(self):
@@ -30,9 +77,78 @@ class TransactionManager:
             connection.start_transaction()
             yield connection
             connection.commit()
+            self.router.mark_write()
         except mysql.connector.Error as e:
             logger.error(f"Transaction failed: {e}")
             connection.rollback()
             raise
         finally:
             connection.close()
+
+    @contextmanager
+    def read_context(self, use_primary: bool = False):
+        """
+        Контекстный менеджер для чтения без явной транзакции.
+        Соединение берётся из пула чтения в режиме autocommit, поэтому
+        START TRANSACTION и COMMIT вокруг одиночного SELECT не выполняются.
+        Если настроены реплики, пул выбирается ReplicaRouter; при недоступности
+        реплики чтение выполняется на primary. Реплика, на которой запрос
+        завершился ошибкой соединения, исключается из ротации.
+        Внутри pinned_reads используется закреплённый пул.
+
+        :param use_primary: Читать с primary независимо от ReplicaRouter.
+        """
+        pinned = _pinned_read_pool.get()
+        if use_primary:
+            pool = self.read_pool
+        elif pinned is not None:
+            pool = pinned[0]
+        else:
+            pool = self.router.choose_pool()
+        try:
+            connection: MySQLConnection = pool.get_connection()
+        except mysql.connector.Error as e:
+            if pool is self.read_pool:
+                raise
+            logger.error(f"Replica unavailable, falling back to primary: {e}")
+            self.router.report_failure(pool)
+            pool = self.read_pool
+            if pinned is not None:
+                pinned[0] = pool
+            connection = pool.get_connection()
+        _read_from_replica.set(pool is not self.read_pool)
+        try:
+            yield connection
+        except mysql.connector.Error as e:
+            logger.error(f"Read failed: {e}")
+            if pool is not self.read_pool and isinstance(e, REPLICA_FAILURE_ERRORS):
+                self.router.report_failure(pool)
+                if pinned is not None:
+                    pinned[0] = self.read_pool
+            raise
+        finally:
+            connection.close()
+
+    @contextmanager
+    def pinned_reads(self):
+        """
+        Контекстный менеджер, в котором все чтения текущего контекста выполняются
+        на одном пуле, выбранном ReplicaRouter при входе. Нужен, когда результаты
+        нескольких запросов должны быть согласованы (например, версия списка и сама
+        страница): разные реплики могут отставать от primary на разное время.
+        Если закреплённая реплика отказала, оставшиеся чтения выполняются на primary.
+        """
+        token = _pinned_read_pool.set([self.router.choose_pool()])
+        try:
+            yield
+        finally:
+            _pinned_read_pool.reset(token)
+
+    @staticmethod
+    def last_read_from_replica() -> bool:
+        """
+        Возвращает True, если последнее чтение текущего контекста (потока запроса)
+        выполнялось на реплике. Такие результаты могут отставать от primary,
+        поэтому их нельзя сохранять в общие кэши процесса.
+        """
+        return _read_from_replica.get()
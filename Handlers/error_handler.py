@@ -1,18 +1,17 @@
-import json
 import cherrypy
 import logging
+from Utils.json_encoder import dumps
 
 logger = logging.getLogger(__name__)
 
-def custom_error_handler(status, message, traceback_info, version):
+def custom_error_handler(status, message, traceback, version):
     """
-    Централизованный обработчик ошибок для CherryPy.
-    Возвращает JSON-ответ вместо HTML.
+    Централизованный обработчик ошибок для CherryPy (error_page.default).
+    Возвращает JSON-ответ вместо HTML, сериализуя его тем же кодировщиком, что и tools.json_out.
     """
-    print("custom_error_handler called")
     logger.error(f"Error occurred: {status} - {message}")
     cherrypy.response.headers['Content-Type'] = 'application/json'
-    return json.dumps({
+    return dumps({
         "status": status,
         "message": message
-    })
\ No newline at end of file
+    })
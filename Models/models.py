@@ -3,6 +3,7 @@ from typing import Optional, List
 
 
 class EquipmentInput(BaseModel):
+    type_id: Optional[int] = Field(None, gt=0, description="ID типа оборудования")
     serial_number: str = Field(..., min_length=1, max_length=50, description="Серийный номер оборудования")
     note: Optional[str] = Field(None, max_length=255, description="Примечание к оборудованию")
 
@@ -19,5 +20,20 @@ class EquipmentUpdateInput(BaseModel):
     Модель для обновления оборудования.
     Все поля являются необязательными.
     """
+    type_id: Optional[int] = Field(None, gt=0, description="ID типа оборудования")
     serial_number: Optional[str] = Field(None, min_length=1, max_length=50, description="Серийный номер оборудования")
-    note: Optional[str] = Field(None, max_length=255, description="Примечание к оборудованию")
\ No newline at end of file
+    note: Optional[str] = Field(None, max_length=255, description="Примечание к оборудованию")
+
+class EquipmentBulkUpdateItem(BaseModel):
+    """
+    Элемент пакетного обновления: ID оборудования и изменяемые поля.
+    """
+    id: int = Field(..., gt=0, description="ID оборудования")
+    fields: EquipmentUpdateInput
+
+
+class EquipmentBulkDeleteInput(BaseModel):
+    """
+    Модель пакетного мягкого удаления.
+    """
+    ids: List[int] = Field(..., min_length=1, description="Список ID оборудования")
@@ -0,0 +1,84 @@
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EquipmentTypeCounters:
+    """
+    Счётчики неудалённого оборудования по type_id.
+
+    Счётчики хранятся в таблице equipment_type_counter и изменяются в той же
+    транзакции, что и запись в equipment (добавление, мягкое удаление, смена
+    type_id), поэтому общее количество и количество по типу читаются без COUNT(*)
+    по таблице оборудования. Отсутствующая строка счётчика означает ноль.
+    Расхождения (например, после ручных правок в БД) находит measure_type().
+    """
+
+    TABLE = "equipment_type_counter"
+
+    def apply(self, cursor, deltas: Dict[int, int]):
+        """
+        Применяет изменения счётчиков в рамках открытой транзакции.
+        Строки обновляются в порядке type_id, чтобы конкурентные транзакции
+        блокировали их в одном порядке.
+
+        :param cursor: Курсор открытой транзакции.
+        :param deltas: Словарь {type_id: изменение количества}.
+        """
+        rows = [(type_id, delta) for type_id, delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+        cursor.executemany(
+            f"INSERT INTO {self.TABLE} (type_id, active_count) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE active_count = active_count + VALUES(active_count)",
+            rows
+        )
+
+    @staticmethod
+    def deltas(type_ids: Iterable[int], sign: int = 1) -> Dict[int, int]:
+        """
+        Считает изменения счётчиков для списка type_id добавленных (sign=1)
+        или удалённых (sign=-1) записей.
+        """
+        return {type_id: count * sign for type_id, count in Counter(type_ids).items()}
+
+    def total(self, db, type_id: Optional[int] = None) -> int:
+        """
+        Возвращает количество неудалённого оборудования (всего или для одного типа).
+
+        :param db: QueryExecutor.
+        :param type_id: ID типа или None для общего количества.
+        :return: Количество записей.
+        """
+        if type_id is None:
+            row = db.execute(
+                f"SELECT COALESCE(SUM(active_count), 0) AS total FROM {self.TABLE}", fetchone=True, read_only=True
+            )
+        else:
+            row = db.execute(
+                f"SELECT active_count AS total FROM {self.TABLE} WHERE type_id = %s",
+                (type_id,), fetchone=True, read_only=True
+            )
+        return int(row["total"]) if row else 0
+
+    def measure_type(self, cursor, type_id: int) -> Tuple[int, int]:
+        """
+        Читает значение счётчика типа и фактическое количество записей без блокировок.
+        В одной транзакции (REPEATABLE READ) оба запроса видят один снимок данных,
+        а счётчик и записи изменяются в общих транзакциях, поэтому разница между
+        значениями — расхождение счётчика, а не конкурентное изменение. Исправление
+        применяется отдельной короткой транзакцией как изменение apply({type_id: actual - stored}),
+        поэтому запись в этот тип не ждёт окончания COUNT(*).
+
+        :param cursor: Курсор открытой транзакции.
+        :param type_id: ID типа оборудования.
+        :return: Кортеж (значение счётчика, фактическое количество).
+        """
+        cursor.execute(f"SELECT active_count FROM {self.TABLE} WHERE type_id = %s", (type_id,))
+        row = cursor.fetchone()
+        stored = int(row[0]) if row else 0
+        cursor.execute("SELECT COUNT(*) FROM equipment WHERE type_id = %s AND is_deleted = 0", (type_id,))
+        actual = int(cursor.fetchone()[0])
+        return stored, actual
@@ -1,28 +1,80 @@
+import base64
+import json
 import logging
-import re
-from typing import List, Dict, Tuple, Union, Optional
+import mysql.connector
+from typing import List, Dict, Tuple, Union, Optional, Iterator, Iterable
 from pydantic import ValidationError
-from Models.models import EquipmentListInput, EquipmentUpdateInput
+from Models.models import EquipmentInput, EquipmentUpdateInput, EquipmentBulkUpdateItem, EquipmentBulkDeleteInput
 from Database.query_executor import QueryExecutor
+from Services.serial_mask_registry import SerialMaskRegistry
+from Services.search_index import TrigramSearchIndex, escape_like
+from Services.equipment_counters import EquipmentTypeCounters
 from Utils.decorators import log_and_handle_errors  # Импорт декоратора
+from Utils.cache import CacheBackend, LRUTTLCache, MISSING
 
 # Настройка логгера
 logger = logging.getLogger(__name__)
 
+# Размер пачки для set-based проверки уникальности и многострочных INSERT
+BULK_CHUNK_SIZE = 1000
+
+# Время жизни (секунды) приблизительного количества записей для текстовых фильтров
+APPROXIMATE_COUNT_TTL = 60
+
+
+def _chunks(items: List, size: int):
+    """
+    Делит список на последовательные части не длиннее size.
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 class EquipmentService:
     """
     Сервисный слой для управления оборудованием.
     """
 
-    def __init__(self, config):
+    # Поля оборудования в порядке выгрузки
+    EXPORT_FIELDS = ("id", "type_id", "serial_number", "note", "is_deleted")
+
+    def __init__(
+        self,
+        config,
+        cache: Optional[CacheBackend] = None,
+        pool_config: Optional[Dict] = None,
+        replica_configs: Optional[List[Dict]] = None
+    ):
         """
         Инициализация сервиса оборудования.
 
         :param config: Конфигурация базы данных.
+        :param cache: Бэкенд кэша записей оборудования по ID. По умолчанию — LRUTTLCache процесса.
+        :param pool_config: Параметры пула соединений (см. ConnectionPoolManager).
+        :param replica_configs: Конфигурации реплик для чтения (см. ReplicaRouter).
         """
-        self.db = QueryExecutor(config)
+        self.db = QueryExecutor(config, pool_config, replica_configs)
+        self.cache = cache if cache is not None else LRUTTLCache()
+        self.mask_registry = SerialMaskRegistry(self._load_serial_masks)
+        self.search_index = TrigramSearchIndex()
+        self.counters = EquipmentTypeCounters()
+        self.count_cache = LRUTTLCache(max_size=1024, ttl=APPROXIMATE_COUNT_TTL)
         logger.info("EquipmentService initialized with database configuration.")
 
+    def _load_serial_masks(self) -> List[Dict[str, Union[int, str]]]:
+        """
+        Загружает маски всех типов оборудования для SerialMaskRegistry.
+
+        :return: Список словарей с ключами id и serial_mask.
+        """
+        return self.db.execute("SELECT id, serial_mask FROM equipment_type", fetchall=True, read_only=True)
+
+    def invalidate_serial_masks(self):
+        """
+        Сбрасывает кэш масок серийных номеров.
+        Должен вызываться после изменения записей в таблице equipment_type.
+        """
+        self.mask_registry.invalidate()
+
     def _validate_pagination_params(self, page: int, limit: int):
         """
         Проверяет параметры пагинации на корректность.
@@ -58,7 +110,79 @@ class EquipmentService:
         
         offset = limit * (page - 1)
         paginated_query = f"{query} LIMIT %s OFFSET %s"
-        return self.db.execute(paginated_query, params + (limit, offset), fetchall=True)
+        return self.db.execute(paginated_query, params + (limit, offset), fetchall=True, read_only=True)
+
+    @staticmethod
+    def _encode_cursor(last_id: int) -> str:
+        """
+        Кодирует позицию keyset-пагинации в непрозрачную строку.
+
+        :param last_id: ID последней записи на странице.
+        :return: Курсор в формате base64url.
+        """
+        payload = json.dumps({"k": "id", "v": last_id}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[int]:
+        """
+        Декодирует курсор keyset-пагинации.
+
+        :param cursor: Курсор из предыдущего ответа. Пустая строка означает первую страницу.
+        :return: ID последней записи предыдущей страницы или None для первой страницы.
+        """
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload.get("k") != "id":
+                raise ValueError
+            return int(payload["v"])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            logger.error(f"Invalid pagination cursor: {cursor}")
+            raise ValueError("Invalid pagination cursor")
+
+    @log_and_handle_errors("Keyset paginating query")
+    def _keyset_paginate_query(
+        self,
+        query: str,
+        conditions: List[str],
+        cursor: Optional[str],
+        limit: int,
+        params: Optional[Tuple] = ()
+    ) -> Dict[str, Union[List[Dict[str, Union[int, str]]], Optional[str]]]:
+        """
+        Выполняет запрос с keyset-пагинацией по id (WHERE id > ? ORDER BY id LIMIT ?).
+
+        :param query: SQL-запрос без условий WHERE.
+        :param conditions: Список условий для WHERE.
+        :param cursor: Курсор из предыдущего ответа (пустая строка или None для первой страницы).
+        :param limit: Лимит записей на странице.
+        :param params: Параметры для условий.
+        :return: Словарь с записями (items) и курсором следующей страницы (next_cursor).
+        """
+        if limit < 1:
+            logger.error("Limit must be greater than 0.")
+            raise ValueError("Limit must be greater than 0.")
+
+        conditions = list(conditions)
+        params = tuple(params or ())
+        after_id = self._decode_cursor(cursor)
+        if after_id is not None:
+            conditions.append("id > %s")
+            params += (after_id,)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # Запрашиваем на одну запись больше, чтобы понять, есть ли следующая страница
+        keyset_query = f"{query} ORDER BY id LIMIT %s"
+        rows = self.db.execute(keyset_query, params + (limit + 1,), fetchall=True, read_only=True) or []
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]["id"])
+        return {"items": rows, "next_cursor": next_cursor}
 
     @log_and_handle_errors("Fetching all equipment types")
     def get_all_equipment_types(self, page: int, limit: int) -> List[Dict[str, Union[int, str]]]:
@@ -72,6 +196,18 @@ class EquipmentService:
         query = "SELECT id, name, serial_mask FROM equipment_type"
         return self._paginate_query(query, page, limit)
 
+    @log_and_handle_errors("Fetching equipment types by cursor")
+    def get_equipment_types_by_cursor(self, cursor: Optional[str], limit: int) -> Dict[str, Union[List, Optional[str]]]:
+        """
+        Получение списка типов оборудования с keyset-пагинацией.
+
+        :param cursor: Курсор из предыдущего ответа (пустая строка для первой страницы).
+        :param limit: Лимит записей на странице.
+        :return: Словарь с типами оборудования (items) и курсором следующей страницы (next_cursor).
+        """
+        query = "SELECT id, name, serial_mask FROM equipment_type"
+        return self._keyset_paginate_query(query, [], cursor, limit)
+
     @log_and_handle_errors("Validating serial number")
     def _validate_and_get_type_id(self, serial_number: str) -> Tuple[bool, Union[int, str]]:
         """
@@ -80,71 +216,244 @@ class EquipmentService:
         :param serial_number: Серийный номер для проверки.
         :return: Кортеж (True, type_id) при успешной валидации, иначе (False, сообщение об ошибке).
         """
-        # Получаем все маски и id типов оборудования
-        query = "SELECT id, serial_mask FROM equipment_type"
-        types = self.db.execute(query, fetchall=True)
-        for t in types:
-            serial_mask = t["serial_mask"]
-            # Преобразуем маску в регулярное выражение
-            mask_regex = serial_mask \
-                .replace('N', '[0-9]') \
-                .replace('A', '[A-Z]') \
-                .replace('a', '[a-z]') \
-                .replace('X', '[A-Z0-9]') \
-                .replace('Z', '[-_@]')
-            if re.fullmatch(mask_regex, serial_number):
-                return True, t["id"]
+        for type_id, _, pattern in self.mask_registry.items():
+            if pattern.fullmatch(serial_number):
+                return True, type_id
         return False, f"Serial number '{serial_number}' does not match any mask"
 
+    def _validate_equipment_batch(
+        self,
+        equipment_list: List[Dict[str, str]],
+        errors: List[Tuple[int, str]]
+    ) -> List[Tuple[int, int, str, Optional[str]]]:
+        """
+        Валидация всей пачки оборудования без обращения к базе данных.
+
+        :param equipment_list: Список словарей с данными оборудования.
+        :param errors: Список, в который добавляются пары (позиция, сообщение об ошибке).
+        :return: Список кортежей (позиция, type_id, serial_number, note) прошедших валидацию записей.
+        """
+        accepted = []
+        for index, equipment in enumerate(equipment_list):
+            try:
+                validated_data = EquipmentInput.model_validate(equipment)
+            except ValidationError as e:
+                errors.append((index, f"Validation error: {e}"))
+                continue
+
+            type_id = validated_data.type_id
+            serial_number = validated_data.serial_number
+            note = validated_data.note or ""
+
+            if type_id is None or serial_number is None:
+                errors.append((index, "type_id and serial_number are required fields."))
+                continue
+
+            # Валидация серийного номера по маске типа оборудования
+            is_valid, msg = self._validate_serial_by_type(type_id, serial_number)
+            if not is_valid:
+                errors.append((index, msg))
+                continue
+
+            accepted.append((index, type_id, serial_number, note))
+        return accepted
+
+    def _find_existing_equipment(self, cursor, pairs: List[Tuple[int, str]], for_update: bool = False) -> set:
+        """
+        Одним запросом находит уже существующие связки type_id + serial_number.
+
+        :param cursor: Курсор открытой транзакции.
+        :param pairs: Список пар (type_id, serial_number).
+        :param for_update: Выполнить запрос как блокирующее чтение (SELECT ... FOR UPDATE).
+        :return: Множество пар (type_id, serial_number в нижнем регистре), уже присутствующих в базе.
+        """
+        if not pairs:
+            return set()
+        placeholders = ", ".join(["(%s, %s)"] * len(pairs))
+        query = (
+            "SELECT type_id, serial_number FROM equipment "
+            f"WHERE is_deleted = 0 AND (type_id, serial_number) IN ({placeholders})"
+        )
+        if for_update:
+            query += " FOR UPDATE"
+        params = tuple(value for pair in pairs for value in pair)
+        cursor.execute(query, params)
+        # Сравнение без учёта регистра, как в стандартной collation MySQL
+        return {(int(row[0]), str(row[1]).lower()) for row in cursor.fetchall()}
+
+    def _insert_equipment_batch(
+        self,
+        cursor,
+        accepted: List[Tuple[int, int, str, Optional[str]]],
+        errors: List[Tuple[int, str]]
+    ) -> int:
+        """
+        Проверяет уникальность и вставляет записи пачками в рамках открытой транзакции.
+        Счётчики по типам увеличиваются в той же транзакции.
+
+        :param cursor: Курсор открытой транзакции.
+        :param accepted: Записи, прошедшие валидацию (позиция, type_id, serial_number, note).
+        :param errors: Список, в который добавляются пары (позиция, сообщение об ошибке).
+        :return: Количество добавленных записей.
+        """
+        insert_query = "INSERT INTO equipment (type_id, serial_number, note, is_deleted) VALUES (%s, %s, %s, %s)"
+        seen = set()
+        inserted = 0
+        for chunk in _chunks(accepted, BULK_CHUNK_SIZE):
+            existing = self._find_existing_equipment(
+                cursor, [(type_id, serial_number) for _, type_id, serial_number, _ in chunk]
+            )
+            rows = []
+            for index, type_id, serial_number, note in chunk:
+                key = (type_id, serial_number.lower())
+                if key in existing or key in seen:
+                    errors.append((index, f"Serial number '{serial_number}' already exists for type_id {type_id}"))
+                    continue
+                seen.add(key)
+                rows.append((type_id, serial_number, note, False))
+            if rows:
+                cursor.executemany(insert_query, rows)
+                inserted += len(rows)
+                self._index_inserted_equipment(cursor, rows)
+                self.counters.apply(cursor, self.counters.deltas(row[0] for row in rows))
+        return inserted
+
+    def _index_inserted_equipment(self, cursor, rows: List[Tuple[int, str, Optional[str], bool]]):
+        """
+        Добавляет только что вставленные записи в поисковый индекс.
+
+        :param cursor: Курсор открытой транзакции.
+        :param rows: Вставленные строки (type_id, serial_number, note, is_deleted).
+        """
+        placeholders = ", ".join(["(%s, %s)"] * len(rows))
+        params = tuple(value for row in rows for value in row[:2])
+        self.search_index.reindex(cursor, f"is_deleted = 0 AND (type_id, serial_number) IN ({placeholders})", params)
+
     @log_and_handle_errors("Adding equipment")
     def add_equipment(self, equipment_list: List[Dict[str, str]]) -> Tuple[bool, str]:
         """
         Добавление нового оборудования в базу данных.
+        Вся пачка валидируется заранее, уникальность проверяется set-based запросом,
+        а записи вставляются многострочными INSERT по BULK_CHUNK_SIZE строк.
 
         :param equipment_list: Список словарей с данными оборудования.
         :return: Кортеж (True, сообщение) при успешном добавлении, иначе (False, сообщение об ошибке).
         """
-        errors = []
+        if isinstance(equipment_list, dict):
+            equipment_list = [equipment_list]
+
+        errors: List[Tuple[int, str]] = []
+        accepted = self._validate_equipment_batch(equipment_list, errors)
         success_count = 0
 
-        with self.db.transaction_manager.transaction_context() as connection:
-            for equipment in equipment_list:
-                try:
-                    validated_data = EquipmentListInput.parse_obj(equipment).root
-                except ValidationError as e:
-                    errors.append(f"Validation error: {e}")
-                    continue
+        if accepted:
+            with self.db.transaction_manager.transaction_context() as connection:
+                with connection.cursor() as cursor:
+                    success_count = self._insert_equipment_batch(cursor, accepted, errors)
 
-                type_id = getattr(validated_data, "type_id", None)
-                serial_number = getattr(validated_data, "serial_number", None)
-                note = getattr(validated_data, "note", "")
+        # Сообщения об ошибках выводятся в порядке записей во входных данных
+        messages = [msg for _, msg in sorted(errors, key=lambda error: error[0])]
+        if messages and success_count == 0:
+            return False, f"All records failed to add: {', '.join(messages)}"
+        elif messages:
+            return True, f"Added {success_count} equipment(s), but some records failed: {', '.join(messages)}"
+        else:
+            return True, "All equipment records added successfully"
 
-                if type_id is None or serial_number is None:
-                    errors.append("type_id and serial_number are required fields.")
-                    continue
+    def import_equipment_stream(
+        self,
+        lines: Iterable[Union[bytes, str]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Union[int, List, bool, str]]]:
+        """
+        Потоковый импорт оборудования из NDJSON (один JSON-объект на строку).
+        Строки читаются по мере поступления, каждая пачка из chunk_size записей
+        валидируется, вставляется и фиксируется в отдельной транзакции.
 
-                # Валидация серийного номера по маске типа оборудования
-                is_valid, msg = self._validate_serial_by_type(type_id, serial_number)
-                if not is_valid:
-                    errors.append(msg)
-                    continue
+        :param lines: Итератор строк NDJSON.
+        :param chunk_size: Количество записей в одной транзакции.
+        :return: Итератор отчётов по пачкам и итоговый отчёт (summary = True).
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be greater than 0.")
 
-                # Проверка уникальности связки type_id + serial_number
-                if not self._is_unique_equipment(type_id, serial_number):
-                    errors.append(f"Serial number '{serial_number}' already exists for type_id {type_id}")
-                    continue
+        totals = {"inserted": 0, "failed": 0, "chunks": 0}
+        # Элементы пачки: (номер строки, запись, ошибка разбора JSON)
+        chunk: List[Tuple[int, Optional[Dict], Optional[str]]] = []
+        line_number = 0
+        for line_number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            try:
+                chunk.append((line_number, json.loads(line), None))
+            except ValueError as e:
+                chunk.append((line_number, None, f"Invalid JSON: {e}"))
+            if len(chunk) >= chunk_size:
+                yield self._import_chunk(chunk, totals)
+                chunk = []
+        if chunk:
+            yield self._import_chunk(chunk, totals)
 
-                # Добавление записи
-                insert_query = "INSERT INTO equipment (type_id, serial_number, note, is_deleted) VALUES (%s, %s, %s, %s)"
-                connection.cursor().execute(insert_query, (type_id, serial_number, note, False))
-                success_count += 1
+        logger.info(f"Equipment import finished: {totals}")
+        yield {"summary": True, "lines": line_number, **totals}
 
-        if errors and success_count == 0:
-            return False, f"All records failed to add: {', '.join(errors)}"
-        elif errors:
-            return True, f"Added {success_count} equipment(s), but some records failed: {', '.join(errors)}"
-        else:
-            return True, "All equipment records added successfully"
+    def _import_chunk(
+        self,
+        chunk: List[Tuple[int, Optional[Dict], Optional[str]]],
+        totals: Dict[str, int]
+    ) -> Dict[str, Union[int, List, str]]:
+        """
+        Валидирует и вставляет одну пачку импорта в отдельной транзакции.
+
+        :param chunk: Кортежи (номер строки, запись, ошибка разбора JSON).
+        :param totals: Накопительные счётчики импорта.
+        :return: Отчёт по пачке.
+        """
+        totals["chunks"] += 1
+        report = {
+            "chunk": totals["chunks"],
+            "first_line": chunk[0][0],
+            "last_line": chunk[-1][0],
+            "inserted": 0,
+            "errors": [],
+        }
+        # Позиции в errors и accepted — индексы записей внутри пачки
+        errors: List[Tuple[int, str]] = []
+        records: List[Tuple[int, Dict]] = []
+        for index, (_, record, parse_error) in enumerate(chunk):
+            if parse_error is not None:
+                errors.append((index, parse_error))
+            else:
+                records.append((index, record))
+
+        validation_errors: List[Tuple[int, str]] = []
+        accepted = [
+            (records[position][0], type_id, serial_number, note)
+            for position, type_id, serial_number, note
+            in self._validate_equipment_batch([record for _, record in records], validation_errors)
+        ]
+        errors.extend((records[position][0], msg) for position, msg in validation_errors)
+
+        if accepted:
+            errors_before_insert = len(errors)
+            try:
+                with self.db.transaction_manager.transaction_context() as connection:
+                    with connection.cursor() as cursor:
+                        report["inserted"] = self._insert_equipment_batch(cursor, accepted, errors)
+            except Exception as e:
+                logger.error(f"Import chunk {report['chunk']} failed and was rolled back: {e}", exc_info=True)
+                report["error"] = f"Chunk rolled back: {e}"
+                del errors[errors_before_insert:]
+                errors.extend((index, "Not inserted: chunk rolled back") for index, _, _, _ in accepted)
+
+        report["errors"] = [
+            {"line": chunk[index][0], "error": msg} for index, msg in sorted(errors, key=lambda error: error[0])
+        ]
+        totals["inserted"] += report["inserted"]
+        totals["failed"] += len(report["errors"])
+        return report
 
     @log_and_handle_errors("Fetching all equipment")
     def get_all_equipment(
@@ -161,21 +470,203 @@ class EquipmentService:
         :param filters: Словарь с фильтрами (type_id, serial_number, note).
         :return: Список оборудования.
         """
-        base_query = "SELECT id, type_id, serial_number, note, is_deleted FROM equipment WHERE is_deleted = 0"
+        conditions, params = self._build_equipment_filters(filters)
+        base_query = "SELECT id, type_id, serial_number, note, is_deleted FROM equipment WHERE " + " AND ".join(conditions)
+        return self._paginate_query(base_query, page, limit, params)
+
+    @log_and_handle_errors("Fetching equipment by cursor")
+    def get_equipment_by_cursor(
+        self,
+        cursor: Optional[str],
+        limit: int,
+        filters: Optional[Dict[str, Union[str, int]]] = None
+    ) -> Dict[str, Union[List, Optional[str]]]:
+        """
+        Получение списка оборудования с keyset-пагинацией и поиском по фильтрам.
+        В отличие от OFFSET стоимость запроса не растёт с номером страницы,
+        а вставка новых записей не приводит к пропускам и дублям.
+
+        :param cursor: Курсор из предыдущего ответа (пустая строка для первой страницы).
+        :param limit: Лимит записей на странице.
+        :param filters: Словарь с фильтрами (type_id, serial_number, note).
+        :return: Словарь с оборудованием (items) и курсором следующей страницы (next_cursor).
+        """
+        conditions, params = self._build_equipment_filters(filters)
+        base_query = "SELECT id, type_id, serial_number, note, is_deleted FROM equipment"
+        return self._keyset_paginate_query(base_query, conditions, cursor, limit, params)
+
+    @log_and_handle_errors("Fetching equipment list version")
+    def get_equipment_list_version(self, filters: Optional[Dict[str, Union[str, int]]] = None) -> str:
+        """
+        Возвращает версию списка оборудования для заданных фильтров.
+        Версия строится по агрегату COUNT(*) + MAX(updated_at) (индекс
+        idx_equipment_deleted_updated_at), который значительно дешевле полного
+        запроса списка и меняется при любом изменении, удалении или добавлении
+        записи, попадающей под фильтры.
+
+        :param filters: Словарь с фильтрами (type_id, serial_number, note).
+        :return: Строка версии.
+        """
+        conditions, params = self._build_equipment_filters(filters)
+        query = "SELECT COUNT(*) AS total, MAX(updated_at) AS last_updated FROM equipment WHERE " + " AND ".join(conditions)
+        result = self.db.execute(query, params, fetchone=True, read_only=True) or {}
+        return f"{result.get('total', 0)}:{result.get('last_updated')}"
+
+    @log_and_handle_errors("Fetching equipment types version")
+    def get_equipment_types_version(self) -> str:
+        """
+        Возвращает версию списка типов оборудования (COUNT(*) + MAX(updated_at)).
+
+        :return: Строка версии.
+        """
+        query = "SELECT COUNT(*) AS total, MAX(updated_at) AS last_updated FROM equipment_type"
+        result = self.db.execute(query, fetchone=True, read_only=True) or {}
+        return f"{result.get('total', 0)}:{result.get('last_updated')}"
+
+    def pinned_reads(self):
+        """
+        Контекстный менеджер: чтения внутри него выполняются на одном пуле
+        (реплике или primary), поэтому версия списка и страница согласованы.
+        """
+        return self.db.transaction_manager.pinned_reads()
+
+    @log_and_handle_errors("Fetching equipment total")
+    def get_equipment_total(self, filters: Optional[Dict[str, Union[str, int]]] = None) -> Tuple[int, bool]:
+        """
+        Возвращает количество записей, попадающих под фильтры.
+        Без фильтров и с фильтром только по type_id количество читается из счётчиков
+        equipment_type_counter и точно. Для текстовых фильтров (serial_number, note)
+        выполняется COUNT(*), результат кэшируется на APPROXIMATE_COUNT_TTL секунд,
+        поэтому может немного отставать от данных.
+
+        :param filters: Словарь с фильтрами (type_id, serial_number, note).
+        :return: Кортеж (количество, True если количество точное).
+        """
+        filters = filters or {}
+        if not any(field in filters for field in ("serial_number", "note")):
+            type_id = filters.get("type_id")
+            return self.counters.total(self.db, int(type_id) if type_id is not None else None), True
+
+        key = "count:" + json.dumps(filters, sort_keys=True, default=str)
+        total = self.count_cache.get(key)
+        if total is MISSING:
+            conditions, params = self._build_equipment_filters(filters)
+            query = "SELECT COUNT(*) AS total FROM equipment WHERE " + " AND ".join(conditions)
+            result = self.db.execute(query, params, fetchone=True, read_only=True) or {}
+            total = int(result.get("total", 0))
+            self.count_cache.set(key, total)
+        return total, False
+
+    def reconcile_equipment_counters(self) -> Dict[int, Dict[str, int]]:
+        """
+        Сверяет счётчики equipment_type_counter с фактическим количеством записей.
+        Каждый тип подсчитывается без блокировок, а расхождение исправляется
+        отдельной короткой транзакцией, поэтому запись в оборудование не ждёт подсчёта.
+        Вызывается периодически (см. main.py), поэтому ошибки базы данных логируются,
+        а не выбрасываются: сверка повторится при следующем запуске.
+
+        :return: Расхождения {type_id: {"stored": значение счётчика, "actual": фактическое количество}}.
+        """
+        drift: Dict[int, Dict[str, int]] = {}
+        try:
+            type_ids = [row["id"] for row in self.db.execute("SELECT id FROM equipment_type", fetchall=True) or []]
+        except mysql.connector.Error as e:
+            logger.error(f"Equipment counter reconciliation failed: {e}")
+            return drift
+        for type_id in type_ids:
+            try:
+                with self.db.transaction_manager.transaction_context() as connection:
+                    with connection.cursor() as cursor:
+                        stored, actual = self.counters.measure_type(cursor, type_id)
+                if stored != actual:
+                    # Изменение, а не новое значение: конкурентные изменения после снимка сохраняются
+                    with self.db.transaction_manager.transaction_context() as connection:
+                        with connection.cursor() as cursor:
+                            self.counters.apply(cursor, {type_id: actual - stored})
+            except mysql.connector.Error as e:
+                logger.error(f"Equipment counter reconciliation failed for type_id {type_id}: {e}")
+                continue
+            if stored != actual:
+                drift[type_id] = {"stored": stored, "actual": actual}
+                logger.warning(f"Equipment counter for type_id {type_id} drifted: stored {stored}, actual {actual}.")
+        logger.info(f"Equipment counters reconciled for {len(type_ids)} type(s), {len(drift)} corrected.")
+        return drift
+
+    def _build_equipment_filters(
+        self,
+        filters: Optional[Dict[str, Union[str, int]]]
+    ) -> Tuple[List[str], Tuple]:
+        """
+        Формирует условия WHERE для списка оборудования.
+
+        :param filters: Словарь с фильтрами (type_id, serial_number, note).
+        :return: Кортеж (список условий, параметры).
+        """
+        conditions = ["is_deleted = 0"]
         params = []
 
         if filters:
             if "type_id" in filters:
-                base_query += " AND type_id = %s"
+                conditions.append("type_id = %s")
                 params.append(filters["type_id"])
-            if "serial_number" in filters:
-                base_query += " AND serial_number LIKE %s"
-                params.append(f"%{filters['serial_number']}%")
-            if "note" in filters:
-                base_query += " AND note LIKE %s"
-                params.append(f"%{filters['note']}%")
+            for field in ("serial_number", "note"):
+                if field not in filters:
+                    continue
+                value = str(filters[field])
+                # Кандидаты из триграммного индекса, затем точная проверка LIKE
+                candidates = self.search_index.candidate_condition(field, value)
+                if candidates:
+                    conditions.append(candidates[0])
+                    params.extend(candidates[1])
+                conditions.append(f"{field} LIKE %s ESCAPE '!'")
+                params.append(f"%{escape_like(value)}%")
+
+        return conditions, tuple(params)
+
+    def stream_equipment(
+        self,
+        filters: Optional[Dict[str, Union[str, int]]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Tuple]]:
+        """
+        Потоковая выгрузка оборудования пачками.
+        Используется небуферизованный курсор на соединении для чтения, поэтому
+        в памяти одновременно находится не больше batch_size строк. Если итератор
+        закрыт до конца выгрузки, соединение закрывается, а не возвращается в пул.
 
-        return self._paginate_query(base_query, page, limit, tuple(params))
+        :param filters: Словарь с фильтрами (type_id, serial_number, note).
+        :param batch_size: Количество строк в одной пачке.
+        :return: Итератор пачек кортежей в порядке EXPORT_FIELDS.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be greater than 0.")
+        conditions, params = self._build_equipment_filters(filters)
+        query = (
+            f"SELECT {', '.join(self.EXPORT_FIELDS)} FROM equipment "
+            f"WHERE {' AND '.join(conditions)} ORDER BY id"
+        )
+        exported, finished = 0, False
+        with self.db.transaction_manager.read_context() as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    exported += len(rows)
+                    yield rows
+                finished = True
+            finally:
+                if finished:
+                    cursor.close()
+                    logger.info(f"Equipment export finished: {exported} row(s) streamed.")
+                else:
+                    # Выгрузка прервана (например, клиент отключился): непрочитанный результат
+                    # небуферизованного курсора не даёт закрыть курсор и переиспользовать
+                    # соединение, поэтому оно закрывается, а не возвращается в пул
+                    connection.discard()
+                    logger.warning(f"Equipment export interrupted after {exported} row(s).")
 
     @log_and_handle_errors("Fetching equipment by ID")
     def get_equipment_by_id(self, equipment_id: int) -> Optional[Dict[str, Union[int, str]]]:
@@ -185,8 +676,72 @@ class EquipmentService:
         :param equipment_id: ID оборудования.
         :return: Словарь с данными оборудования или None, если запись не найдена.
         """
-        query = "SELECT id, type_id, serial_number, note, is_deleted FROM equipment WHERE id = %s"
-        return self.db.execute(query, (equipment_id,), fetchone=True)
+        cache_key = self._equipment_cache_key(equipment_id)
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
+        # Поколение до чтения: если запись инвалидируется во время чтения, результат не кэшируется
+        generation = self.cache.generation()
+        query = "SELECT id, type_id, serial_number, note, is_deleted, version FROM equipment WHERE id = %s"
+        result = self.db.execute(query, (equipment_id,), fetchone=True, read_only=True)
+        # Отсутствующие записи не кэшируются, чтобы новые записи были видны сразу.
+        # Чтения с реплики тоже: отстающая реплика вернула бы в общий кэш версию до записи,
+        # и её увидела бы сессия, которая эту запись сделала.
+        if result and not self.db.transaction_manager.last_read_from_replica():
+            self.cache.set(cache_key, result, generation)
+        return result
+
+    @log_and_handle_errors("Fetching equipment by IDs")
+    def get_equipment_by_ids(self, equipment_ids: List[int]) -> List[Dict[str, Union[int, str, bool]]]:
+        """
+        Получение оборудования по списку ID.
+        Записи, отсутствующие в кэше, читаются запросами WHERE id IN (...) пачками
+        по BULK_CHUNK_SIZE через путь чтения без транзакции.
+
+        :param equipment_ids: Список ID оборудования.
+        :return: Записи в порядке запроса; для отсутствующих ID — {"id": ID, "not_found": True}.
+        """
+        found: Dict[int, Dict[str, Union[int, str]]] = {}
+        missing: List[int] = []
+        for equipment_id in dict.fromkeys(equipment_ids):
+            cached = self.cache.get(self._equipment_cache_key(equipment_id))
+            if cached is not MISSING:
+                found[equipment_id] = cached
+            else:
+                missing.append(equipment_id)
+
+        for chunk in _chunks(missing, BULK_CHUNK_SIZE):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            query = f"SELECT id, type_id, serial_number, note, is_deleted, version FROM equipment WHERE id IN ({placeholders})"
+            generation = self.cache.generation()
+            rows = self.db.execute(query, tuple(chunk), fetchall=True, read_only=True) or []
+            cacheable = not self.db.transaction_manager.last_read_from_replica()
+            for row in rows:
+                found[row["id"]] = row
+                if cacheable:
+                    self.cache.set(self._equipment_cache_key(row["id"]), row, generation)
+
+        return [found.get(equipment_id, {"id": equipment_id, "not_found": True}) for equipment_id in equipment_ids]
+
+    @staticmethod
+    def _equipment_cache_key(equipment_id: int) -> str:
+        return f"equipment:{equipment_id}"
+
+    def _invalidate_equipment_cache(self, equipment_ids: List[int]):
+        """
+        Удаляет записи оборудования из кэша. Вызывается после фиксации транзакции.
+
+        :param equipment_ids: Список ID оборудования.
+        """
+        for equipment_id in equipment_ids:
+            self.cache.delete(self._equipment_cache_key(equipment_id))
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики кэша записей оборудования (hits, misses, evictions и т.д.).
+        """
+        return self.cache.stats()
 
     @log_and_handle_errors("Checking if equipment exists")
     def _check_equipment_exists(self, equipment_id: int, check_deleted: bool = False) -> bool:
@@ -205,35 +760,14 @@ class EquipmentService:
     def update_equipment(self, equipment_id: int, data: Dict[str, Union[int, str]]) -> Tuple[bool, str]:
         """
         Обновление данных оборудования по ID с валидацией.
+        Проверка существования, чтение текущей записи, проверка уникальности и UPDATE
+        выполняются в одной транзакции на одном соединении; строка блокируется
+        SELECT ... FOR UPDATE до фиксации.
 
         :param equipment_id: ID оборудования.
         :param data: Словарь с данными для обновления.
         :return: Кортеж (True, сообщение) при успешном обновлении.
         """
-        if not self._check_equipment_exists(equipment_id, check_deleted=False):
-            logger.error(f"Equipment with ID '{equipment_id}' does not exist or has been deleted.")
-            return False, f"Equipment with ID '{equipment_id}' does not exist or has been deleted."
-
-        # Получаем текущие значения type_id и serial_number
-        current = self.db.execute(
-            "SELECT type_id, serial_number FROM equipment WHERE id = %s", (equipment_id,), fetchone=True
-        )
-        if not current:
-            return False, f"Equipment with ID '{equipment_id}' not found."
-
-        # Определяем новые значения для проверки
-        new_type_id = data.get("type_id", current["type_id"])
-        new_serial_number = data.get("serial_number", current["serial_number"])
-
-        # Валидация серийного номера по маске типа оборудования
-        is_valid, msg = self._validate_serial_by_type(new_type_id, new_serial_number)
-        if not is_valid:
-            return False, msg
-
-        # Проверка уникальности связки type_id + serial_number (исключая текущую запись)
-        if not self._is_unique_equipment(new_type_id, new_serial_number, exclude_id=equipment_id):
-            return False, f"Serial number '{new_serial_number}' already exists for type_id {new_type_id}"
-
         # Формируем запрос на обновление только разрешённых полей
         allowed_fields = {"type_id", "serial_number", "note"}
         update_fields = {k: v for k, v in data.items() if k in allowed_fields}
@@ -241,9 +775,42 @@ class EquipmentService:
             return False, "No valid fields to update."
 
         set_clause = ", ".join([f"{key} = %s" for key in update_fields.keys()])
-        query = f"UPDATE equipment SET {set_clause} WHERE id = %s"
+        query = f"UPDATE equipment SET {set_clause}, version = version + 1 WHERE id = %s"
         params = tuple(update_fields.values()) + (equipment_id,)
-        self.db.execute(query, params, commit=True)
+        with self.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                # Проверка существования и получение текущих type_id и serial_number с блокировкой строки
+                cursor.execute(
+                    "SELECT type_id, serial_number FROM equipment WHERE id = %s AND is_deleted = 0 FOR UPDATE",
+                    (equipment_id,)
+                )
+                current = cursor.fetchone()
+                if not current:
+                    logger.error(f"Equipment with ID '{equipment_id}' does not exist or has been deleted.")
+                    return False, f"Equipment with ID '{equipment_id}' does not exist or has been deleted."
+
+                # Определяем новые значения для проверки
+                current_type_id, current_serial_number = current[0], current[1]
+                new_type_id = update_fields.get("type_id", current_type_id)
+                new_serial_number = update_fields.get("serial_number", current_serial_number)
+
+                # Валидация серийного номера по маске типа оборудования (без обращения к базе)
+                is_valid, msg = self._validate_serial_by_type(new_type_id, new_serial_number)
+                if not is_valid:
+                    return False, msg
+
+                # Проверка уникальности нужна, только если связка type_id + serial_number меняется
+                key_changed = (new_type_id, str(new_serial_number).lower()) != \
+                    (current_type_id, str(current_serial_number).lower())
+                if key_changed and not self._is_unique_equipment(
+                        cursor, new_type_id, new_serial_number, exclude_id=equipment_id):
+                    return False, f"Serial number '{new_serial_number}' already exists for type_id {new_type_id}"
+
+                cursor.execute(query, params)
+                self.search_index.reindex(cursor, "id = %s", (equipment_id,))
+                if new_type_id != current_type_id:
+                    self.counters.apply(cursor, {current_type_id: -1, new_type_id: 1})
+        self._invalidate_equipment_cache([equipment_id])
 
         return True, f"Equipment with ID '{equipment_id}' updated successfully"
 
@@ -251,19 +818,246 @@ class EquipmentService:
     def soft_delete_equipment(self, equipment_id: int) -> Tuple[bool, str]:
         """
         Мягкое удаление оборудования (установка is_deleted = True).
+        Строка блокируется SELECT ... FOR UPDATE, поэтому счётчик типа
+        уменьшается ровно один раз даже при конкурентном удалении.
 
         :param equipment_id: ID оборудования.
         :return: Кортеж (True, сообщение) при успешном удалении.
         """
-        if not self._check_equipment_exists(equipment_id, check_deleted=False):
-            logger.error(f"Equipment with ID '{equipment_id}' does not exist or has been deleted.")
-            return False, f"Equipment with ID '{equipment_id}' does not exist или has been deleted."
-
-        query = "UPDATE equipment SET is_deleted = %s WHERE id = %s"
-        self.db.execute(query, (True, equipment_id), commit=True)
+        query = "UPDATE equipment SET is_deleted = %s, version = version + 1 WHERE id = %s"
+        with self.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT type_id FROM equipment WHERE id = %s AND is_deleted = 0 FOR UPDATE", (equipment_id,)
+                )
+                current = cursor.fetchone()
+                if not current:
+                    logger.error(f"Equipment with ID '{equipment_id}' does not exist or has been deleted.")
+                    return False, f"Equipment with ID '{equipment_id}' does not exist или has been deleted."
+                cursor.execute(query, (True, equipment_id))
+                self.search_index.remove(cursor, [equipment_id])
+                self.counters.apply(cursor, {current[0]: -1})
+        self._invalidate_equipment_cache([equipment_id])
 
         return True, f"Equipment with ID '{equipment_id}' soft deleted successfully"
 
+    @staticmethod
+    def _bulk_report(results: List[Dict[str, Union[int, str]]], status: str) -> Dict[str, Union[int, List]]:
+        """
+        Формирует итоговый отчёт пакетной операции.
+
+        :param results: Результаты по каждому ID в порядке запроса.
+        :param status: Статус успешно обработанной записи.
+        :return: Словарь с результатами и счётчиками.
+        """
+        succeeded = sum(1 for result in results if result["status"] == status)
+        return {"results": results, status: succeeded, "failed": len(results) - succeeded}
+
+    @log_and_handle_errors("Bulk updating equipment")
+    def bulk_update_equipment(self, items: List[Dict]) -> Dict[str, Union[int, List]]:
+        """
+        Пакетное обновление оборудования.
+        Записи обрабатываются пачками по BULK_CHUNK_SIZE, каждая пачка — в отдельной транзакции:
+        один SELECT ... FOR UPDATE по всем ID пачки, одна проверка уникальности и один
+        UPDATE с выражениями CASE.
+
+        :param items: Список словарей {"id": ID, "fields": {изменяемые поля}}.
+        :return: Отчёт {"results": [{"id", "status", "error"}], "updated", "failed"}.
+        """
+        if not isinstance(items, list) or not items:
+            raise ValueError("Request body must be a non-empty list of {\"id\", \"fields\"} objects.")
+        results: List[Optional[Dict[str, Union[int, str]]]] = [None] * len(items)
+        valid: List[Tuple[int, int, Dict]] = []
+        seen_ids = set()
+        for position, item in enumerate(items):
+            try:
+                parsed = EquipmentBulkUpdateItem.model_validate(item)
+            except ValidationError as e:
+                item_id = item.get("id") if isinstance(item, dict) else None
+                results[position] = {"id": item_id, "status": "error", "error": f"Validation error: {e}"}
+                continue
+            # type_id и serial_number не могут быть сброшены в NULL
+            fields = {
+                key: value for key, value in parsed.fields.model_dump(exclude_unset=True).items()
+                if value is not None or key == "note"
+            }
+            if not fields:
+                results[position] = {"id": parsed.id, "status": "error", "error": "No valid fields to update."}
+            elif parsed.id in seen_ids:
+                results[position] = {"id": parsed.id, "status": "error", "error": "Duplicate id in request."}
+            else:
+                seen_ids.add(parsed.id)
+                valid.append((position, parsed.id, fields))
+
+        for chunk in _chunks(valid, BULK_CHUNK_SIZE):
+            try:
+                with self.db.transaction_manager.transaction_context() as connection:
+                    with connection.cursor() as cursor:
+                        updated_ids = self._bulk_update_chunk(cursor, chunk, results)
+            except Exception as e:
+                logger.error(f"Bulk update chunk failed and was rolled back: {e}", exc_info=True)
+                for position, equipment_id, _ in chunk:
+                    results[position] = {"id": equipment_id, "status": "error", "error": "Not updated: chunk rolled back"}
+                continue
+            self._invalidate_equipment_cache(updated_ids)
+
+        return self._bulk_report(results, "updated")
+
+    def _bulk_update_chunk(
+        self,
+        cursor,
+        chunk: List[Tuple[int, int, Dict]],
+        results: List[Optional[Dict[str, Union[int, str]]]]
+    ) -> List[int]:
+        """
+        Обновляет одну пачку записей в рамках открытой транзакции.
+
+        :param cursor: Курсор открытой транзакции.
+        :param chunk: Кортежи (позиция в запросе, ID, изменяемые поля).
+        :param results: Результаты по позициям запроса, заполняются для записей пачки.
+        :return: Список обновлённых ID.
+        """
+        ids = [equipment_id for _, equipment_id, _ in chunk]
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT id, type_id, serial_number FROM equipment WHERE is_deleted = 0 AND id IN ({placeholders}) FOR UPDATE",
+            tuple(ids)
+        )
+        current = {int(row[0]): (int(row[1]), row[2]) for row in cursor.fetchall()}
+
+        # Кортежи (позиция, ID, поля, новая связка type_id + serial_number или None, если она не меняется)
+        candidates = []
+        for position, equipment_id, fields in chunk:
+            if equipment_id not in current:
+                results[position] = {
+                    "id": equipment_id,
+                    "status": "not_found",
+                    "error": f"Equipment with ID '{equipment_id}' does not exist or has been deleted.",
+                }
+                continue
+            current_type_id, current_serial_number = current[equipment_id]
+            new_type_id = fields.get("type_id", current_type_id)
+            new_serial_number = fields.get("serial_number", current_serial_number)
+            is_valid, msg = self._validate_serial_by_type(new_type_id, new_serial_number)
+            if not is_valid:
+                results[position] = {"id": equipment_id, "status": "error", "error": msg}
+                continue
+            new_key = (new_type_id, str(new_serial_number).lower())
+            changed = new_key != (current_type_id, str(current_serial_number).lower())
+            candidates.append((position, equipment_id, fields, new_key if changed else None, new_serial_number))
+
+        existing = self._find_existing_equipment(
+            cursor,
+            [(new_key[0], serial_number) for _, _, _, new_key, serial_number in candidates if new_key],
+            for_update=True
+        )
+        seen = set()
+        accepted: List[Tuple[int, Dict]] = []
+        for position, equipment_id, fields, new_key, serial_number in candidates:
+            if new_key and (new_key in existing or new_key in seen):
+                results[position] = {
+                    "id": equipment_id,
+                    "status": "error",
+                    "error": f"Serial number '{serial_number}' already exists for type_id {new_key[0]}",
+                }
+                continue
+            if new_key:
+                seen.add(new_key)
+            accepted.append((equipment_id, fields))
+            results[position] = {"id": equipment_id, "status": "updated"}
+
+        if not accepted:
+            return []
+
+        set_clauses = []
+        params: List = []
+        for field in ("type_id", "serial_number", "note"):
+            values = [(equipment_id, fields[field]) for equipment_id, fields in accepted if field in fields]
+            if values:
+                whens = " ".join(["WHEN %s THEN %s"] * len(values))
+                set_clauses.append(f"{field} = CASE id {whens} ELSE {field} END")
+                params.extend(value for pair in values for value in pair)
+        updated_ids = [equipment_id for equipment_id, _ in accepted]
+        id_placeholders = ", ".join(["%s"] * len(updated_ids))
+        cursor.execute(
+            f"UPDATE equipment SET {', '.join(set_clauses)}, version = version + 1 WHERE id IN ({id_placeholders})",
+            tuple(params) + tuple(updated_ids)
+        )
+        self.search_index.reindex(cursor, f"id IN ({id_placeholders})", tuple(updated_ids))
+        # Перенос записи в другой тип меняет счётчики обоих типов
+        deltas: Dict[int, int] = {}
+        for equipment_id, fields in accepted:
+            old_type_id = current[equipment_id][0]
+            new_type_id = fields.get("type_id", old_type_id)
+            if new_type_id != old_type_id:
+                deltas[old_type_id] = deltas.get(old_type_id, 0) - 1
+                deltas[new_type_id] = deltas.get(new_type_id, 0) + 1
+        self.counters.apply(cursor, deltas)
+        return updated_ids
+
+    @log_and_handle_errors("Bulk soft deleting equipment")
+    def bulk_soft_delete_equipment(self, data: Dict) -> Dict[str, Union[int, List]]:
+        """
+        Пакетное мягкое удаление оборудования.
+        ID обрабатываются пачками по BULK_CHUNK_SIZE: для каждой пачки в отдельной транзакции
+        выполняются один SELECT ... FOR UPDATE и один UPDATE ... WHERE id IN (...).
+
+        :param data: Словарь {"ids": [ID, ...]}.
+        :return: Отчёт {"results": [{"id", "status", "error"}], "deleted", "failed"}.
+        """
+        try:
+            ids = EquipmentBulkDeleteInput.model_validate(data).ids
+        except ValidationError as e:
+            raise ValueError(f"Validation error: {e}")
+
+        results: List[Optional[Dict[str, Union[int, str]]]] = [None] * len(ids)
+        positions: Dict[int, int] = {}
+        for position, equipment_id in enumerate(ids):
+            if equipment_id in positions:
+                results[position] = {"id": equipment_id, "status": "error", "error": "Duplicate id in request."}
+            else:
+                positions[equipment_id] = position
+
+        for chunk in _chunks(list(positions), BULK_CHUNK_SIZE):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            try:
+                with self.db.transaction_manager.transaction_context() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f"SELECT id, type_id FROM equipment WHERE is_deleted = 0 AND id IN ({placeholders}) FOR UPDATE",
+                            tuple(chunk)
+                        )
+                        rows = cursor.fetchall()
+                        found = [int(row[0]) for row in rows]
+                        if found:
+                            found_placeholders = ", ".join(["%s"] * len(found))
+                            cursor.execute(
+                                f"UPDATE equipment SET is_deleted = %s, version = version + 1 WHERE id IN ({found_placeholders})",
+                                (True,) + tuple(found)
+                            )
+                            self.search_index.remove(cursor, found)
+                            self.counters.apply(cursor, self.counters.deltas((int(row[1]) for row in rows), sign=-1))
+            except Exception as e:
+                logger.error(f"Bulk delete chunk failed and was rolled back: {e}", exc_info=True)
+                for equipment_id in chunk:
+                    results[positions[equipment_id]] = {
+                        "id": equipment_id, "status": "error", "error": "Not deleted: chunk rolled back"
+                    }
+                continue
+            self._invalidate_equipment_cache(found)
+            found_set = set(found)
+            for equipment_id in chunk:
+                if equipment_id in found_set:
+                    results[positions[equipment_id]] = {"id": equipment_id, "status": "deleted"}
+                else:
+                    results[positions[equipment_id]] = {
+                        "id": equipment_id,
+                        "status": "not_found",
+                        "error": f"Equipment with ID '{equipment_id}' does not exist or has been deleted.",
+                    }
+
+        return self._bulk_report(results, "deleted")
+
     def _validate_serial_by_type(self, type_id: int, serial_number: str) -> Tuple[bool, str]:
         """
         Валидация серийного номера по маске типа оборудования.
@@ -272,26 +1066,21 @@ class EquipmentService:
         :param serial_number: Серийный номер.
         :return: (True, '') если валидно, иначе (False, сообщение об ошибке).
         """
-        mask_result = self.db.execute(
-            "SELECT serial_mask FROM equipment_type WHERE id = %s", (type_id,), fetchone=True
-        )
-        if not mask_result:
+        mask = self.mask_registry.get(type_id)
+        if mask is None:
             return False, f"type_id '{type_id}' does not exist"
-        serial_mask = mask_result["serial_mask"]
-        mask_regex = serial_mask \
-            .replace('N', '[0-9]') \
-            .replace('A', '[A-Z]') \
-            .replace('a', '[a-z]') \
-            .replace('X', '[A-Z0-9]') \
-            .replace('Z', '[-_@]')
-        if not re.fullmatch(mask_regex, serial_number):
+        serial_mask, pattern = mask
+        if not pattern.fullmatch(serial_number):
             return False, f"Serial number '{serial_number}' does not match mask '{serial_mask}' for type_id {type_id}"
         return True, ""
 
-    def _is_unique_equipment(self, type_id: int, serial_number: str, exclude_id: Optional[int] = None) -> bool:
+    def _is_unique_equipment(self, cursor, type_id: int, serial_number: str, exclude_id: Optional[int] = None) -> bool:
         """
-        Проверяет уникальность связки type_id + serial_number.
+        Проверяет уникальность связки type_id + serial_number в рамках открытой транзакции.
+        Запрос выполняется как блокирующее чтение, чтобы конкурентная вставка той же
+        связки дождалась фиксации текущей транзакции.
 
+        :param cursor: Курсор открытой транзакции.
         :param type_id: ID типа оборудования.
         :param serial_number: Серийный номер.
         :param exclude_id: Исключить этот ID из проверки (для обновления).
@@ -302,5 +1091,5 @@ class EquipmentService:
         if exclude_id:
             query += " AND id != %s"
             params.append(exclude_id)
-        result = self.db.execute(query, tuple(params), fetchone=True)
-        return result is None
\ No newline at end of file
+        cursor.execute(query + " LIMIT 1 FOR UPDATE", tuple(params))
+        return cursor.fetchone() is None
@@ -0,0 +1,206 @@
+import logging
+import os
+import sys
+import time
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Поля оборудования, по которым строится триграммный индекс
+SEARCH_FIELDS = ("serial_number", "note")
+TRIGRAM_SIZE = 3
+
+
+def extract_trigrams(text: Optional[str]) -> Set[str]:
+    """
+    Возвращает множество триграмм строки без учёта регистра.
+
+    :param text: Исходная строка.
+    :return: Множество триграмм. Для строк короче TRIGRAM_SIZE — пустое множество.
+    """
+    if not text:
+        return set()
+    text = text.lower()
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def escape_like(value: str) -> str:
+    """
+    Экранирует % и _ для LIKE ... ESCAPE '!', чтобы подстрока искалась буквально,
+    как и в триграммном индексе.
+
+    :param value: Искомая подстрока.
+    :return: Подстрока для шаблона LIKE.
+    """
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+class TrigramSearchIndex:
+    """
+    Триграммный индекс для поиска подстроки в serial_number и note.
+
+    Индекс хранится в таблице equipment_search_trigram и обновляется в той же
+    транзакции, что и запись в equipment. Фильтр по подстроке сначала находит
+    кандидатов по индексу, а затем проверяется обычным LIKE только для них.
+    """
+
+    TABLE = "equipment_search_trigram"
+
+    def __init__(self, batch_size: int = 1000):
+        """
+        Инициализация индекса.
+
+        :param batch_size: Количество строк индекса в одном многострочном INSERT.
+        """
+        self.batch_size = batch_size
+
+    def candidate_condition(self, field: str, value: str) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+        """
+        Формирует условие WHERE, ограничивающее выборку кандидатами из индекса.
+
+        :param field: Поле поиска (serial_number или note).
+        :param value: Искомая подстрока.
+        :return: Кортеж (условие, параметры) или None, если подстрока слишком короткая для индекса.
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Field '{field}' is not indexed for search")
+        trigrams = sorted(extract_trigrams(value))
+        if not trigrams:
+            return None
+        placeholders = ", ".join(["%s"] * len(trigrams))
+        condition = (
+            f"id IN (SELECT equipment_id FROM {self.TABLE} "
+            f"WHERE field = %s AND trigram IN ({placeholders}) "
+            "GROUP BY equipment_id HAVING COUNT(DISTINCT trigram) = %s)"
+        )
+        return condition, (field, *trigrams, len(trigrams))
+
+    def remove(self, cursor, equipment_ids: Sequence[int]):
+        """
+        Удаляет записи индекса для указанного оборудования.
+
+        :param cursor: Курсор открытой транзакции.
+        :param equipment_ids: Список ID оборудования.
+        """
+        if not equipment_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(equipment_ids))
+        cursor.execute(f"DELETE FROM {self.TABLE} WHERE equipment_id IN ({placeholders})", tuple(equipment_ids))
+
+    def add(self, cursor, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> int:
+        """
+        Добавляет в индекс триграммы записей оборудования.
+
+        :param cursor: Курсор открытой транзакции.
+        :param rows: Кортежи (id, serial_number, note).
+        :return: Количество добавленных строк индекса.
+        """
+        insert_query = f"INSERT IGNORE INTO {self.TABLE} (field, trigram, equipment_id) VALUES (%s, %s, %s)"
+        batch = []
+        total = 0
+        for equipment_id, serial_number, note in rows:
+            for field, text in zip(SEARCH_FIELDS, (serial_number, note)):
+                batch.extend((field, trigram, equipment_id) for trigram in extract_trigrams(text))
+            if len(batch) >= self.batch_size:
+                cursor.executemany(insert_query, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_query, batch)
+            total += len(batch)
+        return total
+
+    def reindex(self, cursor, condition: str, params: Tuple[Any, ...] = ()):
+        """
+        Перестраивает индекс для записей equipment, удовлетворяющих условию.
+        Удалённые записи (is_deleted = 1) из индекса исключаются.
+
+        :param cursor: Курсор открытой транзакции (возвращающий кортежи).
+        :param condition: Условие WHERE для выборки из equipment.
+        :param params: Параметры условия.
+        """
+        cursor.execute(f"SELECT id, serial_number, note, is_deleted FROM equipment WHERE {condition}", params)
+        rows = cursor.fetchall()
+        self.remove(cursor, [row[0] for row in rows])
+        self.add(cursor, [(row[0], row[1], row[2]) for row in rows if not row[3]])
+
+    def rebuild(self, connection, batch_size: int = 10000) -> int:
+        """
+        Полностью перестраивает индекс по таблице equipment.
+        Индекс заменяется по диапазонам ID: для каждой keyset-пачки записи equipment
+        читаются с блокировкой, а записи индекса диапазона удаляются и добавляются
+        заново в одной транзакции. Поиск во время перестроения видит полный индекс,
+        а параллельные изменения записей не перезаписываются устаревшими данными.
+
+        :param connection: Соединение с базой данных.
+        :param batch_size: Количество записей equipment в одной пачке.
+        :return: Количество проиндексированных записей equipment.
+        """
+        cursor = connection.cursor()
+        try:
+            last_id = 0
+            indexed = 0
+            while True:
+                if not connection.in_transaction:
+                    connection.start_transaction()
+                cursor.execute(
+                    "SELECT id, serial_number, note, is_deleted FROM equipment "
+                    "WHERE id > %s ORDER BY id LIMIT %s FOR UPDATE",
+                    (last_id, batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    # Записи индекса для ID после последней записи equipment
+                    cursor.execute(f"DELETE FROM {self.TABLE} WHERE equipment_id > %s", (last_id,))
+                    connection.commit()
+                    break
+                upper_id = rows[-1][0]
+                cursor.execute(
+                    f"DELETE FROM {self.TABLE} WHERE equipment_id > %s AND equipment_id <= %s", (last_id, upper_id)
+                )
+                live_rows = [(row[0], row[1], row[2]) for row in rows if not row[3]]
+                self.add(cursor, live_rows)
+                connection.commit()
+                last_id = upper_id
+                indexed += len(live_rows)
+                logger.info(f"Search index rebuild: {indexed} equipment record(s) indexed.")
+            return indexed
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def main(argv: List[str]):
+    """
+    Точка входа командной строки: python -m Services.search_index rebuild
+    """
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    if len(argv) < 2 or argv[1] != "rebuild":
+        print("Usage: python -m Services.search_index rebuild [batch_size]")
+        return 1
+
+    load_dotenv()
+    db_config = {
+        "host": os.getenv("DB_HOST"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_NAME"),
+    }
+    batch_size = int(argv[2]) if len(argv) > 2 else 10000
+
+    connection = mysql.connector.connect(**db_config)
+    try:
+        started = time.perf_counter()
+        indexed = TrigramSearchIndex().rebuild(connection, batch_size)
+        print(f"Search index rebuilt: {indexed} equipment record(s) in {time.perf_counter() - started:.1f}s")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Соответствие символов маски фрагментам регулярного выражения
+MASK_SYMBOLS: Dict[str, str] = {
+    'N': '[0-9]',
+    'A': '[A-Z]',
+    'a': '[a-z]',
+    'X': '[A-Z0-9]',
+    'Z': '[-_@]',
+}
+
+
+def mask_to_regex(serial_mask: str) -> str:
+    """
+    Преобразует маску серийного номера в регулярное выражение.
+    Символы маски заменяются за один проход, остальные символы экранируются.
+
+    :param serial_mask: Маска серийного номера (например, "NAAZXX").
+    :return: Строка регулярного выражения.
+    """
+    return ''.join(MASK_SYMBOLS.get(symbol, re.escape(symbol)) for symbol in serial_mask)
+
+
+class SerialMaskRegistry:
+    """
+    Потокобезопасный реестр скомпилированных масок серийных номеров по type_id.
+
+    Маски загружаются одним запросом при первом обращении и перечитываются
+    по истечении TTL, при обращении к неизвестному type_id (не чаще, чем раз
+    в min_reload_interval секунд) или после явного вызова invalidate().
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Optional[List[Dict[str, Any]]]],
+        ttl: float = 300.0,
+        min_reload_interval: float = 5.0
+    ):
+        """
+        Инициализация реестра масок.
+
+        :param loader: Функция, возвращающая список словарей с ключами id и serial_mask.
+        :param ttl: Время жизни загруженных масок в секундах.
+        :param min_reload_interval: Минимальный интервал между перезагрузками при промахе.
+        """
+        self._loader = loader
+        self._ttl = ttl
+        self._min_reload_interval = min_reload_interval
+        self._lock = threading.Lock()
+        self._patterns: Dict[int, Tuple[str, Pattern[str]]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _is_stale(self, now: float) -> bool:
+        return self._loaded_at is None or now - self._loaded_at >= self._ttl
+
+    def _reload(self, now: float):
+        """
+        Перечитывает все маски из источника и компилирует их.
+        Вызывается под блокировкой.
+        """
+        rows = self._loader() or []
+        patterns = {}
+        for row in rows:
+            serial_mask = row["serial_mask"]
+            patterns[int(row["id"])] = (serial_mask, re.compile(mask_to_regex(serial_mask)))
+        self._patterns = patterns
+        self._loaded_at = now
+        logger.info(f"Serial mask registry loaded {len(patterns)} mask(s).")
+
+    def _snapshot(self, type_id: Optional[int] = None) -> Dict[int, Tuple[str, Pattern[str]]]:
+        """
+        Возвращает актуальный словарь масок, при необходимости перезагружая его.
+
+        :param type_id: type_id, который должен присутствовать в реестре.
+        """
+        now = time.monotonic()
+        patterns = self._patterns
+        missing = type_id is not None and type_id not in patterns
+        if not self._is_stale(now) and not missing:
+            return patterns
+
+        with self._lock:
+            now = time.monotonic()
+            if self._is_stale(now):
+                self._reload(now)
+            elif type_id is not None and type_id not in self._patterns \
+                    and now - self._loaded_at >= self._min_reload_interval:
+                self._reload(now)
+            return self._patterns
+
+    def get(self, type_id: int) -> Optional[Tuple[str, Pattern[str]]]:
+        """
+        Возвращает маску и скомпилированный шаблон для типа оборудования.
+
+        :param type_id: ID типа оборудования.
+        :return: Кортеж (маска, шаблон) или None, если тип не найден.
+        """
+        try:
+            type_id = int(type_id)
+        except (TypeError, ValueError):
+            return None
+        return self._snapshot(type_id).get(type_id)
+
+    def items(self) -> List[Tuple[int, str, Pattern[str]]]:
+        """
+        Возвращает все загруженные маски в виде списка (type_id, маска, шаблон).
+        """
+        return [(type_id, mask, pattern) for type_id, (mask, pattern) in self._snapshot().items()]
+
+    def invalidate(self):
+        """
+        Сбрасывает реестр. Следующее обращение перечитает маски из источника.
+        Вызывается при изменении таблицы equipment_type.
+        """
+        with self._lock:
+            self._loaded_at = None
+        logger.info("Serial mask registry invalidated.")
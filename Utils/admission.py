@@ -0,0 +1,330 @@
+import logging
+import math
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import cherrypy
+from Utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Классы запросов
+READ, WRITE, BULK = "read", "write", "bulk"
+# Последние сегменты пути пакетных и потоковых операций
+BULK_RESOURCES = ("import", "export", "bulk_delete")
+# Ресурсы, которые принимают POST, но только читают данные
+READ_RESOURCES = ("batch",)
+# Ресурсы без ограничений: сбор метрик не должен отбрасываться при перегрузке
+EXEMPT_RESOURCES = ("metrics",)
+# Изменяющие запросы с телом больше этого размера (байт) или неизвестной длины (chunked)
+# относятся к bulk: например, POST /api/equipment со списком из тысяч записей
+BULK_BODY_SIZE = 16 * 1024
+
+REJECTED = REGISTRY.counter(
+    "http_requests_rejected_total", "Requests rejected by admission control.", ("class", "reason")
+)
+
+
+class AdmissionRejected(cherrypy.HTTPError):
+    """
+    HTTPError с заголовком Retry-After. CherryPy удаляет Retry-After при формировании
+    страницы ошибки (clean_headers), поэтому заголовок выставляется после неё.
+    """
+
+    def __init__(self, status: int, message: str, retry_after: int):
+        super().__init__(status, message)
+        self.retry_after = retry_after
+
+    def set_response(self):
+        super().set_response()
+        cherrypy.serving.response.headers["Retry-After"] = str(self.retry_after)
+
+
+class AdmissionClass:
+    """
+    Ограничение количества одновременно обрабатываемых запросов одного класса.
+
+    Запросы сверх limit ждут в очереди не дольше queue_timeout секунд. Если очередь
+    заполнена или ожидаемое время ожидания (по скользящему среднему длительности
+    обработки) больше queue_timeout, запрос отклоняется сразу, не занимая поток.
+    Новые запросы не обгоняют ожидающих: пока очередь не пуста, они встают в неё.
+    """
+
+    # Вес последнего измерения в скользящем среднем длительности обработки
+    SMOOTHING = 0.2
+
+    def __init__(self, name: str, limit: int, queue_size: int = 50, queue_timeout: float = 1.0):
+        """
+        :param name: Имя класса (read, write, bulk).
+        :param limit: Максимум одновременно обрабатываемых запросов.
+        :param queue_size: Максимум запросов в очереди ожидания.
+        :param queue_timeout: Максимальное время ожидания в очереди, секунды.
+        """
+        if limit < 1 or queue_size < 0 or queue_timeout < 0:
+            raise ValueError("limit must be positive, queue_size and queue_timeout must not be negative.")
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._service_time = 0.0
+        self._admitted = 0
+        self._rejected = 0
+
+    def _expected_wait(self) -> float:
+        # Запросы из очереди обслуживаются волнами по limit штук
+        return math.ceil((self._waiting + 1) / self.limit) * self._service_time
+
+    def _reject(self) -> int:
+        self._rejected += 1
+        return max(1, math.ceil(self._expected_wait()))
+
+    def acquire(self) -> Optional[int]:
+        """
+        Занимает слот для запроса, при необходимости ожидая в очереди.
+
+        :return: None, если запрос допущен, иначе рекомендуемая пауза перед повтором (секунды).
+        """
+        with self._condition:
+            if self._in_flight < self.limit and not self._waiting:
+                self._in_flight += 1
+                self._admitted += 1
+                return None
+            if self._waiting >= self.queue_size or self._expected_wait() > self.queue_timeout:
+                return self._reject()
+            self._waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._reject()
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+            self._admitted += 1
+            return None
+
+    def release(self, duration: float):
+        """
+        Освобождает слот и передаёт его первому ожидающему.
+
+        :param duration: Длительность обработки запроса, секунды.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if self._service_time:
+                self._service_time += self.SMOOTHING * (duration - self._service_time)
+            else:
+                self._service_time = duration
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "service_time": self._service_time,
+            }
+
+
+class TokenRateLimiter:
+    """
+    Ограничение частоты запросов по токену (token bucket): rate запросов в секунду
+    в среднем и не больше burst подряд. Хранится не больше max_keys последних
+    токенов, давно не встречавшиеся вытесняются.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, max_keys: int = 10000):
+        """
+        :param rate: Средняя допустимая частота запросов на токен, запросов в секунду.
+        :param burst: Ёмкость корзины. По умолчанию — rate, но не меньше 1.
+        :param max_keys: Максимум отслеживаемых токенов.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0.")
+        self.rate = rate
+        self.burst = burst if burst else max(1, math.ceil(rate))
+        self.max_keys = max_keys
+        # Ключ -> (доступные запросы, момент последнего пополнения)
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Optional[int]:
+        """
+        Расходует один запрос из корзины токена.
+
+        :param key: Ключ токена (хэш).
+        :return: None, если запрос разрешён, иначе пауза до появления запроса в корзине (секунды).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return None
+        return max(1, math.ceil((1 - tokens) / self.rate))
+
+
+def classify_request(request) -> Optional[str]:
+    """
+    Определяет класс запроса по HTTP-методу, последнему сегменту пути и размеру тела.
+
+    :param request: Запрос CherryPy.
+    :return: read, write, bulk или None для запросов без ограничений.
+    """
+    resource = request.path_info.rstrip("/").rsplit("/", 1)[-1]
+    if resource in EXEMPT_RESOURCES:
+        return None
+    if resource in BULK_RESOURCES or request.method == "PATCH":
+        return BULK
+    if request.method in ("GET", "HEAD") or resource in READ_RESOURCES:
+        return READ
+    length = request.headers.get("Content-Length")
+    if "chunked" in request.headers.get("Transfer-Encoding", "").lower() or (
+        length and length.isdigit() and int(length) > BULK_BODY_SIZE
+    ):
+        return BULK
+    return WRITE
+
+
+# Все контроллеры допуска для сбора метрик
+_CONTROLLERS: "weakref.WeakSet[AdmissionController]" = weakref.WeakSet()
+
+# Метрики состояния классов: (имя, тип, описание, ключ в stats())
+_ADMISSION_METRICS = (
+    ("http_admission_in_flight", "gauge", "Requests being handled by admission class.", "in_flight"),
+    ("http_admission_waiting", "gauge", "Requests waiting in the admission queue.", "waiting"),
+    ("http_admission_limit", "gauge", "Concurrent request limit by admission class.", "limit"),
+)
+
+
+def _collect_admission_metrics():
+    """
+    Сборщик метрик для MetricsRegistry: состояние классов допуска.
+    """
+    class_stats = [
+        (name, admission.stats()) for controller in list(_CONTROLLERS) for name, admission in controller.classes.items()
+    ]
+    for name, metric_type, documentation, key in _ADMISSION_METRICS:
+        yield name, metric_type, documentation, [({"class": class_name}, stats[key]) for class_name, stats in class_stats]
+
+
+REGISTRY.register_collector(_collect_admission_metrics)
+
+
+class AdmissionController:
+    """
+    Допуск запросов к обработчикам: ограничение частоты по токену (429)
+    и ограничение параллельности по классам запросов (503), оба с Retry-After.
+    """
+
+    def __init__(self, classes: Dict[str, AdmissionClass], rate_limiter: Optional[TokenRateLimiter] = None):
+        """
+        :param classes: Ограничения по классам запросов {read|write|bulk: AdmissionClass}.
+            Классы без ограничения не ограничиваются.
+        :param rate_limiter: Ограничение частоты запросов по токену или None.
+        """
+        self.classes = classes
+        self.rate_limiter = rate_limiter
+        _CONTROLLERS.add(self)
+
+    def admit(self):
+        """
+        Хук before_handler: выполняется после проверки токена (validate_bearer_token).
+        """
+        request = cherrypy.serving.request
+        request_class = classify_request(request)
+        if request_class is None:
+            return
+        token_hash = getattr(request, "token_hash", None)
+        if self.rate_limiter is not None and token_hash:
+            retry_after = self.rate_limiter.acquire(token_hash)
+            if retry_after is not None:
+                REJECTED.inc(request_class, "rate_limit")
+                raise AdmissionRejected(429, "Too Many Requests: rate limit exceeded for token.", retry_after)
+        admission = self.classes.get(request_class)
+        if admission is None:
+            return
+        retry_after = admission.acquire()
+        if retry_after is not None:
+            REJECTED.inc(request_class, "overload")
+            logger.warning(f"Rejected {request.method} {request.path_info}: {request_class} requests are saturated.")
+            raise AdmissionRejected(503, "Service Unavailable: server is overloaded, retry later.", retry_after)
+        request._admission = (admission, time.monotonic())
+
+    def release(self):
+        """
+        Хук on_end_request: освобождает слот после отправки ответа (в том числе потокового).
+        """
+        request = cherrypy.serving.request
+        admitted = getattr(request, "_admission", None)
+        if admitted is None:
+            return
+        request._admission = None
+        admission, started = admitted
+        admission.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: admission.stats() for name, admission in self.classes.items()}
+
+    def threads_required(self) -> int:
+        """
+        Возвращает количество потоков сервера, занятых при заполненных лимитах
+        и очередях всех классов: запросы в очереди ждут, занимая поток.
+        """
+        return sum(admission.limit + admission.queue_size for admission in self.classes.values())
+
+    def fit_to_threads(self, threads: int):
+        """
+        Уменьшает очереди классов пропорционально их длине так, чтобы лимиты
+        и очереди всех классов помещались в threads потоков. Иначе при перегрузке
+        очереди не заполняются, лишние запросы ждут в очереди сокета и не получают
+        быстрый 503.
+
+        :param threads: Потоки сервера, доступные классам допуска.
+        """
+        limits = sum(admission.limit for admission in self.classes.values())
+        if limits > threads:
+            raise ValueError(f"Admission limits ({limits}) exceed the available server threads ({threads}).")
+        queued = sum(admission.queue_size for admission in self.classes.values())
+        available = threads - limits
+        if queued <= available:
+            return
+        for admission in self.classes.values():
+            admission.queue_size = admission.queue_size * available // queued
+        logger.warning(
+            f"Admission queues reduced to fit {threads} server thread(s): "
+            + ", ".join(f"{name}={admission.queue_size}" for name, admission in self.classes.items())
+        )
+
+
+class AdmissionTool(cherrypy.Tool):
+    """
+    Инструмент CherryPy для AdmissionController. Приоритет 60: выполняется
+    после инструмента auth, поэтому запросы без валидного токена отклоняются
+    до очереди, а токен уже известен ограничению частоты.
+    """
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        super().__init__("before_handler", controller.admit, name="admission", priority=60)
+
+    def _setup(self):
+        super()._setup()
+        cherrypy.serving.request.hooks.attach("on_end_request", self.controller.release)
@@ -1,18 +1,33 @@
 import cherrypy
+from Utils.token_store import TokenStore, hash_token
+
+VALID_TOKENS = ["1111111"]
+
+# Хранилище токенов; main.py заменяет его хранилищем с загрузкой из файла или БД
+token_store = TokenStore(static_tokens=VALID_TOKENS)
+
+
+def set_token_store(store: TokenStore):
+    """
+    Заменяет хранилище токенов, используемое validate_bearer_token.
+    """
+    global token_store
+    token_store = store
 
-VALID_TOKENS = ["1111111"]  
 
 def validate_bearer_token():
     """
     Проверяет наличие и валидность Bearer-токена в заголовке Authorization.
+    Хэш валидного токена сохраняется в cherrypy.request.token_hash (ключ ограничения частоты).
     """
     auth_header = cherrypy.request.headers.get("Authorization")
 
     if not auth_header or not auth_header.startswith("Bearer "):
         raise cherrypy.HTTPError(401, "Unauthorized: Missing or invalid Authorization header.")
-    
-    token = auth_header.split("Bearer ")[1]
-    
 
-    if token not in VALID_TOKENS:
-        raise cherrypy.HTTPError(403, "Forbidden: Invalid token.")
\ No newline at end of file
+    token = auth_header[len("Bearer "):]
+
+    if not token_store.is_valid(token):
+        raise cherrypy.HTTPError(403, "Forbidden: Invalid token.")
+
+    cherrypy.request.token_hash = hash_token(token)
@@ -0,0 +1,136 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Маркер отсутствия значения в кэше (None — допустимое значение)
+MISSING = object()
+
+
+class CacheBackend:
+    """
+    Интерфейс бэкенда кэша. Позволяет заменить локальный кэш процесса
+    общим кэшем (например, Redis или Memcached) без изменения сервисного слоя.
+    """
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Возвращает значение по ключу или MISSING, если значения нет.
+        """
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Сохраняет значение по ключу.
+
+        :param generation: Поколение кэша (generation()) на момент начала чтения значения
+            из источника. Если с тех пор кэш инвалидировался, значение не сохраняется:
+            оно могло быть прочитано до изменения записи.
+        """
+        raise NotImplementedError
+
+    def generation(self) -> int:
+        """
+        Возвращает поколение кэша — счётчик, увеличивающийся при каждой инвалидации.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: Hashable):
+        """
+        Удаляет значение по ключу, если оно есть.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Очищает кэш.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики работы кэша.
+        """
+        raise NotImplementedError
+
+
+class LRUTTLCache(CacheBackend):
+    """
+    Потокобезопасный кэш процесса с ограничением размера (LRU) и временем жизни записей (TTL).
+    Значения хранятся и возвращаются копиями, поэтому изменение результата
+    вызывающим кодом не меняет запись в кэше.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        """
+        Инициализация кэша.
+
+        :param max_size: Максимальное количество записей.
+        :param ttl: Время жизни записи в секундах.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be greater than 0.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self._hits += 1
+        return copy.copy(value)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        expires_at = time.monotonic() + self.ttl
+        value = copy.copy(value)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,108 @@
+import gzip
+import logging
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+import cherrypy
+from cherrypy.lib import httputil
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIME_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+def available_compressors(level: int = 6) -> Dict[str, Callable[[bytes], bytes]]:
+    """
+    Возвращает доступные алгоритмы сжатия в порядке предпочтения сервера.
+    brotli и zstd используются, только если установлены соответствующие пакеты.
+
+    :param level: Уровень сжатия (1-9).
+    :return: Словарь {имя в Content-Encoding: функция сжатия}.
+    """
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        compressors["br"] = lambda data: brotli.compress(data, quality=level)
+    if zstandard is not None:
+        compressors["zstd"] = lambda data: zstandard.ZstdCompressor(level=level).compress(data)
+    compressors["gzip"] = lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    # HTTP deflate — это поток в формате zlib
+    compressors["deflate"] = lambda data: zlib.compress(data, level)
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Выбирает кодировку по заголовку Accept-Encoding с учётом q-значений.
+    При равных q-значениях побеждает порядок available.
+
+    :param accept_encoding: Значение заголовка Accept-Encoding.
+    :param available: Поддерживаемые кодировки в порядке предпочтения.
+    :return: Имя кодировки или None, если сжатие не согласовано.
+    """
+    if not accept_encoding:
+        return None
+    qvalues = {
+        element.value.lower(): element.qvalue
+        for element in httputil.header_elements("Accept-Encoding", accept_encoding)
+    }
+    best, best_q = None, 0.0
+    for name in available:
+        q = qvalues.get(name, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _add_vary(headers, value: str):
+    vary = [item.strip() for item in headers.get("Vary", "").split(",") if item.strip()]
+    if value not in vary:
+        vary.append(value)
+        headers["Vary"] = ", ".join(vary)
+
+
+def compress_response(min_size: int = 1024, level: int = 6, mime_types: Iterable[str] = DEFAULT_MIME_TYPES):
+    """
+    Инструмент CherryPy (before_finalize): сжимает тело ответа алгоритмом,
+    согласованным по Accept-Encoding. Ответы меньше min_size байт и потоковые
+    ответы (response.stream) не сжимаются.
+
+    :param min_size: Минимальный размер тела в байтах для сжатия.
+    :param level: Уровень сжатия.
+    :param mime_types: Типы содержимого, которые сжимаются.
+    """
+    request = cherrypy.serving.request
+    response = cherrypy.serving.response
+    if response.stream or "Content-Encoding" in response.headers:
+        return
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type not in mime_types:
+        return
+
+    # Ответ зависит от Accept-Encoding независимо от того, сжат ли он
+    _add_vary(response.headers, "Accept-Encoding")
+    body = response.collapse_body()
+    if len(body) < min_size:
+        return
+
+    compressors = available_compressors(level)
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""), compressors)
+    if encoding is None:
+        return
+
+    response.body = compressors[encoding](body)
+    response.headers["Content-Encoding"] = encoding
+    response.headers.pop("Content-Length", None)
+    # Сжатое представление побайтно отличается от исходного — ETag становится слабым
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = f"W/{etag}"
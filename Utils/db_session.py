@@ -0,0 +1,45 @@
+import hashlib
+import time
+import cherrypy
+from Database.replica_router import get_client_last_write, set_client_last_write, set_session_key
+
+# Cookie с временем последней записи клиента (read-your-writes между процессами)
+LAST_WRITE_COOKIE = "db_last_write"
+
+
+def bind_db_session(sticky_seconds: float = 5.0):
+    """
+    Привязывает запрос к сессии клиента для read-your-writes при чтении с реплик.
+    Ключ сессии — хэш заголовка Authorization, сам токен не сохраняется.
+    Время последней записи клиента читается из cookie LAST_WRITE_COOKIE, а после
+    записи в запросе возвращается клиенту в этой cookie: следующий запрос мог
+    попасть в другой процесс, который об этой записи не знает.
+
+    :param sticky_seconds: Время жизни cookie (DB_REPLICA_STICKY_SECONDS).
+    """
+    auth_header = cherrypy.request.headers.get("Authorization")
+    if auth_header:
+        set_session_key(hashlib.sha256(auth_header.encode()).hexdigest())
+    else:
+        set_session_key(None)
+
+    received = None
+    morsel = cherrypy.request.cookie.get(LAST_WRITE_COOKIE)
+    if morsel is not None:
+        try:
+            received = float(morsel.value)
+        except ValueError:
+            pass
+    set_client_last_write(received)
+
+    def send_last_write():
+        written_at = get_client_last_write()
+        if written_at is None or written_at == received or written_at < time.time() - sticky_seconds:
+            return
+        cookie = cherrypy.response.cookie
+        cookie[LAST_WRITE_COOKIE] = f"{written_at:.3f}"
+        cookie[LAST_WRITE_COOKIE]["path"] = "/"
+        cookie[LAST_WRITE_COOKIE]["max-age"] = max(1, int(sticky_seconds + 0.5))
+        cookie[LAST_WRITE_COOKIE]["httponly"] = True
+
+    cherrypy.request.hooks.attach("before_finalize", send_last_write)
@@ -1,27 +1,76 @@
 import logging
+import random
+import time
 from functools import wraps
+from typing import Dict, Optional
+import cherrypy
 
 logger = logging.getLogger(__name__)
 
+# Доля записываемых успешных вызовов: по умолчанию и для отдельных операций.
+# Ошибки записываются всегда.
+_sampling = {"default": 1.0, "rates": {}}
+
+
+def configure_sampling(default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None):
+    """
+    Настраивает выборочную запись успешных вызовов log_and_handle_errors.
+
+    :param default_rate: Доля записываемых успешных вызовов (от 0 до 1) для всех операций.
+    :param rates: Доли для отдельных операций по их описанию.
+    """
+    _sampling["default"] = default_rate
+    _sampling["rates"] = dict(rates or {})
+
+
+def _should_log(operation: str) -> bool:
+    rate = _sampling["rates"].get(operation, _sampling["default"])
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def _fields(operation: str, started: float, status: str) -> Dict[str, object]:
+    return {
+        "operation": operation,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "status": status,
+    }
+
+
 def log_and_handle_errors(operation: str):
     """
     Декоратор для логирования выполнения метода и обработки ошибок.
-    
+    Успешные вызовы записываются одной записью с длительностью и с учётом
+    частоты выборки операции, ошибки записываются всегда.
+
     :param operation: Описание операции для логирования.
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            logger.info(f"Starting operation: {operation}")
+            started = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
-                logger.info(f"Operation '{operation}' completed successfully.")
-                return result
+            except cherrypy.HTTPRedirect as e:
+                # Перенаправления и 304 Not Modified не являются ошибками
+                if _should_log(operation) and logger.isEnabledFor(logging.INFO):
+                    fields = _fields(operation, started, str(e.status))
+                    logger.info(f"Operation '{operation}' finished with status {e.status} in {fields['duration_ms']} ms.", extra=fields)
+                raise
             except ValueError as e:
-                logger.error(f"ValueError during '{operation}': {e}")
+                fields = _fields(operation, started, "error")
+                logger.error(f"ValueError during '{operation}' after {fields['duration_ms']} ms: {e}", extra=fields)
                 raise
             except Exception as e:
-                logger.error(f"Unexpected error during '{operation}': {e}", exc_info=True)
+                fields = _fields(operation, started, "error")
+                logger.error(
+                    f"Unexpected error during '{operation}' after {fields['duration_ms']} ms: {e}",
+                    exc_info=True,
+                    extra=fields
+                )
                 raise
+            if _should_log(operation) and logger.isEnabledFor(logging.INFO):
+                fields = _fields(operation, started, "ok")
+                logger.info(f"Operation '{operation}' completed successfully in {fields['duration_ms']} ms.", extra=fields)
+            return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,91 @@
+import datetime
+import decimal
+import json
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+import cherrypy
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value: Any) -> Any:
+    """
+    Преобразует типы, которые не сериализуются в JSON напрямую
+    (значения из MySQL: Decimal, datetime, bytes и т.д.).
+    """
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_stdlib_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return _stdlib_encoder.encode(value).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Доступные бэкенды в порядке предпочтения
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {}
+if orjson is not None:
+    ENCODERS["orjson"] = _orjson_dumps
+ENCODERS["json"] = _stdlib_dumps
+
+
+def get_encoder(name: Optional[str] = None) -> Callable[[Any], bytes]:
+    """
+    Возвращает функцию сериализации в JSON (результат — UTF-8 bytes).
+
+    :param name: Имя бэкенда (orjson или json). Если не указано или недоступно,
+        используется самый быстрый из установленных.
+    :return: Функция сериализации.
+    """
+    if name and name in ENCODERS:
+        return ENCODERS[name]
+    if name:
+        logger.warning(f"JSON backend '{name}' is not available, falling back to '{next(iter(ENCODERS))}'.")
+    return next(iter(ENCODERS.values()))
+
+
+# Сериализатор по умолчанию; бэкенд можно выбрать переменной окружения JSON_BACKEND
+dumps = get_encoder(os.getenv("JSON_BACKEND"))
+
+
+def make_json_handler(encoder: Optional[Callable[[Any], bytes]] = None) -> Callable:
+    """
+    Создаёт обработчик для tools.json_out (параметр handler), сериализующий
+    результат метода контроллера выбранным бэкендом.
+
+    :param encoder: Функция сериализации. По умолчанию — dumps.
+    :return: Обработчик для 'tools.json_out.handler'.
+    """
+    encoder = encoder or dumps
+
+    def json_handler(*args, **kwargs) -> bytes:
+        value = cherrypy.serving.request._json_inner_handler(*args, **kwargs)
+        return encoder(value)
+
+    return json_handler
+
+
+json_handler = make_json_handler()
@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Dict, Optional
+
+# Дополнительные поля записей, которые выводит StructuredFormatter
+STRUCTURED_FIELDS = ("operation", "duration_ms", "status")
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Форматирует запись журнала в одну строку JSON.
+    Поля operation, duration_ms и status добавляются, если присутствуют в записи (extra).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, который не блокирует вызывающий поток: при переполненной
+    очереди запись отбрасывается и учитывается в счётчике dropped.
+    Записи уровня WARNING и выше не отбрасываются: при переполненной очереди
+    они пишутся синхронно обработчиком fallback (или ждут места в очереди,
+    если fallback не задан).
+    """
+
+    def __init__(self, log_queue: queue.Queue, fallback: Optional[logging.Handler] = None):
+        """
+        :param log_queue: Очередь записей для QueueListener.
+        :param fallback: Обработчик для синхронной записи предупреждений и ошибок
+            при переполненной очереди (обычно тот же обработчик, что у QueueListener).
+        """
+        super().__init__(log_queue)
+        self.fallback = fallback
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Очередь внутрипроцессная: форматирование (включая трассировку) выполняется
+        # в потоке QueueListener, а не в вызывающем потоке
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                with self._dropped_lock:
+                    self.dropped += 1
+            elif self.fallback is not None:
+                self.fallback.handle(record)
+            else:
+                self.queue.put(record)
+
+
+class BackgroundQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener, повторный вызов stop() которого ничего не делает
+    (останавливается и явно, и обработчиком atexit).
+    """
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+def setup_logging(
+    filename: str,
+    level: int = logging.INFO,
+    structured: bool = False,
+    queue_size: int = 10000
+) -> BackgroundQueueListener:
+    """
+    Настраивает неблокирующую запись журнала: обработчики корневого логгера только
+    помещают записи в очередь, а запись в файл выполняет фоновый поток QueueListener.
+
+    :param filename: Файл журнала.
+    :param level: Уровень корневого логгера.
+    :param structured: Писать записи в формате JSON (StructuredFormatter).
+    :param queue_size: Максимальный размер очереди; при переполнении записи ниже WARNING
+        отбрасываются, а предупреждения и ошибки пишутся в файл синхронно.
+    :return: Запущенный QueueListener (останавливается автоматически при выходе).
+    """
+    file_handler = logging.FileHandler(filename, encoding="utf-8")
+    if structured:
+        file_handler.setFormatter(StructuredFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue, fallback=file_handler)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = BackgroundQueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """
+    Разбирает частоты выборки из строки вида "Paginating query=0.01;Fetching equipment by ID=0.1".
+
+    :param value: Строка настроек (например, из переменной окружения LOG_SAMPLE_RATES).
+    :return: Словарь {операция: доля записываемых успешных вызовов}.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(";"))):
+        operation, _, rate = item.rpartition("=")
+        if not operation:
+            raise ValueError(f"Invalid sample rate setting: '{item}'")
+        rates[operation.strip()] = float(rate)
+    return rates
@@ -0,0 +1,307 @@
+import bisect
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cherrypy
+
+# Границы корзин гистограмм длительности, в секундах
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Границы корзин гистограммы количества строк
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Сэмпл метрики: (суффикс имени, метки, значение)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ShardedMetric:
+    """
+    Основа метрик без блокировок на горячем пути: каждый поток пишет в собственный
+    шард (словарь ячеек по значениям меток), блокировка берётся только при создании
+    шарда нового потока. При сборе шарды всех потоков суммируются.
+    """
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple[str, ...], list] = {}
+        for shard in shards:
+            for labels, cell in list(shard.items()):
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(cell)
+                else:
+                    for index, value in enumerate(cell):
+                        total[index] += value
+        return merged
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_ShardedMetric):
+    """
+    Монотонно возрастающий счётчик (имя по соглашению Prometheus оканчивается на _total).
+    """
+
+    TYPE = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        """
+        Увеличивает счётчик.
+
+        :param labels: Значения меток в порядке labelnames.
+        :param amount: Величина увеличения.
+        """
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0]
+        cell[0] += amount
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, (value,) in sorted(self._merged().items()):
+            yield "", self._labels(labels), value
+
+
+class Histogram(_ShardedMetric):
+    """
+    Гистограмма с фиксированными границами корзин.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        """
+        Добавляет наблюдение.
+
+        :param value: Значение (например, длительность в секундах).
+        :param labels: Значения меток в порядке labelnames.
+        """
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            # Корзины, корзина +Inf, сумма
+            cell = shard[labels] = [0] * (len(self.buckets) + 2)
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, cell in sorted(self._merged().items()):
+            label_dict = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                cumulative += count
+                yield "_bucket", dict(label_dict, le=_format_value(bound)), cumulative
+            yield "_sum", label_dict, cell[-1]
+            yield "_count", label_dict, cumulative
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик с выводом в текстовом формате Prometheus.
+    Помимо счётчиков и гистограмм поддерживает сборщики — функции, которые
+    вычисляют значения (например, состояние пулов соединений) в момент запроса метрик.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics: Dict[str, _ShardedMetric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _ShardedMetric) -> _ShardedMetric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable):
+        """
+        Регистрирует сборщик. Сборщик возвращает кортежи
+        (имя, тип, описание, [(метки, значение), ...]).
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Возвращает все метрики в текстовом формате Prometheus.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collector in collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by controller method.", ("endpoint", "method", "status")
+)
+QUERY_LATENCY = REGISTRY.histogram(
+    "db_query_duration_seconds", "QueryExecutor.execute latency by SQL fingerprint.", ("fingerprint",)
+)
+QUERY_ROWS = REGISTRY.histogram(
+    "db_query_rows", "Rows returned by QueryExecutor.execute by SQL fingerprint.", ("fingerprint",), ROW_BUCKETS
+)
+QUERY_ERRORS = REGISTRY.counter(
+    "db_query_errors_total", "Failed QueryExecutor.execute calls by SQL fingerprint.", ("fingerprint",)
+)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("pool",)
+)
+
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_ROW_PLACEHOLDER_LIST = re.compile(r"(?:\(\s*%s\s*,\s*%s\s*\)\s*,\s*)+\(\s*%s\s*,\s*%s\s*\)")
+_WHEN_LIST = re.compile(r"(?:WHEN %s THEN %s\s*)+")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    """
+    Нормализует SQL-запрос для использования в метках: схлопывает пробелы,
+    списки плейсхолдеров IN (...) и CASE, заменяет литералы на ?.
+
+    :param query: SQL-запрос.
+    :return: Отпечаток запроса (не длиннее 200 символов).
+    """
+    normalized = _WHITESPACE.sub(" ", query).strip()
+    normalized = _STRING.sub("?", normalized)
+    normalized = _ROW_PLACEHOLDER_LIST.sub("(%s, %s), ...", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(%s, ...)", normalized)
+    normalized = _WHEN_LIST.sub("WHEN %s THEN %s ... ", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    return normalized[:200]
+
+
+def observe_query(query: str, started: float, result, failed: bool = False):
+    """
+    Записывает длительность и количество строк выполненного запроса.
+
+    :param query: SQL-запрос.
+    :param started: Момент начала (time.perf_counter()).
+    :param result: Результат запроса (запись, список записей или None).
+    :param failed: Запрос завершился ошибкой.
+    """
+    if not REGISTRY.enabled:
+        return
+    label = fingerprint(query)
+    QUERY_LATENCY.observe(time.perf_counter() - started, label)
+    if failed:
+        QUERY_ERRORS.inc(label)
+    elif isinstance(result, list):
+        QUERY_ROWS.observe(len(result), label)
+    elif result is not None:
+        QUERY_ROWS.observe(1, label)
+
+
+def _start_request_timer():
+    request = cherrypy.serving.request
+    # Обработчик запоминается до того, как инструменты (json_out и др.) обернут request.handler
+    handler = getattr(request.handler, "callable", None)
+    request._metrics_endpoint = getattr(handler, "__qualname__", None) or "unhandled"
+    request._metrics_started = time.perf_counter()
+
+
+def _observe_request():
+    request = cherrypy.serving.request
+    started = getattr(request, "_metrics_started", None)
+    if started is None or not REGISTRY.enabled:
+        return
+    endpoint = request._metrics_endpoint
+    status = str(cherrypy.serving.response.status or "200").split(" ", 1)[0]
+    REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint, request.method, status)
+
+
+class RequestMetricsTool(cherrypy.Tool):
+    """
+    Инструмент CherryPy: измеряет длительность запроса от начала обработки
+    ресурса до отправки ответа и записывает её в http_request_duration_seconds
+    с метками метода контроллера, HTTP-метода и статуса.
+    """
+
+    def __init__(self):
+        super().__init__("on_start_resource", _start_request_timer, name="metrics")
+
+    def _setup(self):
+        super()._setup()
+        cherrypy.serving.request.hooks.attach("on_end_request", _observe_request)
@@ -0,0 +1,226 @@
+"""
+Хранилище Bearer-токенов для инструмента auth.
+
+Командная строка:
+    python -m Utils.token_store hash <token>             — запись для файла/таблицы токенов
+    python -m Utils.token_store sign <subject> [--ttl N] — подписанный токен (ключ из AUTH_SIGNING_KEY)
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from Utils.cache import LRUTTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Префикс записи, содержащей SHA-256 токена вместо самого токена
+HASH_PREFIX = "sha256:"
+# Префикс подписанного самодостаточного токена: v1.<payload>.<signature>
+SIGNED_PREFIX = "v1."
+
+
+def hash_token(token: str) -> str:
+    """
+    Возвращает SHA-256 токена в шестнадцатеричном виде.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign_token(subject: str, signing_key: bytes, ttl: Optional[float] = None) -> str:
+    """
+    Выпускает подписанный токен, проверяемый без обращения к хранилищу.
+
+    :param subject: Идентификатор владельца токена (сервиса).
+    :param signing_key: Секретный ключ HMAC-SHA256.
+    :param ttl: Время жизни токена в секундах; None — бессрочный.
+    :return: Токен вида v1.<payload>.<signature>.
+    """
+    claims = {"sub": subject}
+    if ttl is not None:
+        claims["exp"] = int(time.time() + ttl)
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(signing_key, payload.encode(), hashlib.sha256).digest()
+    return f"{SIGNED_PREFIX}{payload}.{_b64encode(signature)}"
+
+
+def file_token_loader(path: str) -> Callable[[], Iterable[str]]:
+    """
+    Загрузчик токенов из файла: по одной записи на строку (токен или sha256:<хэш>),
+    пустые строки и строки, начинающиеся с #, пропускаются.
+
+    :param path: Путь к файлу токенов.
+    """
+    def load() -> Iterable[str]:
+        with open(path, "r", encoding="utf-8") as file:
+            return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+    return load
+
+
+def db_token_loader(db, table: str = "api_token") -> Callable[[], Iterable[str]]:
+    """
+    Загрузчик хэшей токенов из таблицы базы данных (столбец token_hash, отозванные токены исключаются).
+
+    :param db: QueryExecutor.
+    :param table: Имя таблицы токенов.
+    """
+    def load() -> Iterable[str]:
+        rows = db.execute(f"SELECT token_hash FROM {table} WHERE revoked = 0", fetchall=True, read_only=True) or []
+        return [HASH_PREFIX + row["token_hash"] for row in rows]
+    return load
+
+
+class TokenStore:
+    """
+    Потокобезопасное хранилище токенов.
+
+    Хранятся только SHA-256 токенов; проверка — поиск в словаре хэшей за O(1)
+    с последующим сравнением за постоянное время. Набор хэшей перечитывается
+    из источника вызовом reload() (например, из cherrypy.process.plugins.Monitor)
+    и заменяется целиком, поэтому проверки не блокируются на время загрузки.
+    При заданном signing_key также принимаются подписанные токены (sign_token),
+    результаты их проверки кэшируются.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], Iterable[str]]] = None,
+        static_tokens: Iterable[str] = (),
+        signing_key: Optional[bytes] = None,
+        verification_cache_size: int = 10000,
+        verification_cache_ttl: float = 60.0
+    ):
+        """
+        Инициализация хранилища.
+
+        :param loader: Функция, возвращающая записи токенов (токен или sha256:<хэш>).
+        :param static_tokens: Токены, действующие независимо от источника.
+        :param signing_key: Ключ HMAC для подписанных токенов; None — подписанные токены не принимаются.
+        :param verification_cache_size: Размер кэша результатов проверки подписанных токенов.
+        :param verification_cache_ttl: Время жизни результата проверки в секундах.
+        """
+        self._loader = loader
+        self._static = self._to_hashes(static_tokens)
+        self._hashes: Dict[str, str] = dict(self._static)
+        self._signing_key = signing_key
+        self._verified = LRUTTLCache(max_size=verification_cache_size, ttl=verification_cache_ttl)
+        self._reload_lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _to_hashes(entries: Iterable[str]) -> Dict[str, str]:
+        hashes = {}
+        for entry in entries:
+            digest = entry[len(HASH_PREFIX):].lower() if entry.startswith(HASH_PREFIX) else hash_token(entry)
+            hashes[digest] = digest
+        return hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def reload(self) -> bool:
+        """
+        Перечитывает токены из источника. При ошибке загрузки остаётся прежний набор.
+
+        :return: True, если набор токенов обновлён.
+        """
+        if self._loader is None:
+            return False
+        with self._reload_lock:
+            try:
+                hashes = self._to_hashes(self._loader() or [])
+            except Exception as e:
+                logger.error(f"Failed to reload tokens, keeping {len(self._hashes)} loaded token(s): {e}")
+                return False
+            hashes.update(self._static)
+            self._hashes = hashes
+            self.loaded_at = time.monotonic()
+        logger.info(f"Token store loaded {len(hashes)} token(s).")
+        return True
+
+    def is_valid(self, token: str) -> bool:
+        """
+        Проверяет токен.
+
+        :param token: Значение Bearer-токена.
+        :return: True, если токен действителен.
+        """
+        if not token:
+            return False
+        if self._signing_key is not None and token.startswith(SIGNED_PREFIX):
+            return self._verify_signed(token)
+        digest = hash_token(token)
+        stored = self._hashes.get(digest)
+        # Сравнение за постоянное время выполняется и при промахе
+        return hmac.compare_digest(stored or "", digest) and stored is not None
+
+    def _verify_signed(self, token: str) -> bool:
+        """
+        Проверяет подпись и срок действия подписанного токена.
+        Результат кэшируется; срок действия проверяется при каждом обращении.
+        """
+        cache_key = hash_token(token)
+        expires_at = self._verified.get(cache_key)
+        if expires_at is MISSING:
+            expires_at = self._check_signature(token)
+            self._verified.set(cache_key, expires_at)
+        if expires_at is None:
+            return False
+        return expires_at == 0 or expires_at > time.time()
+
+    def _check_signature(self, token: str) -> Optional[float]:
+        """
+        :return: Время истечения токена (0 — бессрочный) или None, если токен недействителен.
+        """
+        try:
+            payload, signature = token[len(SIGNED_PREFIX):].split(".")
+            expected = hmac.new(self._signing_key, payload.encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                return None
+            claims = json.loads(_b64decode(payload))
+            return float(claims.get("exp", 0))
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def verification_stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики кэша проверки подписанных токенов.
+        """
+        return self._verified.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    hash_parser = subparsers.add_parser("hash", help="Print a token store entry for a token")
+    hash_parser.add_argument("token")
+    sign_parser = subparsers.add_parser("sign", help="Issue a signed token (key from AUTH_SIGNING_KEY)")
+    sign_parser.add_argument("subject")
+    sign_parser.add_argument("--ttl", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.command == "hash":
+        print(HASH_PREFIX + hash_token(args.token))
+    else:
+        signing_key = os.getenv("AUTH_SIGNING_KEY")
+        if not signing_key:
+            parser.error("AUTH_SIGNING_KEY is not set")
+        print(sign_token(args.subject, signing_key.encode(), args.ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Сравнение пропускной способности вызовов log_and_handle_errors при синхронной
+записи журнала в файл и при записи через очередь (QueueHandler/QueueListener)
+с выборкой.
+
+Запуск:
+    python -m benchmarks.bench_logging --calls 20000 --threads 8 --depth 6
+
+depth — количество вложенных декорированных вызовов на один «запрос»
+(контроллер, сервис, пагинация и т.д.).
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from Utils.decorators import configure_sampling, log_and_handle_errors
+from Utils.logging_setup import setup_logging
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def make_request(depth: int):
+    @log_and_handle_errors("Benchmark leaf")
+    def leaf():
+        return 1
+
+    call = leaf
+    for level in range(depth - 1):
+        call = log_and_handle_errors(f"Benchmark level {level}")(lambda inner=call: inner())
+    return call
+
+
+def run(request, calls: int, threads: int) -> float:
+    per_thread = calls // threads
+
+    def worker():
+        for _ in range(per_thread):
+            request()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    request = make_request(args.depth)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "app.log")
+        results = []
+
+        reset_root()
+        logging.basicConfig(filename=filename, level=logging.INFO, format=FORMAT)
+        configure_sampling(1.0)
+        results.append(("sync file handler", run(request, args.calls, args.threads)))
+
+        reset_root()
+        listener = setup_logging(filename)
+        results.append(("queue, all records", run(request, args.calls, args.threads)))
+        configure_sampling(args.sample_rate)
+        results.append((f"queue, sample {args.sample_rate}", run(request, args.calls, args.threads)))
+        listener.stop()
+        reset_root()
+
+    baseline = results[0][1]
+    print(f"{'mode':<24}{'requests/s':>14}{'speedup':>10}")
+    for name, throughput in results:
+        print(f"{name:<24}{throughput:>14.0f}{throughput / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
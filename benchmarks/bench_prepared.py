@@ -0,0 +1,77 @@
+"""
+Сравнение текстового режима QueryExecutor и режима с кэшем prepared statements.
+
+Запуск (используются переменные окружения DB_HOST, DB_USER, DB_PASSWORD, DB_NAME):
+    python -m benchmarks.bench_prepared --iterations 5000
+
+Выполняются горячие запросы EquipmentService: выборка масок, проверка
+уникальности, выборка по ID и страница списка.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from Database.query_executor import QueryExecutor
+
+HOT_QUERIES = [
+    ("mask lookup", "SELECT id, serial_mask FROM equipment_type", None, True),
+    ("uniqueness check",
+     "SELECT id FROM equipment WHERE type_id = %s AND serial_number = %s AND is_deleted = 0", (1, "XXXX"), False),
+    ("select by id", "SELECT id, type_id, serial_number, note, is_deleted FROM equipment WHERE id = %s", (1,), False),
+    ("paginated list",
+     "SELECT id, type_id, serial_number, note, is_deleted FROM equipment WHERE is_deleted = 0 LIMIT %s OFFSET %s",
+     (10, 0), True),
+]
+
+
+def run(executor: QueryExecutor, iterations: int) -> dict:
+    results = {}
+    for name, query, params, many in HOT_QUERIES:
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            executor.execute(query, params, fetchall=many, fetchone=not many)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        results[name] = {
+            "median_us": statistics.median(timings),
+            "p95_us": statistics.quantiles(timings, n=20)[18],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--statement-cache-size", type=int, default=64)
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_config = {
+        "host": os.getenv("DB_HOST"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_NAME"),
+    }
+    text = run(QueryExecutor(db_config, {"pool_name": "bench_text", "max_size": 1}), args.iterations)
+    prepared = run(
+        QueryExecutor(db_config, {
+            "pool_name": "bench_prepared",
+            "max_size": 1,
+            "statement_cache_size": args.statement_cache_size,
+        }),
+        args.iterations
+    )
+
+    print(f"{'query':<20}{'text median us':>16}{'prepared median us':>20}{'text p95':>10}{'prep p95':>10}")
+    for name, _, _, _ in HOT_QUERIES:
+        print(
+            f"{name:<20}{text[name]['median_us']:>16.1f}{prepared[name]['median_us']:>20.1f}"
+            f"{text[name]['p95_us']:>10.1f}{prepared[name]['p95_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Сравнение поиска по подстроке через LIKE '%value%' и через триграммный индекс.
+
+Запуск (используются переменные окружения DB_HOST, DB_USER, DB_PASSWORD, DB_NAME):
+    python -m benchmarks.bench_search --rows 1000000 --repeat 5
+
+Скрипт дозаполняет таблицу equipment до указанного количества строк,
+перестраивает индекс equipment_search_trigram и выводит время запросов.
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import time
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from Services.search_index import TrigramSearchIndex
+
+SELECT_QUERY = "SELECT id, type_id, serial_number, note FROM equipment WHERE is_deleted = 0"
+SERIAL_MASK = "AAAANNNNNN"
+NOTE_WORDS = ["rack", "server", "switch", "router", "storage", "backup", "spare", "cold", "edge", "core"]
+
+
+def random_serial(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(4)) + \
+        "".join(rng.choice(string.digits) for _ in range(6))
+
+
+def seed(connection, rows: int, batch_size: int = 5000):
+    """
+    Дозаполняет таблицу equipment случайными записями до rows строк.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT id FROM equipment_type WHERE serial_mask = %s", (SERIAL_MASK,))
+    found = cursor.fetchone()
+    if found:
+        type_id = found[0]
+    else:
+        cursor.execute("INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("bench", SERIAL_MASK))
+        type_id = cursor.lastrowid
+    cursor.execute("SELECT COUNT(*) FROM equipment")
+    existing = cursor.fetchone()[0]
+
+    rng = random.Random(42 + existing)
+    insert_query = "INSERT IGNORE INTO equipment (type_id, serial_number, note, is_deleted) VALUES (%s, %s, %s, %s)"
+    remaining = rows - existing
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batch = [
+            (type_id, random_serial(rng), " ".join(rng.sample(NOTE_WORDS, 3)), False)
+            for _ in range(size)
+        ]
+        cursor.executemany(insert_query, batch)
+        connection.commit()
+        remaining -= size
+        print(f"Seeded {rows - remaining}/{rows} rows", end="\r")
+    print()
+    cursor.close()
+
+
+def time_query(connection, query: str, params: tuple, repeat: int) -> dict:
+    cursor = connection.cursor()
+    timings = []
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, params)
+        found = len(cursor.fetchall())
+        timings.append((time.perf_counter() - started) * 1000)
+    cursor.close()
+    return {"median_ms": statistics.median(timings), "rows": found}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--skip-rebuild", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME"),
+    )
+    index = TrigramSearchIndex()
+    try:
+        if not args.skip_seed:
+            seed(connection, args.rows)
+        if not args.skip_rebuild:
+            started = time.perf_counter()
+            indexed = index.rebuild(connection)
+            print(f"Index rebuilt for {indexed} rows in {time.perf_counter() - started:.1f}s")
+
+        cases = [("serial_number", "QZX"), ("serial_number", "AB12"), ("serial_number", "7731"),
+                 ("note", "storage"), ("note", "cold edge")]
+        print(f"{'field':<14}{'value':<12}{'LIKE ms':>10}{'trigram ms':>12}{'rows':>8}")
+        for field, value in cases:
+            like_query = f"{SELECT_QUERY} AND {field} LIKE %s LIMIT %s"
+            like = time_query(connection, like_query, (f"%{value}%", args.limit), args.repeat)
+
+            condition, condition_params = index.candidate_condition(field, value)
+            trigram_query = f"{SELECT_QUERY} AND {condition} AND {field} LIKE %s LIMIT %s"
+            trigram = time_query(
+                connection, trigram_query, condition_params + (f"%{value}%", args.limit), args.repeat
+            )
+            print(f"{field:<14}{value:<12}{like['median_ms']:>10.1f}{trigram['median_ms']:>12.1f}{trigram['rows']:>8}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Нагрузочный тест API оборудования: запускает приложение (main.py) на локальной БД,
+заполняет её тестовыми данными, выполняет смешанную нагрузку или воспроизводит
+записанный трафик и выводит p50/p95/p99 и requests/s в формате JSON.
+
+Запуск (используются переменные окружения DB_BACKEND, DB_HOST, DB_USER, DB_PASSWORD, DB_NAME):
+    python -m benchmarks.load_test --migrate --types 10 --rows 100000 --concurrency 16 --duration 30 \\
+        --output baseline.json
+    python -m benchmarks.load_test --backend sqlite --database /tmp/load_test.db --rows 100000
+    python -m benchmarks.load_test --duration 30 --compare baseline.json
+    python -m benchmarks.load_test --replay traffic.jsonl --concurrency 8
+    python -m benchmarks.load_test --workers 4 --concurrency 32   # сервер через launcher.py
+
+Смесь операций задаётся параметром --mix (веса):
+    list=30,filter=15,get=35,post=5,put=10,delete=5
+
+Формат файла --replay — одна JSON-запись на строку:
+    {"method": "GET", "path": "/api/equipment?page=2&limit=50"}
+    {"method": "POST", "path": "/api/equipment", "body": [{"type_id": 1, "serial_number": "ABCD123456"}], "ts": 1.25}
+ts (секунды от начала записи) необязателен; при --replay-speed > 0 запросы отправляются
+с исходными интервалами, ускоренными в replay-speed раз.
+
+Если передан --base-url, используется уже запущенный сервер, и приложение не запускается.
+Отчёт с --compare завершается с кодом 1, если p95 вырос или requests/s упал больше,
+чем на --tolerance.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from Database.backends import get_backend
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERIAL_MASK = "AAAANNNNNN"
+TYPE_PREFIX = "load-test-"
+NOTE_WORDS = ["rack", "server", "switch", "router", "storage", "backup", "spare", "cold", "edge", "core"]
+DEFAULT_MIX = "list=30,filter=15,get=35,post=5,put=10,delete=5"
+PERCENTILES = (50, 95, 99)
+
+
+def serial_for(number: int) -> str:
+    """
+    Детерминированный уникальный серийный номер по маске AAAANNNNNN.
+    """
+    letters, digits = divmod(number, 10 ** 6)
+    prefix = ""
+    for _ in range(4):
+        letters, index = divmod(letters, 26)
+        prefix = string.ascii_uppercase[index] + prefix
+    return f"{prefix}{digits:06d}"
+
+
+def parse_mix(value: str) -> List[Tuple[str, float]]:
+    mix = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in WORKLOADS:
+            raise ValueError(f"Unknown operation '{name}'. Use one of: {', '.join(WORKLOADS)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """
+    Перцентиль по методу ближайшего ранга (values должны быть отсортированы).
+    """
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(rank / 100 * len(values)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def db_config() -> Dict[str, str]:
+    return {
+        "backend": os.getenv("DB_BACKEND", "mysql"),
+        "host": os.getenv("DB_HOST"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_NAME"),
+    }
+
+
+def seed(types: int, rows: int, batch_size: int = 5000) -> Dict[str, list]:
+    """
+    Создаёт типы load-test-N и дозаполняет их оборудованием до rows записей.
+
+    :return: Словарь с ID типов (type_ids) и ID неудалённых записей (ids).
+    """
+    config = db_config()
+    connection = get_backend(config.pop("backend")).connect(config)
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM equipment_type WHERE name LIKE %s ORDER BY id", (TYPE_PREFIX + "%",))
+        type_ids = [row[0] for row in cursor.fetchall()]
+        for index in range(len(type_ids), types):
+            cursor.execute(
+                "INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", (f"{TYPE_PREFIX}{index}", SERIAL_MASK)
+            )
+            type_ids.append(cursor.lastrowid)
+        connection.commit()
+        type_ids = type_ids[:types]
+
+        placeholders = ", ".join(["%s"] * len(type_ids))
+        cursor.execute(f"SELECT COUNT(*) FROM equipment WHERE type_id IN ({placeholders})", tuple(type_ids))
+        existing = cursor.fetchone()[0]
+        rng = random.Random(42 + existing)
+        insert_query = "INSERT IGNORE INTO equipment (type_id, serial_number, note) VALUES (%s, %s, %s)"
+        for start in range(existing, rows, batch_size):
+            batch = [
+                (type_ids[number % len(type_ids)], serial_for(number), " ".join(rng.sample(NOTE_WORDS, 3)))
+                for number in range(start, min(start + batch_size, rows))
+            ]
+            connection.start_transaction()
+            cursor.executemany(insert_query, batch)
+            connection.commit()
+            print(f"Seeded {start + len(batch)}/{rows} rows", end="\r", file=sys.stderr)
+        if rows > existing:
+            print(file=sys.stderr)
+
+        cursor.execute(
+            f"SELECT id FROM equipment WHERE type_id IN ({placeholders}) AND is_deleted = 0", tuple(type_ids)
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return {"type_ids": type_ids, "ids": ids}
+    finally:
+        connection.close()
+
+
+def start_server(port: int, log_path: str, workers: int = 0) -> subprocess.Popen:
+    """
+    Запускает main.py (или launcher.py с workers воркерами) в отдельном процессе
+    и ждёт, пока сервер начнёт отвечать на HTTP-запросы.
+    """
+    env = dict(os.environ, SERVER_PORT=str(port))
+    command = [sys.executable, "launcher.py", "--workers", str(workers)] if workers else [sys.executable, "main.py"]
+    log_file = open(log_path, "wb")
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=log_file, stderr=log_file)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}, see {log_path}")
+        try:
+            # Мастер launcher.py принимает соединения раньше, чем готовы воркеры, поэтому ждём ответа
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/api/equipment/metrics")
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start on port {port}, see {log_path}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    """
+    HTTP-клиент одного потока нагрузки с постоянным соединением.
+    """
+
+    def __init__(self, base_url: str, token: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self.connection: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body=None) -> int:
+        payload = json.dumps(body).encode() if body is not None else None
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, self.prefix + path, body=payload, headers=self.headers)
+                response = self.connection.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                # Сервер закрыл keep-alive соединение — повторяем один раз на новом
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        return 0
+
+
+class Workload:
+    """
+    Генератор запросов смешанной нагрузки по данным, созданным seed().
+    """
+
+    def __init__(self, data: Dict[str, list], page_size: int, post_batch: int, rng_seed: int):
+        self.type_ids = data["type_ids"]
+        self.ids = data["ids"]
+        # Для DELETE резервируется хвост списка, чтобы каждая запись удалялась один раз
+        # и не выпадала из GET/PUT
+        reserve = max(1, len(self.ids) // 10)
+        self.deletable = self.ids[-reserve:]
+        self.readable = self.ids[:-reserve] or self.ids
+        self.page_size = page_size
+        self.post_batch = post_batch
+        self.pages = max(1, len(self.readable) // page_size)
+        # Серийные номера новых записей не пересекаются с засеянными и с предыдущими запусками
+        self.serials = itertools.count(10 ** 11 + random.Random(rng_seed).randrange(10 ** 11))
+        self.lock = threading.Lock()
+
+    def list(self, rng: random.Random):
+        return "GET", f"/api/equipment?page={rng.randint(1, self.pages)}&limit={self.page_size}", None
+
+    def filter(self, rng: random.Random):
+        if rng.random() < 0.5:
+            return "GET", f"/api/equipment?type_id={rng.choice(self.type_ids)}&limit={self.page_size}", None
+        return "GET", f"/api/equipment?note={rng.choice(NOTE_WORDS)}&limit={self.page_size}", None
+
+    def get(self, rng: random.Random):
+        return "GET", f"/api/equipment/{rng.choice(self.readable)}", None
+
+    def post(self, rng: random.Random):
+        body = [
+            {"type_id": rng.choice(self.type_ids), "serial_number": serial_for(next(self.serials)), "note": "load test"}
+            for _ in range(self.post_batch)
+        ]
+        return "POST", "/api/equipment", body
+
+    def put(self, rng: random.Random):
+        return "PUT", f"/api/equipment/{rng.choice(self.readable)}", {"note": " ".join(rng.sample(NOTE_WORDS, 3))}
+
+    def delete(self, rng: random.Random):
+        with self.lock:
+            if not self.deletable:
+                return self.get(rng)
+            equipment_id = self.deletable.pop()
+        return "DELETE", f"/api/equipment/{equipment_id}", None
+
+
+WORKLOADS = ("list", "filter", "get", "post", "put", "delete")
+
+
+class Recorder:
+    """
+    Накопление длительностей и статусов по операциям (отдельный список на поток,
+    объединение после завершения).
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+
+    def add(self, operation: str, latency: float, status: int):
+        self.latencies[operation].append(latency)
+        self.statuses[str(status)] += 1
+        if status >= 500 or status == 0:
+            self.errors += 1
+
+    def merge(self, other: "Recorder"):
+        for operation, values in other.latencies.items():
+            self.latencies[operation].extend(values)
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+        self.errors += other.errors
+
+
+def timed_request(client: Client, recorder: Recorder, operation: str, method: str, path: str, body):
+    started = time.perf_counter()
+    try:
+        status = client.request(method, path, body)
+    except (http.client.HTTPException, OSError):
+        status = 0
+    recorder.add(operation, time.perf_counter() - started, status)
+
+
+def run_mixed(base_url: str, token: str, workload: Workload, mix, concurrency: int, duration: float,
+              requests: int, rng_seed: int) -> Tuple[List[Recorder], float]:
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    recorders = [Recorder() for _ in range(concurrency)]
+    remaining = itertools.count(requests - 1, -1) if requests else None
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        client, recorder = Client(base_url, token), recorders[index]
+        rng = random.Random(rng_seed + index)
+        while time.perf_counter() < deadline:
+            if remaining is not None and next(remaining) < 0:
+                break
+            operation = rng.choices(names, weights)[0]
+            method, path, body = getattr(workload, operation)(rng)
+            timed_request(client, recorder, operation, method, path, body)
+
+    return recorders, run_threads(worker, concurrency)
+
+
+def load_replay(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    for record in records:
+        record.setdefault("method", "GET")
+        if "path" not in record:
+            raise ValueError(f"Replay record without path: {record}")
+    return records
+
+
+def run_replay(base_url: str, token: str, records: List[dict], concurrency: int, speed: float) -> Tuple[List[Recorder], float]:
+    recorders = [Recorder() for _ in range(concurrency)]
+    position = itertools.count()
+    started = time.perf_counter()
+    first_ts = min((record.get("ts", 0) for record in records), default=0)
+
+    def worker(index: int):
+        client, recorder = Client(base_url, token), recorders[index]
+        while True:
+            number = next(position)
+            if number >= len(records):
+                break
+            record = records[number]
+            if speed > 0 and "ts" in record:
+                delay = (record["ts"] - first_ts) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            operation = record.get("name") or f"{record['method']} {urlsplit(record['path']).path}"
+            timed_request(client, recorder, operation, record["method"], record["path"], record.get("body"))
+
+    return recorders, run_threads(worker, concurrency)
+
+
+def run_threads(worker, concurrency: int) -> float:
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    values = sorted(latencies)
+    summary = {"requests": len(values), "rps": round(len(values) / elapsed, 1) if elapsed else 0.0}
+    for rank in PERCENTILES:
+        summary[f"p{rank}_ms"] = round(percentile(values, rank) * 1000, 3)
+    summary["mean_ms"] = round(sum(values) / len(values) * 1000, 3) if values else 0.0
+    summary["max_ms"] = round(values[-1] * 1000, 3) if values else 0.0
+    return summary
+
+
+def build_report(recorders: List[Recorder], elapsed: float, meta: dict) -> dict:
+    total = Recorder()
+    for recorder in recorders:
+        total.merge(recorder)
+    all_latencies = [value for values in total.latencies.values() for value in values]
+    report = {"meta": meta, "total": summarize(all_latencies, elapsed)}
+    report["total"]["errors"] = total.errors
+    report["operations"] = {
+        operation: summarize(values, elapsed) for operation, values in sorted(total.latencies.items())
+    }
+    report["status_codes"] = dict(sorted(total.statuses.items()))
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Сравнивает отчёт с базовым: рост p95 или падение requests/s больше чем на tolerance.
+
+    :return: Список описаний регрессий (пустой, если регрессий нет).
+    """
+    regressions = []
+    sections = [("total", report["total"], baseline.get("total", {}))]
+    sections += [
+        (operation, summary, baseline.get("operations", {}).get(operation, {}))
+        for operation, summary in report["operations"].items()
+    ]
+    for name, current, previous in sections:
+        if previous.get("p95_ms") and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if previous.get("rps") and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="URL запущенного сервера; без него запускается main.py")
+    parser.add_argument("--workers", type=int, default=0, help="запустить сервер через launcher.py с N воркерами")
+    parser.add_argument("--token", default="1111111")
+    parser.add_argument("--backend", choices=("mysql", "sqlite"), help="бэкенд БД (по умолчанию DB_BACKEND)")
+    parser.add_argument("--database", help="имя БД или файл SQLite (по умолчанию DB_NAME)")
+    parser.add_argument("--migrate", action="store_true", help="применить migrations/ перед заполнением (MySQL)")
+    parser.add_argument("--types", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=0, help="ограничить общее число запросов")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--post-batch", type=int, default=10, help="записей в одном POST")
+    parser.add_argument("--replay", help="JSONL-файл с записанным трафиком")
+    parser.add_argument("--replay-speed", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="сохранить отчёт в файл")
+    parser.add_argument("--compare", help="базовый отчёт для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    load_dotenv()
+    # Переменные окружения наследует и запускаемый main.py
+    if args.backend:
+        os.environ["DB_BACKEND"] = args.backend
+    if args.database:
+        os.environ["DB_NAME"] = args.database
+
+    records = load_replay(args.replay) if args.replay else None
+    mix = parse_mix(args.mix)
+    if args.migrate:
+        subprocess.run([sys.executable, os.path.join("migrations", "migrate.py")], cwd=BASE_DIR, check=True)
+    data = seed(args.types, args.rows) if records is None else None
+
+    process = None
+    base_url = args.base_url
+    with tempfile.TemporaryDirectory() as directory:
+        if not base_url:
+            port = free_port()
+            process = start_server(port, os.path.join(directory, "server.log"), args.workers)
+            base_url = f"http://127.0.0.1:{port}"
+        try:
+            if records is not None:
+                recorders, elapsed = run_replay(base_url, args.token, records, args.concurrency, args.replay_speed)
+            else:
+                workload = Workload(data, args.page_size, args.post_batch, args.seed)
+                recorders, elapsed = run_mixed(
+                    base_url, args.token, workload, mix, args.concurrency, args.duration, args.requests, args.seed
+                )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    meta = {
+        "mode": "replay" if records is not None else "mixed",
+        "mix": args.mix if records is None else args.replay,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "backend": os.getenv("DB_BACKEND", "mysql"),
+        "rows": args.rows,
+        "types": args.types,
+        "elapsed_s": round(elapsed, 3),
+        "python": sys.version.split()[0],
+    }
+    report = build_report(recorders, elapsed, meta)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Многопроцессный запуск сервера: мастер открывает слушающий сокет и запускает
+N рабочих процессов main.py, которые принимают соединения с этого сокета.
+
+У каждого воркера свой интерпретатор (свой GIL), свой пул соединений с БД и свои
+метрики. Сокет передаётся воркерам дескриптором 3 по соглашению socket activation
+(LISTEN_PID/LISTEN_FDS), которое поддерживают CherryPy и cheroot: воркер не
+открывает порт сам, поэтому сокет и очередь входящих соединений переживают
+перезапуск любого воркера.
+
+Мастер:
+- перезапускает завершившиеся воркеры (с нарастающей задержкой при повторных падениях);
+- убивает и перезапускает воркеры, переставшие присылать heartbeat (воркер
+  присылает его, только пока его потоки обработки запросов и пул соединений
+  с БД работают);
+- по SIGHUP выполняет поэтапный перезапуск: новый воркер запускается и сообщает
+  о готовности, только затем старый получает SIGTERM и дообрабатывает запросы;
+- по SIGTERM/SIGINT останавливает воркеры и завершается.
+
+Запуск:
+    python launcher.py --workers 4
+    kill -HUP <pid мастера>    # поэтапный перезапуск, например после обновления кода
+"""
+import argparse
+import fcntl
+import logging
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Номер дескриптора слушающего сокета в воркере (соглашение socket activation)
+LISTEN_FD = 3
+# Переменные окружения, через которые мастер передаёт воркеру канал heartbeat и номер слота
+HEARTBEAT_FD_ENV = "SERVER_HEARTBEAT_FD"
+WORKER_ID_ENV = "SERVER_WORKER_ID"
+# Максимальная задержка перед перезапуском падающего воркера, секунды
+MAX_RESPAWN_DELAY = 30.0
+
+
+class RequestPoolCheck:
+    """
+    Проверка пула потоков обработки запросов для heartbeat. Запросы отслеживаются
+    по каналам before_request/after_request шины CherryPy. Пул считается зависшим,
+    если все потоки заняты и ни один запрос не завершился за stall_timeout секунд
+    (например, потоки ждут блокировку или ответ БД без таймаута).
+    """
+
+    def __init__(self, engine, threads: int, stall_timeout: float = 30.0):
+        """
+        :param engine: Шина cherrypy.engine.
+        :param threads: Количество потоков обработки запросов (server.thread_pool).
+        :param stall_timeout: Время без завершённых запросов при занятых потоках, секунды.
+        """
+        self.threads = threads
+        self.stall_timeout = stall_timeout
+        self.in_flight = 0
+        self.last_finished = time.monotonic()
+        self._lock = threading.Lock()
+        engine.subscribe("before_request", self.request_started)
+        engine.subscribe("after_request", self.request_finished)
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.last_finished = time.monotonic()
+
+    def __call__(self):
+        with self._lock:
+            in_flight, stalled_for = self.in_flight, time.monotonic() - self.last_finished
+        if in_flight >= self.threads and stalled_for > self.stall_timeout:
+            raise RuntimeError(f"all {self.threads} request threads busy, no request finished for {stalled_for:.0f}s")
+
+
+def subscribe_heartbeat(engine, health_checks: Iterable[Callable[[], None]] = ()):
+    """
+    Подписывает на шину CherryPy отправку heartbeat мастеру launcher.py.
+    Heartbeat отправляется, только пока HTTP-сервер принимает соединения и все
+    health_checks завершаются без исключения, поэтому первый heartbeat означает
+    готовность воркера, а их отсутствие — что воркер не может обслуживать запросы
+    (мастер перезапустит его через heartbeat_timeout). Если мастер завершился (канал
+    закрыт), воркер останавливается. Без SERVER_HEARTBEAT_FD ничего не делает.
+
+    :param engine: Шина cherrypy.engine.
+    :param health_checks: Проверки работоспособности (например, RequestPoolCheck
+        и ping пула соединений с БД); ошибка проверки пропускает heartbeat.
+    """
+    fd = os.getenv(HEARTBEAT_FD_ENV)
+    if not fd:
+        return
+    import cherrypy
+    from cherrypy.process.plugins import Monitor
+
+    fd = int(fd)
+    health_checks = list(health_checks)
+
+    def beat():
+        if not cherrypy.server.running:
+            return
+        for check in health_checks:
+            try:
+                check()
+            except Exception as e:
+                engine.log(f"Health check failed, heartbeat skipped: {e}")
+                return
+        try:
+            os.write(fd, b".")
+        except OSError:
+            engine.log("Launcher master is gone, stopping the worker.")
+            engine.exit()
+
+    interval = float(os.getenv("SERVER_HEARTBEAT_INTERVAL", 1))
+    Monitor(engine, beat, frequency=interval, name="LauncherHeartbeat").subscribe()
+
+
+class Worker:
+    """
+    Рабочий процесс и состояние его heartbeat.
+    """
+
+    def __init__(self, slot: int, process: subprocess.Popen, heartbeat_fd: int):
+        self.slot = slot
+        self.process = process
+        self.heartbeat_fd = heartbeat_fd
+        self.started = time.monotonic()
+        self.last_heartbeat: Optional[float] = None
+        # Момент, после которого остановленный воркер завершается принудительно
+        self.kill_deadline: Optional[float] = None
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def ready(self) -> bool:
+        return self.last_heartbeat is not None
+
+
+class PreforkMaster:
+    """
+    Мастер-процесс: слушающий сокет, воркеры, проверка heartbeat, перезапуски.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        backlog: int = 128,
+        command: Optional[List[str]] = None,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 10.0,
+        startup_timeout: float = 30.0,
+        graceful_timeout: float = 10.0,
+        respawn_delay: float = 1.0
+    ):
+        """
+        :param workers: Количество воркеров.
+        :param host: Адрес слушающего сокета.
+        :param port: Порт слушающего сокета (0 — выбрать свободный).
+        :param backlog: Длина очереди входящих соединений сокета.
+        :param command: Команда запуска воркера. По умолчанию — main.py текущим интерпретатором.
+        :param heartbeat_interval: Интервал heartbeat воркера, секунды.
+        :param heartbeat_timeout: Воркер без heartbeat дольше этого времени перезапускается.
+        :param startup_timeout: Максимальное время запуска воркера до первого heartbeat.
+        :param graceful_timeout: Время на завершение обрабатываемых запросов после SIGTERM.
+        :param respawn_delay: Начальная задержка перезапуска воркера, завершившегося при запуске.
+        """
+        if workers < 1:
+            raise ValueError("workers must be greater than 0.")
+        self.workers_count = workers
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.command = command or [sys.executable, os.path.join(BASE_DIR, "main.py")]
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout
+        self.graceful_timeout = graceful_timeout
+        self.respawn_delay = respawn_delay
+
+        self.socket: Optional[socket.socket] = None
+        self.slots: List[Optional[Worker]] = [None] * workers
+        # Остановленные воркеры, которые ещё дообрабатывают запросы
+        self.retiring: List[Worker] = []
+        self._selector = selectors.DefaultSelector()
+        self._failures = [0] * workers
+        self._respawn_at = [0.0] * workers
+        self._stopping = False
+        self._reload_requested = False
+
+    def bind(self) -> socket.socket:
+        """
+        Открывает слушающий сокет. Вызывается до запуска воркеров.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        self.socket = sock
+        self.port = sock.getsockname()[1]
+        logger.info(f"Listening on {self.host}:{self.port} (backlog {self.backlog}).")
+        return sock
+
+    def request_reload(self):
+        """
+        Запрашивает поэтапный перезапуск воркеров (обработчик SIGHUP).
+        """
+        self._reload_requested = True
+
+    def request_stop(self):
+        """
+        Запрашивает остановку мастера и воркеров (обработчик SIGTERM/SIGINT).
+        """
+        self._stopping = True
+
+    def _spawn(self, slot: int) -> Optional[Worker]:
+        read_fd, write_fd = os.pipe()
+        # Дескриптор heartbeat не должен совпасть с LISTEN_FD, который занимает сокет в воркере
+        heartbeat_fd = fcntl.fcntl(write_fd, fcntl.F_DUPFD_CLOEXEC, LISTEN_FD + 1)
+        os.close(write_fd)
+        listen_fd = self.socket.fileno()
+
+        def prepare_child():
+            os.dup2(listen_fd, LISTEN_FD)
+            # dup2 не снимает FD_CLOEXEC, если сокет мастера уже занимает LISTEN_FD
+            os.set_inheritable(LISTEN_FD, True)
+            os.set_inheritable(heartbeat_fd, True)
+
+        env = dict(
+            os.environ,
+            LISTEN_PID=str(os.getpid()),
+            LISTEN_FDS="1",
+            SERVER_HOST=self.host,
+            SERVER_PORT=str(self.port),
+            SERVER_HEARTBEAT_INTERVAL=str(self.heartbeat_interval),
+        )
+        env[HEARTBEAT_FD_ENV] = str(heartbeat_fd)
+        env[WORKER_ID_ENV] = str(slot)
+        try:
+            process = subprocess.Popen(
+                self.command,
+                cwd=BASE_DIR,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                preexec_fn=prepare_child,
+                close_fds=False,
+                # Воркеры не получают SIGINT от терминала: их останавливает мастер
+                start_new_session=True,
+            )
+        except OSError as e:
+            logger.error(f"Failed to start worker {slot}: {e}")
+            os.close(read_fd)
+            return None
+        finally:
+            os.close(heartbeat_fd)
+        os.set_blocking(read_fd, False)
+        worker = Worker(slot, process, read_fd)
+        self._selector.register(read_fd, selectors.EVENT_READ, worker)
+        logger.info(f"Started worker {slot} (pid {worker.pid}).")
+        return worker
+
+    def _close_heartbeat(self, worker: Worker):
+        if worker.heartbeat_fd is None:
+            return
+        self._selector.unregister(worker.heartbeat_fd)
+        os.close(worker.heartbeat_fd)
+        worker.heartbeat_fd = None
+
+    def _read_heartbeats(self, timeout: float):
+        for key, _ in self._selector.select(timeout):
+            worker: Worker = key.data
+            try:
+                data = os.read(worker.heartbeat_fd, 4096)
+            except BlockingIOError:
+                continue
+            if not data:
+                self._close_heartbeat(worker)
+                continue
+            if not worker.ready:
+                logger.info(f"Worker {worker.slot} (pid {worker.pid}) is ready.")
+            worker.last_heartbeat = time.monotonic()
+
+    def _terminate(self, worker: Worker):
+        """
+        Отправляет воркеру SIGTERM: CherryPy перестаёт принимать соединения
+        и дообрабатывает текущие запросы.
+        """
+        worker.kill_deadline = time.monotonic() + self.graceful_timeout
+        self.retiring.append(worker)
+        try:
+            worker.process.terminate()
+        except ProcessLookupError:
+            pass
+
+    def _kill(self, worker: Worker, reason: str):
+        logger.error(f"Killing worker {worker.slot} (pid {worker.pid}): {reason}.")
+        try:
+            worker.process.kill()
+        except ProcessLookupError:
+            pass
+        worker.process.wait()
+        self._close_heartbeat(worker)
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker in list(self.retiring):
+            if worker.process.poll() is not None:
+                self._close_heartbeat(worker)
+                self.retiring.remove(worker)
+                logger.info(f"Worker {worker.slot} (pid {worker.pid}) stopped.")
+            elif now >= worker.kill_deadline:
+                self._kill(worker, "did not stop within graceful timeout")
+                self.retiring.remove(worker)
+
+        for slot, worker in enumerate(self.slots):
+            if worker is not None:
+                code = worker.process.poll()
+                if code is not None:
+                    self._close_heartbeat(worker)
+                    logger.error(f"Worker {slot} (pid {worker.pid}) exited with code {code}.")
+                elif not worker.ready and now - worker.started > self.startup_timeout:
+                    self._kill(worker, "no heartbeat after startup")
+                elif worker.ready and now - worker.last_heartbeat > self.heartbeat_timeout:
+                    self._kill(worker, f"no heartbeat for {now - worker.last_heartbeat:.1f}s")
+                else:
+                    continue
+                # Повторные падения до готовности увеличивают задержку перезапуска
+                self._failures[slot] = 0 if worker.ready else self._failures[slot] + 1
+                delay = min(MAX_RESPAWN_DELAY, self.respawn_delay * 2 ** self._failures[slot]) if self._failures[slot] else 0
+                self._respawn_at[slot] = now + delay
+                self.slots[slot] = None
+            if self.slots[slot] is None and not self._stopping and now >= self._respawn_at[slot]:
+                self.slots[slot] = self._spawn(slot)
+
+    def _pump(self, timeout: float):
+        self._read_heartbeats(timeout)
+        self._check_workers()
+
+    def _rolling_restart(self):
+        """
+        Поэтапно заменяет воркеры. Если новый воркер не стал готов за
+        startup_timeout, перезапуск прерывается, старые воркеры продолжают работу.
+        """
+        logger.info("Rolling restart started.")
+        for slot in range(self.workers_count):
+            old = self.slots[slot]
+            new = self._spawn(slot)
+            if new is None:
+                logger.error("Rolling restart aborted: worker could not be started.")
+                return
+            self.slots[slot] = new
+            while not new.ready and not self._stopping:
+                self._pump(0.1)
+                if self.slots[slot] is not new:
+                    # Новый воркер завершился или завис при запуске: возвращаем старый
+                    if self.slots[slot] is not None:
+                        self._terminate(self.slots[slot])
+                    self.slots[slot] = old
+                    logger.error(f"Rolling restart aborted: replacement for worker {slot} failed to start.")
+                    return
+            if old is not None:
+                self._terminate(old)
+            if self._stopping:
+                return
+            if old is not None:
+                while old in self.retiring and not self._stopping:
+                    self._pump(0.1)
+        logger.info("Rolling restart finished.")
+
+    def _shutdown(self):
+        logger.info("Stopping workers.")
+        for slot, worker in enumerate(self.slots):
+            if worker is not None:
+                self._terminate(worker)
+                self.slots[slot] = None
+        while self.retiring:
+            self._pump(0.1)
+        self._selector.close()
+        if self.socket is not None:
+            self.socket.close()
+        logger.info("Master stopped.")
+
+    def run(self, install_signals: bool = True):
+        """
+        Запускает воркеры и обслуживает их до SIGTERM/SIGINT.
+
+        :param install_signals: Установить обработчики SIGTERM, SIGINT и SIGHUP
+            (возможно только в главном потоке).
+        """
+        if install_signals:
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.request_stop())
+            signal.signal(signal.SIGINT, lambda signum, frame: self.request_stop())
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
+        if self.socket is None:
+            self.bind()
+        try:
+            while not self._stopping:
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._rolling_restart()
+                self._pump(min(self.heartbeat_interval, 0.5))
+        finally:
+            self._shutdown()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": [
+                {"slot": worker.slot, "pid": worker.pid, "ready": worker.ready}
+                for worker in self.slots if worker is not None
+            ],
+            "retiring": [worker.pid for worker in self.retiring],
+        }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Multi-process launcher for the equipment API server.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", 8080)))
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("SERVER_SOCKET_QUEUE_SIZE", 128)))
+    parser.add_argument("--heartbeat-interval", type=float, default=float(os.getenv("SERVER_HEARTBEAT_INTERVAL", 1)))
+    parser.add_argument("--heartbeat-timeout", type=float, default=float(os.getenv("SERVER_HEARTBEAT_TIMEOUT", 10)))
+    parser.add_argument("--startup-timeout", type=float, default=float(os.getenv("SERVER_STARTUP_TIMEOUT", 30)))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("SERVER_GRACEFUL_TIMEOUT", 10)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - launcher[%(process)d] - %(levelname)s - %(message)s")
+    master = PreforkMaster(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        backlog=args.backlog,
+        heartbeat_interval=args.heartbeat_interval,
+        heartbeat_timeout=args.heartbeat_timeout,
+        startup_timeout=args.startup_timeout,
+        graceful_timeout=args.graceful_timeout,
+    )
+    master.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,143 @@
 import cherrypy
-from Utils.authentication import validate_bearer_token  # Импорт функции авторизации
+from Utils.authentication import validate_bearer_token, set_token_store  # Импорт функции авторизации
+from Utils.token_store import TokenStore, file_token_loader, db_token_loader
 from Handlers.error_handler import custom_error_handler
+from Utils.db_session import bind_db_session
+from Utils.compression import compress_response
+from Utils.json_encoder import json_handler
+from Utils.metrics import REGISTRY, RequestMetricsTool
+from Utils.admission import AdmissionClass, AdmissionController, AdmissionTool, TokenRateLimiter, READ, WRITE, BULK
+from cherrypy.process.plugins import Monitor
+from launcher import RequestPoolCheck, subscribe_heartbeat, HEARTBEAT_FD_ENV, WORKER_ID_ENV
 from dotenv import load_dotenv
 import os
-from logging import basicConfig, INFO
 import logging
+from Utils.decorators import configure_sampling
+from Utils.logging_setup import setup_logging, parse_sample_rates
 
-# Настройка логгера
+# Загрузка переменных окружения
+load_dotenv()
+
+# Настройка логгера: запись в файл выполняет фоновый поток, вызывающие потоки только ставят записи в очередь
 logger = logging.getLogger(__name__)
-logging.basicConfig(
+setup_logging(
     filename=os.path.join(os.getcwd(), 'app.log'),
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    structured=os.getenv("LOG_FORMAT", "text") == "json",
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", 10000))
+)
+# Выборочная запись успешных операций log_and_handle_errors, ошибки записываются всегда
+configure_sampling(
+    default_rate=float(os.getenv("LOG_SAMPLE_RATE", 1.0)),
+    rates=parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))
 )
 
 # Регистрация инструмента auth
 cherrypy.tools.auth = cherrypy.Tool('before_handler', validate_bearer_token)
+# Регистрация инструмента привязки запроса к сессии БД (read-your-writes для реплик)
+cherrypy.tools.db_session = cherrypy.Tool('before_handler', bind_db_session)
+# Регистрация инструмента сжатия ответов (gzip/deflate, brotli/zstd при наличии пакетов)
+cherrypy.tools.compress = cherrypy.Tool('before_finalize', compress_response, priority=80)
+# Регистрация инструмента метрик длительности запросов (GET /api/metrics), METRICS_ENABLED=0 отключает сбор
+cherrypy.tools.metrics = RequestMetricsTool()
+REGISTRY.enabled = os.getenv("METRICS_ENABLED", "1") != "0"
+
+
+def build_admission_controller() -> AdmissionController:
+    """
+    Создаёт контроллер допуска из переменных окружения ADMISSION_* и RATE_LIMIT_*.
+    Лимиты по умолчанию рассчитаны на пул соединений DB_POOL_MAX_SIZE,
+    очередь каждого класса по умолчанию равна его лимиту.
+    """
+    pool_size = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    queue_size = os.getenv("ADMISSION_QUEUE_SIZE")
+    queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 1.0))
+    limits = {
+        READ: int(os.getenv("ADMISSION_READ_LIMIT", pool_size)),
+        WRITE: int(os.getenv("ADMISSION_WRITE_LIMIT", max(1, pool_size // 2))),
+        BULK: int(os.getenv("ADMISSION_BULK_LIMIT", 2)),
+    }
+    classes = {
+        name: AdmissionClass(name, limit, int(queue_size) if queue_size else limit, queue_timeout)
+        for name, limit in limits.items() if limit > 0
+    }
+    rate = float(os.getenv("RATE_LIMIT_PER_TOKEN", 0))
+    rate_limiter = TokenRateLimiter(rate, int(os.getenv("RATE_LIMIT_BURST", 0))) if rate > 0 else None
+    return AdmissionController(classes, rate_limiter)
+
+
+def server_thread_pool(controller: AdmissionController, enabled: bool) -> int:
+    """
+    Возвращает размер пула потоков CherryPy. По умолчанию потоков хватает на лимиты
+    и очереди всех классов допуска и ещё ADMISSION_SPARE_THREADS потоков, которые
+    принимают запросы сверх очередей и сразу отвечают 503 (а также обслуживают /metrics).
+    Если SERVER_THREAD_POOL задан явно, очереди классов уменьшаются под него.
+    """
+    spare = int(os.getenv("ADMISSION_SPARE_THREADS", 4))
+    configured = os.getenv("SERVER_THREAD_POOL")
+    if not enabled:
+        return int(configured or 30)
+    if not configured:
+        return controller.threads_required() + spare
+    controller.fit_to_threads(int(configured) - spare)
+    return int(configured)
+
+
+# Регистрация инструмента допуска запросов: лимиты параллельности по классам (503) и частоты по токену (429)
+admission_controller = build_admission_controller()
+cherrypy.tools.admission = AdmissionTool(admission_controller)
 
 # Импорт контроллера после регистрации инструмента
 from Controllers.equipment_controller import EquipmentController
 
-# Загрузка переменных окружения
-load_dotenv()
-
 if __name__ == '__main__':
   
+    # DB_BACKEND=sqlite — встроенная база в файле DB_NAME без сервера БД
     db_config = {
+        "backend": os.getenv("DB_BACKEND", "mysql"),
         "host": os.getenv("DB_HOST"),
         "user": os.getenv("DB_USER"),
         "password": os.getenv("DB_PASSWORD"),
         "database": os.getenv("DB_NAME"),
     }
 
+    # Реплики для чтения: DB_REPLICA_HOSTS=host1:3306,host2:3307
+    replica_configs = []
+    for replica in filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")):
+        host, _, port = replica.strip().partition(":")
+        replica_config = dict(db_config, host=host)
+        if port:
+            replica_config["port"] = int(port)
+        replica_configs.append(replica_config)
+
+    pool_config = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        "acquire_timeout": float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 5)),
+        "idle_timeout": float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300)),
+        "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", 0)),
+        "replica_strategy": os.getenv("DB_REPLICA_STRATEGY", "round_robin"),
+        "replica_sticky_seconds": float(os.getenv("DB_REPLICA_STICKY_SECONDS", 5)),
+    }
+
+    admission_enabled = os.getenv("ADMISSION_ENABLED", "1") != "0"
+    thread_pool = server_thread_pool(admission_controller, admission_enabled)
     cherrypy.config.update({
-        'server.socket_host': '127.0.0.1',
-        'server.socket_port': 8080,
+        'server.socket_host': os.getenv("SERVER_HOST", "127.0.0.1"),
+        'server.socket_port': int(os.getenv("SERVER_PORT", 8080)),
+        # Потоков должно хватать на запросы всех классов допуска и их очереди,
+        # иначе лишние запросы ждут в очереди сокета, а не получают быстрый 503
+        'server.thread_pool': thread_pool,
+        'server.socket_queue_size': int(os.getenv("SERVER_SOCKET_QUEUE_SIZE", 128)),
+        'server.socket_timeout': float(os.getenv("SERVER_SOCKET_TIMEOUT", 10)),
+        # Время на завершение обрабатываемых запросов при остановке (в том числе при перезапуске воркера)
+        'server.shutdown_timeout': float(os.getenv("SERVER_SHUTDOWN_TIMEOUT", 5)),
         'tools.json_in.on': True,
         'tools.json_out.on': True,
         'tools.auth.on': True,  
         'log.screen': True,
         'engine.autoreload.on': False,
-        'request.error_response': custom_error_handler,  
+        'error_page.default': custom_error_handler,
         'request.show_tracebacks': False  
     })
 
@@ -48,9 +145,60 @@ if __name__ == '__main__':
         '/': {
             'request.dispatch': cherrypy.dispatch.MethodDispatcher(),
             'tools.auth.on': True,
+            'tools.db_session.on': True,
+            'tools.db_session.sticky_seconds': pool_config["replica_sticky_seconds"],
             'tools.json_in.on': True,
             'tools.json_out.on': True,
+            'tools.json_out.handler': json_handler,
+            'tools.compress.on': True,
+            'tools.compress.min_size': int(os.getenv("COMPRESS_MIN_SIZE", 1024)),
+            'tools.compress.level': int(os.getenv("COMPRESS_LEVEL", 6)),
+            'tools.metrics.on': True,
+            'tools.admission.on': admission_enabled,
         }
     }
 
-    cherrypy.quickstart(EquipmentController(db_config), '/api', config=dispatcher_conf)
\ No newline at end of file
+    controller = EquipmentController(db_config, pool_config, replica_configs)
+
+    # Хранилище токенов: файл (AUTH_TOKENS_FILE) или таблица (AUTH_TOKENS_TABLE) с периодической перезагрузкой,
+    # подписанные токены проверяются ключом AUTH_SIGNING_KEY без обращения к источнику
+    tokens_file = os.getenv("AUTH_TOKENS_FILE")
+    tokens_table = os.getenv("AUTH_TOKENS_TABLE")
+    signing_key = os.getenv("AUTH_SIGNING_KEY")
+    token_loader = None
+    if tokens_file:
+        token_loader = file_token_loader(tokens_file)
+    elif tokens_table:
+        token_loader = db_token_loader(controller.service.db, tokens_table)
+    if token_loader or signing_key:
+        token_store = TokenStore(loader=token_loader, signing_key=signing_key.encode() if signing_key else None)
+        token_store.reload()
+        set_token_store(token_store)
+        if token_loader:
+            reload_interval = float(os.getenv("AUTH_TOKENS_RELOAD_INTERVAL", 30))
+            Monitor(cherrypy.engine, token_store.reload, frequency=reload_interval, name="TokenStoreReload").subscribe()
+
+    if replica_configs:
+        # Периодическая проверка реплик и возврат восстановившихся в ротацию
+        router = controller.service.db.transaction_manager.router
+        Monitor(cherrypy.engine, router.check_health, frequency=10, name="ReplicaHealthCheck").subscribe()
+
+    # Периодическая сверка счётчиков количества оборудования по типам (0 — отключить);
+    # при запуске через launcher.py сверку выполняет только первый воркер
+    counter_reconcile_interval = float(os.getenv("COUNTER_RECONCILE_INTERVAL", 300))
+    if counter_reconcile_interval > 0 and os.getenv(WORKER_ID_ENV, "0") == "0":
+        Monitor(
+            cherrypy.engine, controller.service.reconcile_equipment_counters,
+            frequency=counter_reconcile_interval, name="EquipmentCounterReconcile"
+        ).subscribe()
+
+    # Маршруты /api/equipment/... (например, /api/equipment/export) обслуживает тот же контроллер
+    cherrypy.tree.mount(controller, '/api/equipment', config=dispatcher_conf)
+    # Воркер launcher.py сообщает мастеру о готовности и работоспособности:
+    # heartbeat отправляется, только если потоки обработки запросов не зависли и пул БД выдаёт соединение
+    if os.getenv(HEARTBEAT_FD_ENV):
+        subscribe_heartbeat(cherrypy.engine, [
+            RequestPoolCheck(cherrypy.engine, thread_pool, float(os.getenv("SERVER_REQUEST_STALL_TIMEOUT", 30))),
+            controller.service.db.ping,
+        ])
+    cherrypy.quickstart(controller, '/api', config=dispatcher_conf)
\ No newline at end of file
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS equipment_search_trigram (
+    field VARCHAR(32) NOT NULL,
+    trigram CHAR(3) NOT NULL,
+    equipment_id INT NOT NULL,
+    PRIMARY KEY (field, trigram, equipment_id),
+    KEY idx_equipment_search_trigram_equipment_id (equipment_id)
+);
\ No newline at end of file
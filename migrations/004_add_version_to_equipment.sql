@@ -0,0 +1,4 @@
+ALTER TABLE equipment
+    ADD COLUMN version BIGINT UNSIGNED NOT NULL DEFAULT 1,
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD KEY idx_equipment_deleted_updated_at (is_deleted, updated_at);
\ No newline at end of file
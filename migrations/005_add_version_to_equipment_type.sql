@@ -0,0 +1,3 @@
+ALTER TABLE equipment_type
+    ADD COLUMN version BIGINT UNSIGNED NOT NULL DEFAULT 1,
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
\ No newline at end of file
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS equipment_type_counter (
+    type_id INT PRIMARY KEY,
+    active_count BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (type_id) REFERENCES equipment_type(id) ON DELETE CASCADE
+) SELECT type_id, COUNT(*) AS active_count FROM equipment WHERE is_deleted = FALSE GROUP BY type_id;
\ No newline at end of file
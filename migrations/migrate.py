@@ -1,4 +1,8 @@
+import argparse
+import importlib.util
 import os
+import re
+import time
 import mysql.connector
 from dotenv import load_dotenv
 
@@ -17,6 +21,17 @@ DB_CONFIG = {
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
 
+# Файлы миграций: NNN_name.sql или NNN_name.py (Python-миграция с пакетным заполнением данных)
+MIGRATION_FILE = re.compile(r"^\d+_\w+\.(sql|py)$")
+# Заголовок SQL-миграции, выполняемой онлайн: "-- migrate: online [chunk_size=N] [max_rows_per_second=N]"
+ONLINE_HEADER = re.compile(r"^\s*--\s*migrate:\s*online\b(.*)$", re.IGNORECASE | re.MULTILINE)
+ALTER_TABLE = re.compile(r"^\s*ALTER\s+TABLE\s+`?(\w+)`?\s+(.+?)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+CONSTRAINT_NAME = re.compile(r"CONSTRAINT `(\w+)`")
+# Таблица прогресса онлайн-миграций и Python-миграций (для продолжения после сбоя)
+PROGRESS_TABLE = "migration_progress"
+# Как часто выводить прогресс, секунды
+PROGRESS_INTERVAL = 5.0
+
 def get_applied_migrations(connection):
     """
     Получает список уже примененных миграций из таблицы migrations.
@@ -47,21 +62,500 @@ def apply_migration(connection, migration_name, migration_path):
     finally:
         cursor.close()
 
+def record_migration(connection, migration_name):
+    """
+    Записывает миграцию в таблицу migrations.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("INSERT INTO migrations (migration_name) VALUES (%s)", (migration_name,))
+        connection.commit()
+    finally:
+        cursor.close()
+
+def begin(connection):
+    """
+    Начинает транзакцию пачки, если она ещё не начата.
+    """
+    if not connection.in_transaction:
+        connection.start_transaction()
+
+def ensure_progress_table(cursor):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        "migration_name VARCHAR(255) PRIMARY KEY, "
+        "last_key BIGINT NULL, "
+        "rows_done BIGINT NOT NULL DEFAULT 0)"
+    )
+
+def load_progress(cursor, migration_name):
+    """
+    Возвращает сохранённый прогресс миграции (last_key, rows_done) или None, если миграция не начиналась.
+    """
+    cursor.execute(f"SELECT last_key, rows_done FROM {PROGRESS_TABLE} WHERE migration_name = %s", (migration_name,))
+    row = cursor.fetchone()
+    return (row[0], int(row[1])) if row else None
+
+def save_progress(cursor, migration_name, last_key, rows_done):
+    """
+    Сохраняет прогресс миграции. Вызывается в транзакции пачки, поэтому прогресс
+    фиксируется вместе с данными пачки.
+    """
+    cursor.execute(
+        f"INSERT INTO {PROGRESS_TABLE} (migration_name, last_key, rows_done) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE last_key = VALUES(last_key), rows_done = VALUES(rows_done)",
+        (migration_name, last_key, rows_done)
+    )
+
+def clear_progress(cursor, migration_name):
+    cursor.execute(f"DELETE FROM {PROGRESS_TABLE} WHERE migration_name = %s", (migration_name,))
+
+
+class Progress:
+    """
+    Учёт обработанных строк: ограничение скорости (строк в секунду) и периодический
+    вывод прогресса с оценкой оставшегося времени.
+    """
+
+    def __init__(self, migration_name, total, max_rows_per_second=0, rows_done=0):
+        """
+        :param migration_name: Название миграции.
+        :param total: Оценка количества строк к обработке (None, если неизвестно).
+        :param max_rows_per_second: Ограничение скорости, 0 — без ограничения.
+        :param rows_done: Строки, обработанные до перезапуска миграции.
+        """
+        self.migration_name = migration_name
+        self.total = total
+        self.max_rows_per_second = max_rows_per_second
+        self.rows_done = rows_done
+        self.rows = 0
+        self.started = time.monotonic()
+        self.reported = self.started
+
+    def add(self, rows):
+        """
+        Учитывает обработанную пачку и при необходимости приостанавливает выполнение,
+        чтобы средняя скорость не превышала max_rows_per_second.
+        """
+        self.rows += rows
+        self.rows_done += rows
+        now = time.monotonic()
+        if self.max_rows_per_second > 0:
+            delay = self.rows / self.max_rows_per_second - (now - self.started)
+            if delay > 0:
+                time.sleep(delay)
+                now = time.monotonic()
+        if now - self.reported >= PROGRESS_INTERVAL:
+            self.reported = now
+            self.report()
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.rows / elapsed
+        message = f"{self.migration_name}: {self.rows_done} rows"
+        if self.total:
+            done = min(self.rows_done, self.total)
+            remaining = self.total - done
+            message += f" of ~{self.total} ({100.0 * done / self.total:.1f}%)"
+            if rate > 0:
+                message += f", ETA {remaining / rate:.0f}s"
+        print(f"{message}, {rate:.0f} rows/s")
+
+
+def parse_online_header(sql):
+    """
+    Возвращает параметры онлайн-миграции из заголовка или None, если миграция обычная.
+    """
+    match = ONLINE_HEADER.search(sql)
+    if not match:
+        return None
+    options = {}
+    for item in match.group(1).split():
+        key, _, value = item.partition("=")
+        options[key] = int(value)
+    return options
+
+def parse_alter_table(sql):
+    """
+    Извлекает имя таблицы и изменения из единственного оператора ALTER TABLE.
+    """
+    statement = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    match = ALTER_TABLE.match(statement)
+    if not match or ";" in match.group(2):
+        raise ValueError("Online migration must contain exactly one ALTER TABLE statement.")
+    return match.group(1), match.group(2)
+
+def shadow_table_ddl(create_sql, table, shadow):
+    """
+    Строит CREATE TABLE теневой таблицы из SHOW CREATE TABLE исходной.
+    Имена ограничений уникальны в схеме, поэтому у теневой таблицы они отличаются
+    префиксом "_" (при повторной миграции префикс снимается).
+    """
+    ddl = create_sql.replace(f"CREATE TABLE `{table}`", f"CREATE TABLE `{shadow}`", 1)
+    return CONSTRAINT_NAME.sub(
+        lambda match: f"CONSTRAINT `{match.group(1)[1:] if match.group(1).startswith('_') else '_' + match.group(1)}`",
+        ddl
+    )
+
+def trigger_names(table):
+    return [f"_{table}_osc_{action}" for action in ("ins", "upd", "del")]
+
+def trigger_statements(table, shadow, key, columns):
+    """
+    Триггеры, переносящие изменения исходной таблицы в теневую во время копирования.
+    Копирование пачек использует INSERT IGNORE, поэтому строки, уже записанные
+    триггером, не перезаписываются устаревшими данными.
+    """
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    new_values = ", ".join(f"NEW.`{column}`" for column in columns)
+    insert_name, update_name, delete_name = trigger_names(table)
+    return [
+        f"CREATE TRIGGER `{insert_name}` AFTER INSERT ON `{table}` FOR EACH ROW "
+        f"REPLACE INTO `{shadow}` ({column_list}) VALUES ({new_values})",
+        f"CREATE TRIGGER `{update_name}` AFTER UPDATE ON `{table}` FOR EACH ROW BEGIN "
+        f"DELETE IGNORE FROM `{shadow}` WHERE `{key}` = OLD.`{key}` AND OLD.`{key}` <> NEW.`{key}`; "
+        f"REPLACE INTO `{shadow}` ({column_list}) VALUES ({new_values}); END",
+        f"CREATE TRIGGER `{delete_name}` AFTER DELETE ON `{table}` FOR EACH ROW "
+        f"DELETE IGNORE FROM `{shadow}` WHERE `{key}` = OLD.`{key}`",
+    ]
+
+def table_columns(cursor, table):
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+        (table,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def column_definitions(cursor, table):
+    """
+    Возвращает описания столбцов таблицы (имя, тип, NULL, значение по умолчанию, EXTRA).
+    """
+    cursor.execute(
+        "SELECT COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+        (table,)
+    )
+    return [tuple(row) for row in cursor.fetchall()]
+
+def alter_already_applied(cursor, table, alter_spec):
+    """
+    Проверяет, что структура таблицы уже соответствует результату ALTER: ALTER,
+    применённый к пустой копии таблицы, не меняет её столбцы. Ошибка ALTER
+    (например, добавляемый столбец уже есть) не считается подтверждением.
+    """
+    probe = f"_{table}_probe"
+    cursor.execute(f"DROP TABLE IF EXISTS `{probe}`")
+    cursor.execute(f"SHOW CREATE TABLE `{table}`")
+    cursor.execute(shadow_table_ddl(cursor.fetchone()[1], table, probe))
+    try:
+        cursor.execute(f"ALTER TABLE `{probe}` {alter_spec}")
+        return column_definitions(cursor, probe) == column_definitions(cursor, table)
+    except mysql.connector.Error as e:
+        print(f"ALTER does not apply to the current structure of {table}: {e}")
+        return False
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS `{probe}`")
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return cursor.fetchone()[0] > 0
+
+def trigger_tables(cursor, names):
+    """
+    Возвращает {триггер: таблица} для существующих триггеров из names.
+    RENAME TABLE переносит триггеры вместе с таблицей, поэтому после обмена
+    таблиц триггеры онлайн-миграции оказываются на _<table>_old.
+    """
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(
+        "SELECT TRIGGER_NAME, EVENT_OBJECT_TABLE FROM information_schema.TRIGGERS "
+        f"WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN ({placeholders})",
+        tuple(names)
+    )
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+def primary_key_column(cursor, table):
+    """
+    Возвращает столбец первичного ключа. Онлайн-миграция копирует данные
+    диапазонами ключа, поэтому ключ должен состоять из одного столбца.
+    """
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'",
+        (table,)
+    )
+    columns = [row[0] for row in cursor.fetchall()]
+    if len(columns) != 1:
+        raise ValueError(f"Online migration requires a single-column primary key on table {table}.")
+    return columns[0]
+
+def check_no_referencing_tables(cursor, table):
+    """
+    Внешние ключи других таблиц после RENAME указывали бы на старую таблицу,
+    поэтому такие таблицы онлайн не мигрируются.
+    """
+    cursor.execute(
+        "SELECT DISTINCT TABLE_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE REFERENCED_TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = %s AND TABLE_NAME <> %s",
+        (table, table)
+    )
+    referencing = [row[0] for row in cursor.fetchall()]
+    if referencing:
+        raise ValueError(
+            f"Table {table} is referenced by foreign keys from {', '.join(referencing)}; online migration is not supported."
+        )
+
+def next_chunk_end(cursor, table, key, last_key, chunk_size, condition=None):
+    """
+    Возвращает последний ключ следующей пачки или None, если строк больше нет.
+    """
+    conditions = [condition] if condition else []
+    params = []
+    if last_key is not None:
+        conditions.append(f"`{key}` > %s")
+        params.append(last_key)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor.execute(
+        f"SELECT MAX(`{key}`) FROM (SELECT `{key}` FROM `{table}`{where} ORDER BY `{key}` LIMIT %s) AS chunk",
+        tuple(params) + (chunk_size,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def apply_online_migration(connection, migration_name, sql, chunk_size, max_rows_per_second, keep_old_table=False):
+    """
+    Применяет ALTER TABLE без длительной блокировки таблицы:
+    1. создаёт теневую таблицу _<table>_new с той же структурой и применяет к ней ALTER;
+    2. создаёт триггеры, которые переносят в неё изменения исходной таблицы;
+    3. копирует строки пачками по первичному ключу с ограничением скорости,
+       сохраняя прогресс в migration_progress после каждой пачки;
+    4. атомарно переименовывает таблицы (RENAME TABLE) и удаляет триггеры и старую таблицу.
+    После сбоя повторный запуск продолжает копирование с последней сохранённой пачки.
+    Если сбой произошёл после RENAME TABLE (это подтверждают триггеры или таблица
+    _<table>_old либо структура таблицы), повторный запуск только завершает очистку
+    и записывает миграцию; иначе, если теневая таблица или триггеры утеряны,
+    копирование начинается заново.
+    """
+    options = parse_online_header(sql) or {}
+    chunk_size = options.get("chunk_size", chunk_size)
+    max_rows_per_second = options.get("max_rows_per_second", max_rows_per_second)
+    table, alter_spec = parse_alter_table(sql)
+    shadow, old = f"_{table}_new", f"_{table}_old"
+    cursor = connection.cursor()
+    try:
+        ensure_progress_table(cursor)
+        key = primary_key_column(cursor, table)
+        check_no_referencing_tables(cursor, table)
+        progress_row = load_progress(cursor, migration_name)
+        if progress_row is not None:
+            names = trigger_names(table)
+            triggers = trigger_tables(cursor, names)
+            on_table = [name for name, target in triggers.items() if target == table]
+            shadow_exists = table_exists(cursor, shadow)
+            # Теневой таблицы и триггеров на исходной нет: либо обмен уже выполнен, либо
+            # они удалены до обмена (например, при ручной очистке). Обмен подтверждают
+            # триггеры, переехавшие на старую таблицу, сама старая таблица (finish_swap
+            # удаляет её последней) или структура таблицы, уже соответствующая ALTER
+            if not shadow_exists and not on_table and (
+                old in triggers.values() or table_exists(cursor, old)
+                or alter_already_applied(cursor, table, alter_spec)
+            ):
+                print(f"{migration_name}: {table} already swapped, finishing cleanup.")
+                finish_swap(connection, cursor, migration_name, table, old, keep_old_table)
+                return
+            if not shadow_exists or len(on_table) < len(names):
+                print(f"{migration_name}: {shadow} or triggers on {table} are missing, restarting the copy.")
+                clear_progress(cursor, migration_name)
+                connection.commit()
+                progress_row = None
+        if progress_row is None:
+            for name in trigger_names(table):
+                cursor.execute(f"DROP TRIGGER IF EXISTS `{name}`")
+            cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
+            cursor.execute(f"SHOW CREATE TABLE `{table}`")
+            cursor.execute(shadow_table_ddl(cursor.fetchone()[1], table, shadow))
+            cursor.execute(f"ALTER TABLE `{shadow}` {alter_spec}")
+            shadow_columns = set(table_columns(cursor, shadow))
+            columns = [column for column in table_columns(cursor, table) if column in shadow_columns]
+            for statement in trigger_statements(table, shadow, key, columns):
+                cursor.execute(statement)
+            save_progress(cursor, migration_name, None, 0)
+            connection.commit()
+            progress_row = (None, 0)
+            print(f"{migration_name}: created {shadow} and triggers on {table}.")
+        else:
+            shadow_columns = set(table_columns(cursor, shadow))
+            columns = [column for column in table_columns(cursor, table) if column in shadow_columns]
+            print(f"{migration_name}: resuming copy after {key} = {progress_row[0]}.")
+
+        last_key, rows_done = progress_row
+        cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+        progress = Progress(migration_name, cursor.fetchone()[0], max_rows_per_second, rows_done)
+        connection.commit()
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        while True:
+            begin(connection)
+            chunk_end = next_chunk_end(cursor, table, key, last_key, chunk_size)
+            if chunk_end is None:
+                connection.commit()
+                break
+            lower = f"`{key}` > %s AND " if last_key is not None else ""
+            params = ((last_key,) if last_key is not None else ()) + (chunk_end,)
+            cursor.execute(
+                f"INSERT IGNORE INTO `{shadow}` ({column_list}) SELECT {column_list} FROM `{table}` "
+                f"WHERE {lower}`{key}` <= %s LOCK IN SHARE MODE",
+                params
+            )
+            copied = cursor.rowcount
+            last_key = chunk_end
+            save_progress(cursor, migration_name, last_key, progress.rows_done + copied)
+            connection.commit()
+            progress.add(copied)
+        progress.report()
+
+        cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+        cursor.execute(f"RENAME TABLE `{table}` TO `{old}`, `{shadow}` TO `{table}`")
+        finish_swap(connection, cursor, migration_name, table, old, keep_old_table)
+    finally:
+        cursor.close()
+
+def finish_swap(connection, cursor, migration_name, table, old, keep_old_table):
+    """
+    Завершает онлайн-миграцию после RENAME TABLE: удаляет триггеры, очищает прогресс
+    и записывает миграцию (одной транзакцией), затем удаляет старую таблицу.
+    Старая таблица удаляется последней, поэтому, пока прогресс не очищен, она
+    подтверждает выполненный обмен. Повторный вызов после сбоя безопасен.
+    """
+    for name in trigger_names(table):
+        cursor.execute(f"DROP TRIGGER IF EXISTS `{name}`")
+    begin(connection)
+    clear_progress(cursor, migration_name)
+    cursor.execute("INSERT INTO migrations (migration_name) VALUES (%s)", (migration_name,))
+    connection.commit()
+    if not keep_old_table:
+        cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+    print(f"Applied online migration: {migration_name}")
+
+def load_python_migration(migration_path):
+    """
+    Загружает Python-миграцию. Модуль определяет:
+    - TABLE — таблица, строки которой обрабатываются пачками;
+    - migrate_batch(cursor, keys) — обработка пачки (ключи по возрастанию);
+    - необязательные KEY (по умолчанию "id"), WHERE (условие отбора строк),
+      BATCH_SIZE и MAX_ROWS_PER_SECOND.
+    """
+    name = os.path.splitext(os.path.basename(migration_path))[0]
+    spec = importlib.util.spec_from_file_location(f"migrations.{name}", migration_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "TABLE") or not callable(getattr(module, "migrate_batch", None)):
+        raise ValueError(f"Python migration {migration_path} must define TABLE and migrate_batch(cursor, keys).")
+    return module
+
+def apply_python_migration(connection, migration_name, migration_path, chunk_size, max_rows_per_second):
+    """
+    Выполняет Python-миграцию пачками. Каждая пачка и её прогресс фиксируются
+    одной транзакцией, поэтому после сбоя повторный запуск продолжает с первой
+    необработанной пачки и не обрабатывает строки дважды.
+    """
+    module = load_python_migration(migration_path)
+    table = module.TABLE
+    key = getattr(module, "KEY", "id")
+    condition = getattr(module, "WHERE", None)
+    chunk_size = getattr(module, "BATCH_SIZE", chunk_size)
+    max_rows_per_second = getattr(module, "MAX_ROWS_PER_SECOND", max_rows_per_second)
+    cursor = connection.cursor()
+    try:
+        ensure_progress_table(cursor)
+        last_key, rows_done = load_progress(cursor, migration_name) or (None, 0)
+        if rows_done:
+            print(f"{migration_name}: resuming after {key} = {last_key} ({rows_done} rows done).")
+        conditions = [condition] if condition else []
+        params = ()
+        if last_key is not None:
+            conditions.append(f"`{key}` > %s")
+            params = (last_key,)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor.execute(f"SELECT COUNT(*) FROM `{table}`{where}", params)
+        progress = Progress(migration_name, rows_done + cursor.fetchone()[0], max_rows_per_second, rows_done)
+        connection.commit()
+        while True:
+            begin(connection)
+            lower = f"`{key}` > %s" if last_key is not None else None
+            batch_conditions = [part for part in (condition, lower) if part]
+            batch_where = f" WHERE {' AND '.join(batch_conditions)}" if batch_conditions else ""
+            cursor.execute(
+                f"SELECT `{key}` FROM `{table}`{batch_where} ORDER BY `{key}` LIMIT %s",
+                ((last_key,) if last_key is not None else ()) + (chunk_size,)
+            )
+            keys = [row[0] for row in cursor.fetchall()]
+            if not keys:
+                connection.commit()
+                break
+            module.migrate_batch(cursor, keys)
+            last_key = keys[-1]
+            save_progress(cursor, migration_name, last_key, progress.rows_done + len(keys))
+            connection.commit()
+            progress.add(len(keys))
+        progress.report()
+        clear_progress(cursor, migration_name)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    record_migration(connection, migration_name)
+    print(f"Applied Python migration: {migration_name}")
+
 def main():
     """
     Основная функция для выполнения миграций.
     """
+    parser = argparse.ArgumentParser(description="Apply database migrations.")
+    parser.add_argument("--chunk-size", type=int, default=int(os.getenv("MIGRATION_CHUNK_SIZE", 1000)),
+                        help="строк в пачке онлайн-миграций и Python-миграций")
+    parser.add_argument("--max-rows-per-second", type=int, default=int(os.getenv("MIGRATION_MAX_ROWS_PER_SECOND", 0)),
+                        help="ограничение скорости копирования, 0 — без ограничения")
+    parser.add_argument("--keep-old-table", action="store_true",
+                        help="не удалять исходную таблицу после онлайн-миграции (остаётся как _<table>_old)")
+    args = parser.parse_args()
+
     connection = mysql.connector.connect(**DB_CONFIG)
     try:
         applied_migrations = get_applied_migrations(connection)
         all_migrations = sorted(os.listdir(MIGRATIONS_DIR))
 
         for migration in all_migrations:
-            if migration.endswith(".sql") and migration not in applied_migrations:
-                migration_path = os.path.join(MIGRATIONS_DIR, migration)
-                apply_migration(connection, migration, migration_path)
+            if not MIGRATION_FILE.match(migration) or migration in applied_migrations:
+                continue
+            migration_path = os.path.join(MIGRATIONS_DIR, migration)
+            if migration.endswith(".py"):
+                try:
+                    apply_python_migration(
+                        connection, migration, migration_path, args.chunk_size, args.max_rows_per_second
+                    )
+                except (mysql.connector.Error, ValueError) as e:
+                    print(f"Failed to apply migration {migration}: {e} (progress is saved, rerun to resume)")
+                continue
+            with open(migration_path, "r", encoding="utf-8") as file:
+                sql = file.read()
+            if parse_online_header(sql) is not None:
+                try:
+                    apply_online_migration(
+                        connection, migration, sql, args.chunk_size, args.max_rows_per_second, args.keep_old_table
+                    )
+                except (mysql.connector.Error, ValueError) as e:
+                    connection.rollback()
+                    print(f"Failed to apply migration {migration}: {e} (progress is saved, rerun to resume)")
+                continue
+            apply_migration(connection, migration, migration_path)
     finally:
         connection.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,149 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import cherrypy
+from Utils.admission import (
+    AdmissionClass, AdmissionController, AdmissionRejected, TokenRateLimiter, classify_request, BULK, READ, WRITE
+)
+
+
+def _request(method: str, path_info: str, token_hash: str = None, headers: dict = None):
+    request = MagicMock()
+    request.method = method
+    request.path_info = path_info
+    request.headers = headers or {}
+    request.token_hash = token_hash
+    request._admission = None
+    return request
+
+
+class TestAdmissionClass(unittest.TestCase):
+    def test_admits_up_to_limit_then_rejects_when_queue_full(self):
+        admission = AdmissionClass("read", limit=2, queue_size=0, queue_timeout=1.0)
+        self.assertIsNone(admission.acquire())
+        self.assertIsNone(admission.acquire())
+        self.assertEqual(admission.acquire(), 1)
+        self.assertEqual(admission.stats()["rejected"], 1)
+        admission.release(0.01)
+        self.assertIsNone(admission.acquire())
+
+    def test_waiter_gets_released_slot(self):
+        admission = AdmissionClass("write", limit=1, queue_size=1, queue_timeout=2.0)
+        self.assertIsNone(admission.acquire())
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(admission.acquire()))
+        waiter.start()
+        while admission.stats()["waiting"] == 0:
+            time.sleep(0.001)
+        # Очередь занята: новый запрос не обгоняет ожидающего и отклоняется сразу
+        self.assertIsNotNone(admission.acquire())
+        admission.release(0.01)
+        waiter.join(1)
+        self.assertEqual(results, [None])
+        self.assertEqual(admission.stats()["in_flight"], 1)
+
+    def test_queue_timeout(self):
+        admission = AdmissionClass("bulk", limit=1, queue_size=5, queue_timeout=0.05)
+        admission.acquire()
+        started = time.monotonic()
+        self.assertEqual(admission.acquire(), 1)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(admission.stats()["waiting"], 0)
+
+    def test_rejects_without_waiting_when_deadline_would_be_exceeded(self):
+        admission = AdmissionClass("read", limit=1, queue_size=5, queue_timeout=0.5)
+        admission.acquire()
+        admission.release(2.0)
+        admission.acquire()
+        started = time.monotonic()
+        self.assertEqual(admission.acquire(), 2)
+        self.assertLess(time.monotonic() - started, 0.1)
+
+
+class TestTokenRateLimiter(unittest.TestCase):
+    def test_bucket_per_token(self):
+        limiter = TokenRateLimiter(rate=1, burst=2)
+        self.assertIsNone(limiter.acquire("a"))
+        self.assertIsNone(limiter.acquire("a"))
+        self.assertEqual(limiter.acquire("a"), 1)
+        self.assertIsNone(limiter.acquire("b"))
+
+    def test_evicts_oldest_keys(self):
+        limiter = TokenRateLimiter(rate=1, burst=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        self.assertEqual(list(limiter._buckets), ["b", "c"])
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_classify_request(self):
+        self.assertEqual(classify_request(_request("GET", "/")), READ)
+        self.assertEqual(classify_request(_request("POST", "/batch")), READ)
+        self.assertEqual(classify_request(_request("POST", "/")), WRITE)
+        self.assertEqual(classify_request(_request("DELETE", "/5")), WRITE)
+        self.assertEqual(classify_request(_request("PATCH", "/")), BULK)
+        self.assertEqual(classify_request(_request("GET", "/export")), BULK)
+        self.assertEqual(classify_request(_request("POST", "/import")), BULK)
+        self.assertIsNone(classify_request(_request("GET", "/metrics")))
+
+    def test_classify_large_write_as_bulk(self):
+        self.assertEqual(classify_request(_request("POST", "/", headers={"Content-Length": "200"})), WRITE)
+        self.assertEqual(classify_request(_request("POST", "/", headers={"Content-Length": "500000"})), BULK)
+        self.assertEqual(classify_request(_request("POST", "/", headers={"Transfer-Encoding": "chunked"})), BULK)
+        self.assertEqual(classify_request(_request("POST", "/batch", headers={"Content-Length": "500000"})), READ)
+
+    def test_fit_to_threads_shrinks_queues(self):
+        controller = AdmissionController({
+            READ: AdmissionClass(READ, limit=10, queue_size=50),
+            BULK: AdmissionClass(BULK, limit=2, queue_size=50),
+        })
+        self.assertEqual(controller.threads_required(), 112)
+        controller.fit_to_threads(32)
+        self.assertEqual([admission.queue_size for admission in controller.classes.values()], [10, 10])
+        self.assertLessEqual(controller.threads_required(), 32)
+        with self.assertRaises(ValueError):
+            controller.fit_to_threads(11)
+
+    @patch("cherrypy.serving")
+    def test_overload_returns_503_with_retry_after(self, mock_serving):
+        controller = AdmissionController({READ: AdmissionClass(READ, limit=1, queue_size=0)})
+        mock_serving.request = _request("GET", "/")
+        controller.admit()
+        first = mock_serving.request
+
+        mock_serving.request = _request("GET", "/")
+        with self.assertRaises(AdmissionRejected) as context:
+            controller.admit()
+        self.assertEqual((context.exception.code, context.exception.retry_after), (503, 1))
+
+        mock_serving.request = first
+        controller.release()
+        controller.release()
+        self.assertEqual(controller.stats()[READ]["in_flight"], 0)
+
+    @patch("cherrypy.serving")
+    def test_rate_limit_returns_429(self, mock_serving):
+        controller = AdmissionController({}, TokenRateLimiter(rate=1, burst=1))
+        mock_serving.request = _request("POST", "/", token_hash="abc")
+        controller.admit()
+        with self.assertRaises(AdmissionRejected) as context:
+            controller.admit()
+        self.assertEqual(context.exception.code, 429)
+        # Запросы без токена (например, исключённые из auth) частотой не ограничиваются
+        mock_serving.request = _request("POST", "/")
+        controller.admit()
+
+    def test_rejection_keeps_retry_after_header(self):
+        error = AdmissionRejected(503, "overloaded", 3)
+        with patch("cherrypy.serving") as mock_serving:
+            mock_serving.response.headers = {"Retry-After": "old", "ETag": "x"}
+            mock_serving.request.show_tracebacks = False
+            with patch.object(cherrypy.HTTPError, "get_error_page", return_value=b""):
+                error.set_response()
+            self.assertEqual(mock_serving.response.headers["Retry-After"], "3")
+            self.assertNotIn("ETag", mock_serving.response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+import unittest
+from mysql.connector import errors
+from Database.backends import SQLiteBackend, get_backend, translate_to_sqlite
+from Database.connection_pool_manager import ConnectionPoolManager
+from Services.equipment_service import EquipmentService
+
+
+class TestSQLiteDialect(unittest.TestCase):
+    def test_translate_placeholders_and_locking(self):
+        self.assertEqual(
+            translate_to_sqlite("SELECT id FROM equipment WHERE id IN (%s, %s) AND is_deleted = 0 FOR UPDATE"),
+            "SELECT id FROM equipment WHERE id IN (?, ?) AND is_deleted = 0"
+        )
+        self.assertEqual(
+            translate_to_sqlite("SELECT id FROM equipment WHERE type_id = %s LIMIT 1 FOR UPDATE"),
+            "SELECT id FROM equipment WHERE type_id = ? LIMIT 1"
+        )
+
+    def test_translate_insert_ignore(self):
+        self.assertEqual(
+            translate_to_sqlite("INSERT IGNORE INTO t (a) VALUES (%s)"),
+            "INSERT OR IGNORE INTO t (a) VALUES (?)"
+        )
+
+    def test_translate_upsert(self):
+        self.assertEqual(
+            translate_to_sqlite(
+                "INSERT INTO c (k, n) VALUES (%s, %s) ON DUPLICATE KEY UPDATE n = n + VALUES(n)"
+            ),
+            "INSERT INTO c (k, n) VALUES (?, ?) ON CONFLICT DO UPDATE SET n = n + excluded.n"
+        )
+
+    def test_get_backend(self):
+        self.assertEqual(get_backend().name, "mysql")
+        self.assertIs(get_backend("sqlite"), get_backend("sqlite"))
+        with self.assertRaises(ValueError):
+            get_backend("oracle")
+
+
+class SQLiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.config = {"backend": "sqlite", "database": os.path.join(self.directory, "equipment.db")}
+
+
+class TestSQLiteConnection(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.connection = SQLiteBackend().connect({"database": self.config["database"]})
+        self.addCleanup(self.connection.close)
+
+    def test_cursor_api(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("t", "NNN"))
+            self.assertEqual(cursor.lastrowid, 1)
+            cursor.execute("SELECT id, name FROM equipment_type WHERE id = %s", (1,))
+            self.assertTrue(cursor.with_rows)
+            self.assertEqual(cursor.fetchone(), (1, "t"))
+        with self.connection.cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, name, version FROM equipment_type")
+            self.assertEqual(cursor.fetchall(), [{"id": 1, "name": "t", "version": 1}])
+
+    def test_transaction_rollback(self):
+        self.connection.start_transaction()
+        self.assertTrue(self.connection.in_transaction)
+        with self.connection.cursor() as cursor:
+            cursor.execute("INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("t", "NNN"))
+        self.connection.rollback()
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM equipment_type")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_errors_are_mysql_errors(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("t", "NNN"))
+            cursor.execute("INSERT INTO equipment (type_id, serial_number) VALUES (%s, %s)", (1, "ABC"))
+            with self.assertRaises(errors.IntegrityError):
+                cursor.execute("INSERT INTO equipment (type_id, serial_number) VALUES (%s, %s)", (1, "abc"))
+            with self.assertRaises(errors.DatabaseError):
+                cursor.execute("SELECT * FROM missing_table")
+
+
+class TestSQLitePool(SQLiteTestCase):
+    def test_pool_uses_backend(self):
+        pool = ConnectionPoolManager(self.config, {"min_size": 1, "max_size": 2, "validate_after": 0})
+        connection = pool.get_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+        connection.close()
+        self.assertEqual(pool.stats()["created"], 1)
+
+    def test_missing_database_key(self):
+        with self.assertRaises(ValueError):
+            ConnectionPoolManager({"backend": "sqlite"})
+
+
+class TestEquipmentServiceOnSQLite(SQLiteTestCase):
+    """
+    Запросы EquipmentService на настоящем движке SQL вместо моков.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.service = EquipmentService(self.config, pool_config={"min_size": 1, "max_size": 2})
+        with self.service.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("Router", "AAAANNNNNN")
+                )
+                self.type_id = cursor.lastrowid
+        success, message = self.service.add_equipment([
+            {"type_id": self.type_id, "serial_number": "ABCD000001", "note": "rack server"},
+            {"type_id": self.type_id, "serial_number": "ABCD000002", "note": "cold spare"},
+        ])
+        self.assertTrue(success, message)
+
+    def test_add_rejects_duplicates(self):
+        success, message = self.service.add_equipment(
+            [{"type_id": self.type_id, "serial_number": "ABCD000001", "note": "again"}]
+        )
+        self.assertFalse(success)
+        self.assertIn("already exists", message)
+
+    def test_list_filters_and_search(self):
+        self.assertEqual(len(self.service.get_all_equipment(1, 10, {})), 2)
+        found = self.service.get_all_equipment(1, 10, {"note": "spare"})
+        self.assertEqual([row["serial_number"] for row in found], ["ABCD000002"])
+        page = self.service.get_equipment_by_cursor("", 1, {})
+        self.assertEqual(len(page["items"]), 1)
+        self.assertIsNotNone(page["next_cursor"])
+
+    def test_search_treats_wildcards_literally(self):
+        self.service.update_equipment(1, {"note": "load 100%"})
+        self.assertEqual([row["id"] for row in self.service.get_all_equipment(1, 10, {"note": "0%"})], [1])
+        self.assertEqual([row["id"] for row in self.service.get_all_equipment(1, 10, {"note": "%"})], [1])
+        self.assertEqual(self.service.get_all_equipment(1, 10, {"note": "c_ld"}), [])
+
+    def test_rebuild_search_index(self):
+        with self.service.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM equipment_search_trigram WHERE equipment_id = 1")
+                cursor.execute(
+                    "INSERT INTO equipment_search_trigram (field, trigram, equipment_id) VALUES ('note', 'spa', 99)"
+                )
+            self.assertEqual(self.service.search_index.rebuild(connection, batch_size=1), 2)
+        self.assertEqual(len(self.service.get_all_equipment(1, 10, {"note": "rack"})), 1)
+        self.assertEqual(len(self.service.get_all_equipment(1, 10, {"note": "spare"})), 1)
+
+    def test_update_bumps_version_and_reindexes(self):
+        success, _ = self.service.update_equipment(1, {"note": "edge router"})
+        self.assertTrue(success)
+        equipment = self.service.get_equipment_by_id(1)
+        self.assertEqual((equipment["note"], equipment["version"]), ("edge router", 2))
+        self.assertEqual(len(self.service.get_all_equipment(1, 10, {"note": "router"})), 1)
+        self.assertEqual(self.service.get_all_equipment(1, 10, {"note": "rack"}), [])
+
+    def test_bulk_update_and_delete(self):
+        report = self.service.bulk_update_equipment([
+            {"id": 1, "fields": {"note": "a"}},
+            {"id": 99, "fields": {"note": "b"}},
+        ])
+        self.assertEqual((report["updated"], report["failed"]), (1, 1))
+        report = self.service.bulk_soft_delete_equipment({"ids": [1, 2, 99]})
+        self.assertEqual((report["deleted"], report["failed"]), (2, 1))
+        self.assertEqual(self.service.get_all_equipment(1, 10, {}), [])
+        self.assertEqual(list(self.service.stream_equipment({})), [])
+
+    def test_counters_follow_writes(self):
+        with self.service.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO equipment_type (name, serial_mask) VALUES (%s, %s)", ("Switch", "AAAANNNNNN")
+                )
+                other_type_id = cursor.lastrowid
+        self.service.invalidate_serial_masks()
+        self.assertEqual(self.service.get_equipment_total({}), (2, True))
+
+        self.service.update_equipment(1, {"type_id": other_type_id})
+        self.assertEqual(self.service.get_equipment_total({"type_id": self.type_id}), (1, True))
+        self.assertEqual(self.service.get_equipment_total({"type_id": other_type_id}), (1, True))
+
+        self.service.bulk_update_equipment([{"id": 2, "fields": {"type_id": other_type_id}}])
+        self.assertEqual(self.service.get_equipment_total({"type_id": other_type_id}), (2, True))
+
+        self.service.soft_delete_equipment(1)
+        self.service.soft_delete_equipment(1)
+        self.service.bulk_soft_delete_equipment({"ids": [2, 1]})
+        self.assertEqual(self.service.get_equipment_total({}), (0, True))
+        self.assertEqual(self.service.reconcile_equipment_counters(), {})
+
+    def test_reconcile_fixes_drift(self):
+        with self.service.db.transaction_manager.transaction_context() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("UPDATE equipment_type_counter SET active_count = 10")
+        self.assertEqual(self.service.get_equipment_total({}), (10, True))
+        self.assertEqual(
+            self.service.reconcile_equipment_counters(), {self.type_id: {"stored": 10, "actual": 2}}
+        )
+        self.assertEqual(self.service.get_equipment_total({}), (2, True))
+
+    def test_total_for_text_filter(self):
+        self.assertEqual(self.service.get_equipment_total({"note": "spare"}), (1, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+from Utils.cache import LRUTTLCache, MISSING
+
+class TestLRUTTLCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = LRUTTLCache(max_size=2, ttl=10)
+        self.assertIs(cache.get("a"), MISSING)
+        cache.set("a", None)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = LRUTTLCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUTTLCache(max_size=2, ttl=10)
+        with patch("Utils.cache.time.monotonic", side_effect=[0, 5, 11]):
+            cache.set("a", 1)
+            self.assertEqual(cache.get("a"), 1)
+            self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_delete_and_clear(self):
+        cache = LRUTTLCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        self.assertIs(cache.get("a"), MISSING)
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_values_are_copied(self):
+        cache = LRUTTLCache()
+        value = {"id": 1}
+        cache.set("a", value)
+        value["id"] = 2
+        cache.get("a")["id"] = 3
+        self.assertEqual(cache.get("a"), {"id": 1})
+
+    def test_set_skipped_after_invalidation(self):
+        cache = LRUTTLCache()
+        generation = cache.generation()
+        cache.delete("a")
+        cache.set("a", 1, generation)
+        self.assertIs(cache.get("a"), MISSING)
+        cache.set("a", 2, cache.generation())
+        self.assertEqual(cache.get("a"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import gzip
+import unittest
+import zlib
+from cherrypy import _cprequest
+from cherrypy.lib import httputil
+import cherrypy
+from Utils.compression import compress_response, negotiate_encoding
+
+
+class TestCompression(unittest.TestCase):
+    def _load(self, accept_encoding=None, body=b"x" * 2000, content_type="application/json"):
+        request = _cprequest.Request(httputil.Host("127.0.0.1", 80), httputil.Host("127.0.0.1", 5000))
+        request.headers = httputil.HeaderMap()
+        if accept_encoding is not None:
+            request.headers["Accept-Encoding"] = accept_encoding
+        response = _cprequest.Response()
+        response.headers = httputil.HeaderMap()
+        response.headers["Content-Type"] = content_type
+        response.headers["ETag"] = '"abc"'
+        response.body = body
+        cherrypy.serving.load(request, response)
+        return response
+
+    def test_negotiate_encoding(self):
+        available = ["br", "gzip", "deflate"]
+        self.assertEqual(negotiate_encoding("gzip, deflate", available), "gzip")
+        self.assertEqual(negotiate_encoding("deflate;q=1, gzip;q=0.5", available), "deflate")
+        self.assertEqual(negotiate_encoding("gzip;q=0, *;q=0.1", ["gzip", "deflate"]), "deflate")
+        self.assertIsNone(negotiate_encoding("identity", available))
+        self.assertIsNone(negotiate_encoding("", available))
+
+    def test_gzip_response(self):
+        response = self._load("gzip")
+        compress_response(min_size=1024)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.collapse_body()), b"x" * 2000)
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(response.headers["ETag"], 'W/"abc"')
+
+    def test_deflate_response(self):
+        response = self._load("deflate")
+        compress_response(min_size=1024)
+        self.assertEqual(zlib.decompress(response.collapse_body()), b"x" * 2000)
+
+    def test_small_body_not_compressed(self):
+        response = self._load("gzip", body=b"{}")
+        compress_response(min_size=1024)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    def test_other_mime_type_not_compressed(self):
+        response = self._load("gzip", content_type="image/png")
+        compress_response(min_size=1024)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_stream_not_compressed(self):
+        response = self._load("gzip")
+        response.stream = True
+        compress_response(min_size=1024)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import mysql.connector
+from mysql.connector import errors
+from Database.connection_pool_manager import ConnectionPoolManager
+
+DB_CONFIG = {"user": "mock_user", "password": "mock_password", "host": "mock_host", "database": "mock_db"}
+
+class TestConnectionPoolManager(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("Database.connection_pool_manager.mysql.connector.connect")
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_connect.side_effect = lambda **kwargs: MagicMock(in_transaction=False, unread_result=False)
+
+    def make_pool(self, **pool_config):
+        return ConnectionPoolManager(DB_CONFIG, pool_config)
+
+    def test_missing_config_key(self):
+        with self.assertRaises(ValueError):
+            ConnectionPoolManager({"user": "u"})
+
+    def test_prefills_min_size(self):
+        pool = self.make_pool(min_size=2, max_size=4)
+        self.assertEqual(self.mock_connect.call_count, 2)
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_grows_up_to_max_size_and_reuses(self):
+        pool = self.make_pool(min_size=0, max_size=2)
+        first = pool.get_connection()
+        second = pool.get_connection()
+        self.assertEqual(pool.stats()["in_use"], 2)
+        first_raw = first.raw_connection
+        first.close()
+        first.close()
+        third = pool.get_connection()
+        self.assertEqual(self.mock_connect.call_count, 2)
+        self.assertIs(third.raw_connection, first_raw)
+        second.close()
+        third.close()
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["in_use"], stats["idle"]), (2, 0, 2))
+
+    def test_acquire_timeout_raises_pool_error(self):
+        pool = self.make_pool(min_size=0, max_size=1, acquire_timeout=0.05)
+        connection = pool.get_connection()
+        with self.assertRaises(errors.PoolError):
+            pool.get_connection()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        connection.close()
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(min_size=0, max_size=1, acquire_timeout=2)
+        connection = pool.get_connection()
+        result = {}
+
+        def borrow():
+            borrowed = pool.get_connection()
+            result["connection"] = borrowed.raw_connection
+            borrowed.close()
+
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        time.sleep(0.05)
+        raw = connection.raw_connection
+        connection.close()
+        thread.join(2)
+        self.assertIs(result["connection"], raw)
+        self.assertGreater(pool.stats()["wait_time_max"], 0)
+
+    def test_shrinks_idle_connections(self):
+        pool = self.make_pool(min_size=1, max_size=3, idle_timeout=0)
+        connections = [pool.get_connection() for _ in range(3)]
+        for connection in connections:
+            connection.close()
+        self.assertEqual(pool.stats()["size"], 1)
+        self.assertEqual(pool.stats()["closed"], 2)
+
+    def test_validates_idle_connection_on_borrow(self):
+        pool = self.make_pool(min_size=1, max_size=1, validate_after=0)
+        dead = pool._idle[0][0]
+        dead.ping.side_effect = mysql.connector.errors.InterfaceError("gone")
+        connection = pool.get_connection()
+        self.assertIsNot(connection.raw_connection, dead)
+        self.assertEqual(pool.stats()["validation_failures"], 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        pool = self.make_pool(min_size=1, max_size=1)
+        connection = pool.get_connection()
+        raw = connection.raw_connection
+        raw.in_transaction = True
+        connection.close()
+        raw.rollback.assert_called_once()
+
+    def test_release_drops_connection_with_unread_result(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        connection = pool.get_connection()
+        raw = connection.raw_connection
+        raw.unread_result = True
+        connection.close()
+        raw.close.assert_called_once()
+        self.assertEqual(pool.stats()["size"], 0)
+        self.assertIsNot(pool.get_connection().raw_connection, raw)
+
+    def test_discard_closes_connection_and_frees_slot(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        connection = pool.get_connection()
+        raw = connection.raw_connection
+        connection.discard()
+        connection.close()
+        raw.close.assert_called_once()
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["in_use"], stats["idle"]), (0, 0, 0))
+        self.assertIsNot(pool.get_connection().raw_connection, raw)
+
+if __name__ == "__main__":
+    unittest.main()
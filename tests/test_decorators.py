@@ -0,0 +1,66 @@
+import logging
+import unittest
+from unittest.mock import patch
+import cherrypy
+from Utils.decorators import log_and_handle_errors, configure_sampling
+
+
+@log_and_handle_errors("Sampled operation")
+def sampled_operation(value):
+    if value == "error":
+        raise RuntimeError("boom")
+    if value == "invalid":
+        raise ValueError("bad value")
+    if value == "redirect":
+        raise cherrypy.HTTPRedirect([], 304)
+    return value
+
+
+class TestLogAndHandleErrors(unittest.TestCase):
+    def tearDown(self):
+        configure_sampling()
+
+    def test_success_logs_single_record_with_duration(self):
+        with self.assertLogs("Utils.decorators", level="INFO") as logs:
+            self.assertEqual(sampled_operation(1), 1)
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.operation, "Sampled operation")
+        self.assertEqual(record.status, "ok")
+        self.assertGreaterEqual(record.duration_ms, 0)
+
+    def test_sampling_skips_successes(self):
+        configure_sampling(default_rate=1.0, rates={"Sampled operation": 0.0})
+        with patch("Utils.decorators.logger") as mock_logger:
+            for _ in range(10):
+                sampled_operation(1)
+        mock_logger.info.assert_not_called()
+
+    def test_partial_sampling(self):
+        configure_sampling(default_rate=0.5)
+        with patch("Utils.decorators.random.random", side_effect=[0.1, 0.9]), \
+                patch("Utils.decorators.logger") as mock_logger:
+            sampled_operation(1)
+            sampled_operation(1)
+        self.assertEqual(mock_logger.info.call_count, 1)
+
+    def test_errors_always_logged(self):
+        configure_sampling(default_rate=0.0)
+        with self.assertLogs("Utils.decorators", level="ERROR") as logs:
+            with self.assertRaises(RuntimeError):
+                sampled_operation("error")
+            with self.assertRaises(ValueError):
+                sampled_operation("invalid")
+        self.assertEqual([record.status for record in logs.records], ["error", "error"])
+        self.assertIsNotNone(logs.records[0].exc_info)
+
+    def test_redirect_is_not_an_error(self):
+        with self.assertLogs("Utils.decorators", level="INFO") as logs:
+            with self.assertRaises(cherrypy.HTTPRedirect):
+                sampled_operation("redirect")
+        self.assertEqual(logs.records[0].levelno, logging.INFO)
+        self.assertEqual(logs.records[0].status, "304")
+
+
+if __name__ == "__main__":
+    unittest.main()
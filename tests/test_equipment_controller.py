@@ -1,13 +1,24 @@
+import io
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 import cherrypy
+from cherrypy import _cprequest
+from cherrypy.lib import httputil
+from Utils.authentication import validate_bearer_token
+
+# Инструмент auth регистрируется в main.py до импорта контроллера
+cherrypy.tools.auth = cherrypy.Tool('before_handler', validate_bearer_token)
+
 from Controllers.equipment_controller import EquipmentController
 
 class TestEquipmentController(unittest.TestCase):
-    def setUp(self):
+    @patch("Controllers.equipment_controller.EquipmentService")
+    def setUp(self, MockEquipmentService):
         self.mock_service = MagicMock()
         self.controller = EquipmentController(config={})
         self.controller.service = self.mock_service
+        self.controller.export.service = self.mock_service
 
     @patch("cherrypy.request")
     def test_get_equipment_by_id(self, mock_request):
@@ -33,6 +44,53 @@ class TestEquipmentController(unittest.TestCase):
         self.mock_service.get_all_equipment.assert_called_once_with(2, 5, {'type_id': 1, 'serial_number': 'ABC', 'note': 'test'})
         self.assertEqual(response, [{"id": 2, "name": "Filtered Equipment"}])
 
+    @patch("cherrypy.request")
+    def test_get_all_equipment_by_cursor(self, mock_request):
+        mock_request.method = "GET"
+        self.mock_service.get_equipment_by_cursor.return_value = {"items": [], "next_cursor": None}
+        response = self.controller.GET(cursor="abc", limit=5, type_id=1)
+        self.mock_service.get_equipment_by_cursor.assert_called_once_with("abc", 5, {"type_id": 1})
+        self.mock_service.get_all_equipment.assert_not_called()
+        self.assertEqual(response, {"items": [], "next_cursor": None})
+
+    @patch("cherrypy.request")
+    def test_invalid_cursor_returns_400(self, mock_request):
+        mock_request.method = "GET"
+        self.mock_service.get_equipment_by_cursor.side_effect = ValueError("Invalid pagination cursor")
+        with self.assertRaises(cherrypy.HTTPError) as context:
+            self.controller.GET(cursor="not-a-cursor", limit=5)
+        self.assertEqual(context.exception.code, 400)
+        self.assertEqual(context.exception._message, "Invalid pagination cursor")
+
+    @patch("cherrypy.request")
+    def test_invalid_limit_returns_400_naming_limit(self, mock_request):
+        mock_request.method = "GET"
+        for limit in ("abc", "0", "-5"):
+            with self.subTest(limit=limit):
+                with self.assertRaises(cherrypy.HTTPError) as context:
+                    self.controller.GET(cursor="", limit=limit)
+                self.assertEqual(context.exception.code, 400)
+                self.assertEqual(context.exception._message, "limit must be a positive integer.")
+        with self.assertRaises(cherrypy.HTTPError) as context:
+            self.controller.equipment_type(cursor="", limit="x")
+        self.assertEqual(context.exception._message, "limit must be a positive integer.")
+        self.mock_service.get_equipment_by_cursor.assert_not_called()
+        self.mock_service.get_equipment_types_by_cursor.assert_not_called()
+
+    @patch("cherrypy.request")
+    def test_get_all_equipment_with_total(self, mock_request):
+        mock_request.method = "GET"
+        self.mock_service.get_all_equipment.return_value = [{"id": 1}]
+        self.mock_service.get_equipment_total.return_value = (42, True)
+        response = self.controller.GET(page=1, limit=10, type_id=1, with_total="true")
+        self.mock_service.get_equipment_total.assert_called_once_with({"type_id": 1})
+        self.assertEqual(response, {"items": [{"id": 1}], "total": 42, "total_exact": True})
+
+        self.mock_service.get_equipment_by_cursor.return_value = {"items": [], "next_cursor": None}
+        self.mock_service.get_equipment_total.return_value = (7, False)
+        response = self.controller.GET(cursor="", limit=5, note="spare", with_total="1")
+        self.assertEqual(response, {"items": [], "next_cursor": None, "total": 7, "total_exact": False})
+
     @patch("cherrypy.request")
     def test_post_equipment(self, mock_request):
         mock_request.method = "POST"
@@ -90,5 +148,149 @@ class TestEquipmentController(unittest.TestCase):
         self.mock_service.get_all_equipment_types.assert_called_once_with(1, 10)
         self.assertEqual(response, [{"id": 1, "type": "Type A"}])
 
+    @patch("cherrypy.response")
+    def test_export_ndjson(self, mock_response):
+        mock_response.headers = {}
+        self.mock_service.EXPORT_FIELDS = ("id", "serial_number")
+        self.mock_service.stream_equipment.return_value = (batch for batch in [[(1, "A")], [(2, "B")]])
+        chunks = list(self.controller.export.GET(format="ndjson", batch_size=500, type_id=1))
+        self.controller.export.service.stream_equipment.assert_called_once_with({"type_id": 1}, 500)
+        self.assertEqual(chunks, [b"\n", b'{"id": 1, "serial_number": "A"}\n', b'{"id": 2, "serial_number": "B"}\n'])
+        self.assertEqual(mock_response.headers["Content-Type"], "application/x-ndjson")
+
+    @patch("cherrypy.response")
+    def test_export_csv(self, mock_response):
+        mock_response.headers = {}
+        self.mock_service.EXPORT_FIELDS = ("id", "note")
+        self.mock_service.stream_equipment.return_value = (batch for batch in [[(1, "a,b")]])
+        chunks = list(self.controller.export.GET(format="csv"))
+        self.assertEqual(chunks, [b"id,note\r\n", b'1,"a,b"\r\n'])
+
+    @patch("cherrypy.response")
+    def test_export_ndjson_sends_first_chunk_before_query(self, mock_response):
+        mock_response.headers = {}
+        self.mock_service.EXPORT_FIELDS = ("id",)
+        batches = MagicMock()
+        self.mock_service.stream_equipment.return_value = batches
+        chunks = self.controller.export.GET(format="ndjson")
+        self.assertEqual(next(chunks), b"\n")
+        batches.__iter__.assert_not_called()
+        chunks.close()
+
+    @patch("cherrypy.response")
+    def test_export_unknown_format(self, mock_response):
+        with self.assertRaises(cherrypy.HTTPError):
+            self.controller.export.GET(format="xml")
+
+    @patch("cherrypy.response")
+    @patch("cherrypy.request")
+    def test_import_streams_reports(self, mock_request, mock_response):
+        mock_response.headers = {}
+        import_controller = getattr(self.controller, "import")
+        import_controller.service = self.mock_service
+        import_controller.READ_BLOCK_SIZE = 4
+        mock_request.rfile = io.BytesIO(b'{"a": 1}\n{"b": 2}')
+        self.mock_service.import_equipment_stream.side_effect = lambda lines, chunk_size: iter(
+            [{"lines": [line.decode() for line in lines], "chunk_size": chunk_size}]
+        )
+        chunks = list(import_controller.POST(chunk_size="50"))
+        self.assertEqual(json.loads(chunks[0]), {"lines": ['{"a": 1}', '{"b": 2}'], "chunk_size": 50})
+        self.assertEqual(mock_response.headers["Content-Type"], "application/x-ndjson")
+
+    @patch("cherrypy.request")
+    def test_patch_bulk_update(self, mock_request):
+        mock_request.json = [{"id": 1, "fields": {"note": "x"}}]
+        self.mock_service.bulk_update_equipment.return_value = {"results": [], "updated": 1, "failed": 0}
+        response = self.controller.PATCH()
+        self.mock_service.bulk_update_equipment.assert_called_once_with([{"id": 1, "fields": {"note": "x"}}])
+        self.assertEqual(response["updated"], 1)
+
+    @patch("cherrypy.request")
+    def test_patch_bulk_update_invalid_body(self, mock_request):
+        mock_request.json = {}
+        self.mock_service.bulk_update_equipment.side_effect = ValueError("bad body")
+        with self.assertRaises(cherrypy.HTTPError):
+            self.controller.PATCH()
+
+    @patch("cherrypy.request")
+    def test_bulk_delete(self, mock_request):
+        self.controller.bulk_delete.service = self.mock_service
+        mock_request.json = {"ids": [1, 2]}
+        self.mock_service.bulk_soft_delete_equipment.return_value = {"results": [], "deleted": 2, "failed": 0}
+        response = self.controller.bulk_delete.POST()
+        self.mock_service.bulk_soft_delete_equipment.assert_called_once_with({"ids": [1, 2]})
+        self.assertEqual(response["deleted"], 2)
+
+    @patch("cherrypy.request")
+    def test_get_equipment_by_ids(self, mock_request):
+        self.mock_service.get_equipment_by_ids.return_value = [{"id": 2}, {"id": 1, "not_found": True}]
+        response = self.controller.GET(ids="2, 1,")
+        self.mock_service.get_equipment_by_ids.assert_called_once_with([2, 1])
+        self.assertEqual(response[1]["not_found"], True)
+
+    @patch("cherrypy.request")
+    def test_get_equipment_by_ids_invalid(self, mock_request):
+        with self.assertRaises(cherrypy.HTTPError):
+            self.controller.GET(ids="1,abc")
+
+    @patch("cherrypy.request")
+    def test_post_batch(self, mock_request):
+        self.controller.batch.service = self.mock_service
+        mock_request.json = {"ids": [3, 4]}
+        self.controller.batch.POST()
+        self.mock_service.get_equipment_by_ids.assert_called_once_with([3, 4])
+
+    def _load_request(self, if_none_match=None):
+        request = _cprequest.Request(httputil.Host("127.0.0.1", 80), httputil.Host("127.0.0.1", 5000))
+        request.method = "GET"
+        request.headers = httputil.HeaderMap()
+        if if_none_match:
+            request.headers["If-None-Match"] = if_none_match
+        response = _cprequest.Response()
+        cherrypy.serving.load(request, response)
+        return response
+
+    def test_get_equipment_by_id_sets_etag(self):
+        response = self._load_request()
+        self.mock_service.get_equipment_by_id.return_value = {"id": 1, "version": 4}
+        self.controller.GET(id=1)
+        self.assertEqual(response.headers["ETag"], '"equipment-1-4"')
+
+    def test_get_equipment_by_id_not_modified(self):
+        self._load_request('"equipment-1-4"')
+        self.mock_service.get_equipment_by_id.return_value = {"id": 1, "version": 4}
+        with self.assertRaises(cherrypy.HTTPRedirect) as context:
+            self.controller.GET(id=1)
+        self.assertEqual(context.exception.status, 304)
+
+    def test_get_list_not_modified_skips_query(self):
+        response = self._load_request()
+        self.mock_service.get_equipment_list_version.return_value = "10:2026-01-01"
+        self.controller.GET(page=1, limit=10, type_id="2")
+        etag = response.headers["ETag"]
+
+        self._load_request(etag)
+        self.mock_service.get_all_equipment.reset_mock()
+        with self.assertRaises(cherrypy.HTTPRedirect) as context:
+            self.controller.GET(page=1, limit=10, type_id="2")
+        self.assertEqual(context.exception.status, 304)
+        self.mock_service.get_all_equipment.assert_not_called()
+        self.mock_service.get_equipment_list_version.assert_called_with({"type_id": "2"})
+
+        response = self._load_request(etag)
+        self.controller.GET(page=2, limit=10, type_id="2")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_get_list_version_and_page_read_from_pinned_pool(self):
+        self._load_request()
+        calls = []
+        pinned = self.mock_service.pinned_reads.return_value
+        pinned.__enter__.side_effect = lambda *args: calls.append("pin")
+        pinned.__exit__.side_effect = lambda *args: calls.append("unpin")
+        self.mock_service.get_equipment_list_version.side_effect = lambda filters: calls.append("version") or "1:x"
+        self.mock_service.get_all_equipment.side_effect = lambda *args: calls.append("page") or []
+        self.controller.GET(page=1, limit=10)
+        self.assertEqual(calls, ["pin", "version", "page", "unpin"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
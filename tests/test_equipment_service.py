@@ -1,10 +1,13 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from Services.equipment_service import EquipmentService
+from Utils.cache import MISSING
 
 class TestEquipmentService(unittest.TestCase):
-    def setUp(self):
+    @patch("Services.equipment_service.QueryExecutor")
+    def setUp(self, MockQueryExecutor):
         self.mock_db = MagicMock()
+        self.mock_db.transaction_manager.last_read_from_replica.return_value = False
         self.service = EquipmentService(config={})
         self.service.db = self.mock_db
 
@@ -34,13 +37,70 @@ class TestEquipmentService(unittest.TestCase):
 
     def test_add_equipment_duplicate(self):
         self.service._validate_serial_by_type = MagicMock(return_value=(True, ""))
-        self.service._is_unique_equipment = MagicMock(return_value=False)
         self.mock_db.transaction_manager.transaction_context.return_value.__enter__.return_value = self.mock_db
+        cursor = self.mock_db.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(1, "NAAZXX")]
 
         equipment_list = [{"type_id": 1, "serial_number": "NAAZXX", "note": "Test Note"}]
         result = self.service.add_equipment(equipment_list)
         self.assertFalse(result[0])
         self.assertIn("already exists", result[1].lower())
+        cursor.executemany.assert_not_called()
+
+    def test_add_equipment_bulk_single_uniqueness_query(self):
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NNNN"}]
+        self.mock_db.transaction_manager.transaction_context.return_value.__enter__.return_value = self.mock_db
+        cursor = self.mock_db.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[(1, "0002")], []]
+
+        equipment_list = [{"type_id": 1, "serial_number": f"{i:04d}"} for i in range(5)]
+        equipment_list.insert(1, {"type_id": 1, "serial_number": "BAD"})
+        equipment_list.append({"type_id": 1, "serial_number": "0000"})
+        success, message = self.service.add_equipment(equipment_list)
+
+        self.assertTrue(success)
+        uniqueness_queries = [c for c in cursor.execute.call_args_list if c[0][0].startswith("SELECT type_id, serial_number")]
+        self.assertEqual(len(uniqueness_queries), 1)
+        insert_calls = [c for c in cursor.executemany.call_args_list if c[0][0].startswith("INSERT INTO equipment ")]
+        self.assertEqual(len(insert_calls), 1)
+        inserted = insert_calls[0][0][1]
+        self.assertEqual([row[1] for row in inserted], ["0000", "0001", "0003", "0004"])
+        self.assertIn("Added 4 equipment(s)", message)
+        self.assertLess(message.index("'BAD'"), message.index("'0002'"))
+        self.assertLess(message.index("'0002'"), message.index("'0000' already exists"))
+        self.assertEqual(self.mock_db.execute.call_count, 1)
+
+    def test_import_equipment_stream_commits_per_chunk(self):
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NNNN"}]
+        connection = self.mock_db.transaction_manager.transaction_context.return_value.__enter__.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+
+        lines = [b'{"type_id": 1, "serial_number": "0001"}\n', b"{bad\n", b"\n",
+                 b'"text"\n', b'{"type_id": 1, "serial_number": "X"}\n', b'{"type_id": 1, "serial_number": "0002"}']
+        reports = list(self.service.import_equipment_stream(lines, chunk_size=2))
+
+        self.assertEqual([r["chunk"] for r in reports[:-1]], [1, 2, 3])
+        self.assertEqual(reports[0]["errors"], [{"line": 2, "error": reports[0]["errors"][0]["error"]}])
+        self.assertIn("Invalid JSON", reports[0]["errors"][0]["error"])
+        self.assertEqual([e["line"] for e in reports[1]["errors"]], [4, 5])
+        self.assertEqual(reports[-1], {"summary": True, "lines": 6, "inserted": 2, "failed": 3, "chunks": 3})
+        self.assertEqual(self.mock_db.transaction_manager.transaction_context.call_count, 2)
+
+    def test_import_equipment_stream_rolls_back_failed_chunk(self):
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NNNN"}]
+        connection = self.mock_db.transaction_manager.transaction_context.return_value.__enter__.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+        cursor.executemany.side_effect = [Exception("deadlock"), None, None]
+
+        lines = ['{"type_id": 1, "serial_number": "0001"}', '{"type_id": 1, "serial_number": "0002"}']
+        reports = list(self.service.import_equipment_stream(lines, chunk_size=1))
+
+        self.assertIn("rolled back", reports[0]["error"])
+        self.assertEqual(reports[0]["errors"], [{"line": 1, "error": "Not inserted: chunk rolled back"}])
+        self.assertEqual(reports[-1]["inserted"], 1)
+        self.assertEqual(reports[-1]["failed"], 1)
 
     def test_get_all_equipment(self):
         self.mock_db.execute.return_value = [{"id": 1, "type_id": 1, "serial_number": "NAAZXX", "note": "Test Note"}]
@@ -53,45 +113,279 @@ class TestEquipmentService(unittest.TestCase):
         result = self.service.get_equipment_by_id(equipment_id=1)
         self.assertEqual(result["id"], 1)
 
+    def test_reads_use_read_only_path(self):
+        self.mock_db.execute.return_value = []
+        self.service.get_all_equipment(page=1, limit=10)
+        self.assertTrue(self.mock_db.execute.call_args[1]["read_only"])
+        self.service.get_all_equipment_types(page=1, limit=10)
+        self.assertTrue(self.mock_db.execute.call_args[1]["read_only"])
+        self.service.get_equipment_by_id(equipment_id=5)
+        self.assertTrue(self.mock_db.execute.call_args[1]["read_only"])
+
+    def test_stream_equipment_fetches_in_batches(self):
+        connection = self.mock_db.transaction_manager.read_context.return_value.__enter__.return_value
+        cursor = connection.cursor.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        batches = list(self.service.stream_equipment(filters={"type_id": 2}, batch_size=2))
+        self.assertEqual(batches, [[(1,), (2,)], [(3,)]])
+        connection.cursor.assert_called_once_with(buffered=False)
+        query, params = cursor.execute.call_args[0]
+        self.assertTrue(query.endswith("WHERE is_deleted = 0 AND type_id = %s ORDER BY id"))
+        self.assertEqual(params, (2,))
+        cursor.close.assert_called_once()
+        connection.discard.assert_not_called()
+
+    def test_stream_equipment_discards_connection_when_closed_early(self):
+        connection = self.mock_db.transaction_manager.read_context.return_value.__enter__.return_value
+        cursor = connection.cursor.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        batches = self.service.stream_equipment(batch_size=2)
+        self.assertEqual(next(batches), [(1,), (2,)])
+        batches.close()
+        # Небуферизованный результат не дочитан: соединение не возвращается в пул
+        connection.discard.assert_called_once()
+        cursor.close.assert_not_called()
+
+    def test_get_equipment_by_ids_preserves_order(self):
+        self.service.cache.set(self.service._equipment_cache_key(3), {"id": 3, "serial_number": "C"})
+        self.mock_db.execute.return_value = [{"id": 1, "serial_number": "A"}, {"id": 5, "serial_number": "E"}]
+
+        result = self.service.get_equipment_by_ids([5, 2, 3, 1, 5])
+
+        self.assertEqual([row["id"] for row in result], [5, 2, 3, 1, 5])
+        self.assertEqual(result[1], {"id": 2, "not_found": True})
+        self.assertEqual(result[2]["serial_number"], "C")
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertIn("WHERE id IN (%s, %s, %s)", query)
+        self.assertEqual(params, (5, 2, 1))
+        self.assertTrue(self.mock_db.execute.call_args[1]["read_only"])
+
+    def test_get_equipment_by_ids_chunks_queries(self):
+        self.mock_db.execute.return_value = []
+        with patch("Services.equipment_service.BULK_CHUNK_SIZE", 2):
+            self.service.get_equipment_by_ids([1, 2, 3])
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+    def test_get_equipment_list_version_uses_aggregate(self):
+        self.mock_db.execute.return_value = {"total": 3, "last_updated": "2026-01-01 10:00:00.000001"}
+        version = self.service.get_equipment_list_version({"type_id": 2})
+        self.assertEqual(version, "3:2026-01-01 10:00:00.000001")
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertTrue(query.startswith("SELECT COUNT(*) AS total, MAX(updated_at) AS last_updated FROM equipment"))
+        self.assertIn("type_id = %s", query)
+        self.assertEqual(params, (2,))
+
     def test_get_equipment_by_id_not_found(self):
         self.mock_db.execute.return_value = None
         result = self.service.get_equipment_by_id(equipment_id=1)
         self.assertIsNone(result)
 
-    def test_update_equipment_success(self):
+    def test_get_equipment_by_id_cached(self):
+        self.mock_db.execute.return_value = {"id": 1, "type_id": 1, "serial_number": "NAAZXX", "note": ""}
+        for _ in range(3):
+            result = self.service.get_equipment_by_id(equipment_id=1)
+        self.assertEqual(result["id"], 1)
+        self.assertEqual(self.mock_db.execute.call_count, 1)
+        stats = self.service.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_get_equipment_by_id_read_racing_invalidation_is_not_cached(self):
+        def read_then_invalidate(*args, **kwargs):
+            # Запись изменена и инвалидирована, пока выполнялось чтение старой версии
+            self.service._invalidate_equipment_cache([1])
+            return {"id": 1, "version": 1}
+
+        self.mock_db.execute.side_effect = read_then_invalidate
+        self.service.get_equipment_by_id(equipment_id=1)
+        self.assertIs(self.service.cache.get(self.service._equipment_cache_key(1)), MISSING)
+
+    def test_get_equipment_by_id_from_replica_is_not_cached(self):
+        self.mock_db.transaction_manager.last_read_from_replica.return_value = True
+        self.mock_db.execute.side_effect = [{"id": 1, "version": 1}, [{"id": 1, "version": 1}]]
+        self.service.get_equipment_by_id(equipment_id=1)
+        self.service.get_equipment_by_ids([1, 2])
+        self.assertIs(self.service.cache.get(self.service._equipment_cache_key(1)), MISSING)
+
+    def test_get_equipment_by_id_returns_copy(self):
+        self.mock_db.execute.return_value = {"id": 1, "note": "a"}
+        self.service.get_equipment_by_id(equipment_id=1)["note"] = "changed"
+        self.assertEqual(self.service.get_equipment_by_id(equipment_id=1)["note"], "a")
+
+    def test_get_equipment_by_id_not_found_is_not_cached(self):
+        self.mock_db.execute.return_value = None
+        self.service.get_equipment_by_id(equipment_id=1)
+        self.service.get_equipment_by_id(equipment_id=1)
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+    def test_soft_delete_invalidates_cache(self):
+        self.mock_db.execute.return_value = {"id": 1, "is_deleted": 0}
+        self.service.get_equipment_by_id(equipment_id=1)
         self.service._check_equipment_exists = MagicMock(return_value=True)
-        self.mock_db.execute.side_effect = [
-            {"type_id": 1, "serial_number": "NAAZXX"},  # current
-            None,  # _is_unique_equipment
-            None   # update
+        self.service.soft_delete_equipment(equipment_id=1)
+        self.mock_db.execute.return_value = {"id": 1, "is_deleted": 1}
+        self.assertEqual(self.service.get_equipment_by_id(equipment_id=1)["is_deleted"], 1)
+
+    def _update_cursor(self):
+        connection = self.mock_db.transaction_manager.transaction_context.return_value.__enter__.return_value
+        return connection.cursor.return_value.__enter__.return_value
+
+    def test_update_equipment_success(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.side_effect = [
+            (1, "NAAZXX"),  # current, FOR UPDATE
+            None,           # _is_unique_equipment
         ]
         self.service._validate_serial_by_type = MagicMock(return_value=(True, ""))
-        self.service._is_unique_equipment = MagicMock(return_value=True)
 
-        result = self.service.update_equipment(equipment_id=1, data={"type_id": 1, "serial_number": "NAAZXX"})
+        result = self.service.update_equipment(equipment_id=1, data={"type_id": 1, "serial_number": "NAAZXY"})
         self.assertTrue(result[0])
         self.assertIn("updated", result[1].lower())
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        self.assertTrue(queries[0].endswith("FOR UPDATE"))
+        self.assertIn("FOR UPDATE", queries[1])
+        self.assertTrue(queries[2].startswith("UPDATE equipment SET type_id = %s, serial_number = %s"))
+        self.assertEqual(self.mock_db.transaction_manager.transaction_context.call_count, 1)
+        self.mock_db.execute.assert_not_called()
+
+    def test_update_equipment_note_only_skips_uniqueness_check(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = (1, "0001")
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NNNN"}]
+
+        result = self.service.update_equipment(equipment_id=1, data={"note": "moved"})
+        self.assertTrue(result[0])
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        self.assertFalse(any(q.startswith("SELECT id FROM equipment") for q in queries))
+        self.assertIn("UPDATE equipment SET note = %s, version = version + 1 WHERE id = %s", queries)
+
+    def test_update_equipment_not_found(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = None
+        result = self.service.update_equipment(equipment_id=1, data={"note": "x"})
+        self.assertFalse(result[0])
+        self.assertIn("does not exist", result[1])
+        self.assertEqual(cursor.execute.call_count, 1)
 
     def test_update_equipment_validation_error(self):
-        self.service._check_equipment_exists = MagicMock(return_value=True)
-        self.mock_db.execute.side_effect = [
-            {"type_id": 1, "serial_number": "NAAZXX"},  # current
-        ]
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = (1, "NAAZXX")
         self.service._validate_serial_by_type = MagicMock(return_value=(False, "Validation error"))
         result = self.service.update_equipment(equipment_id=1, data={"type_id": 1, "serial_number": "BAD"})
         self.assertFalse(result[0])
         self.assertIn("validation error", result[1].lower())
 
     def test_update_equipment_duplicate(self):
-        self.service._check_equipment_exists = MagicMock(return_value=True)
-        self.mock_db.execute.side_effect = [
-            {"type_id": 1, "serial_number": "NAAZXX"},  # current
-        ]
+        cursor = self._update_cursor()
+        cursor.fetchone.side_effect = [(1, "NAAZXX"), (7,)]
         self.service._validate_serial_by_type = MagicMock(return_value=(True, ""))
-        self.service._is_unique_equipment = MagicMock(return_value=False)
-        result = self.service.update_equipment(equipment_id=1, data={"type_id": 1, "serial_number": "NAAZXX"})
+        result = self.service.update_equipment(equipment_id=1, data={"type_id": 1, "serial_number": "NAAZXY"})
         self.assertFalse(result[0])
         self.assertIn("already exists", result[1].lower())
+        self.assertFalse(any(c[0][0].startswith("UPDATE") for c in cursor.execute.call_args_list))
+
+    def test_bulk_update_equipment_single_case_update(self):
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NNNN"}]
+        cursor = self._update_cursor()
+        cursor.fetchall.side_effect = [
+            [(1, 1, "0001"), (2, 1, "0002"), (3, 1, "0003")],  # FOR UPDATE
+            [(1, "0009")],                                       # existing pairs
+            [],                                                  # reindex
+        ]
+        items = [
+            {"id": 1, "fields": {"note": "a"}},
+            {"id": 2, "fields": {"serial_number": "0009"}},
+            {"id": 3, "fields": {"serial_number": "0010", "note": "c"}},
+            {"id": 4, "fields": {"note": "d"}},
+            {"id": 1, "fields": {"note": "again"}},
+            {"id": 5, "fields": {}},
+        ]
+        report = self.service.bulk_update_equipment(items)
+
+        self.assertEqual([r["status"] for r in report["results"]],
+                         ["updated", "error", "updated", "not_found", "error", "error"])
+        self.assertEqual((report["updated"], report["failed"]), (2, 4))
+        updates = [c for c in cursor.execute.call_args_list if c[0][0].startswith("UPDATE equipment")]
+        self.assertEqual(len(updates), 1)
+        query, params = updates[0][0]
+        self.assertIn("serial_number = CASE id WHEN %s THEN %s ELSE serial_number END", query)
+        self.assertIn("note = CASE id WHEN %s THEN %s WHEN %s THEN %s ELSE note END", query)
+        self.assertEqual(params, (3, "0010", 1, "a", 3, "c", 1, 3))
+        self.assertEqual(self.mock_db.transaction_manager.transaction_context.call_count, 1)
+
+    def test_bulk_update_equipment_rejects_non_list(self):
+        with self.assertRaises(ValueError):
+            self.service.bulk_update_equipment({"id": 1})
+
+    def test_bulk_soft_delete_equipment(self):
+        cursor = self._update_cursor()
+        cursor.fetchall.return_value = [(1, 1), (3, 1)]
+        self.service.cache.set(self.service._equipment_cache_key(1), {"id": 1})
+
+        report = self.service.bulk_soft_delete_equipment({"ids": [1, 2, 3, 1]})
+
+        self.assertEqual(report["results"], [
+            {"id": 1, "status": "deleted"},
+            {"id": 2, "status": "not_found", "error": "Equipment with ID '2' does not exist or has been deleted."},
+            {"id": 3, "status": "deleted"},
+            {"id": 1, "status": "error", "error": "Duplicate id in request."},
+        ])
+        self.assertEqual((report["deleted"], report["failed"]), (2, 2))
+        cursor.execute.assert_any_call(
+            "UPDATE equipment SET is_deleted = %s, version = version + 1 WHERE id IN (%s, %s)", (True, 1, 3)
+        )
+        self.assertIs(self.service.cache.get(self.service._equipment_cache_key(1)), MISSING)
+
+    def test_bulk_soft_delete_equipment_invalid_body(self):
+        with self.assertRaises(ValueError):
+            self.service.bulk_soft_delete_equipment({"ids": []})
+
+    def test_soft_delete_equipment_decrements_counter(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = (3,)
+        result = self.service.soft_delete_equipment(equipment_id=1)
+        self.assertTrue(result[0])
+        query, params = cursor.executemany.call_args[0]
+        self.assertIn("equipment_type_counter", query)
+        self.assertEqual(params, [(3, -1)])
+
+    def test_soft_delete_equipment_not_found(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = None
+        result = self.service.soft_delete_equipment(equipment_id=1)
+        self.assertFalse(result[0])
+        cursor.executemany.assert_not_called()
+
+    def test_update_equipment_type_change_moves_counter(self):
+        cursor = self._update_cursor()
+        cursor.fetchone.return_value = (1, "0001")
+        self.service._validate_serial_by_type = MagicMock(return_value=(True, ""))
+        self.service._is_unique_equipment = MagicMock(return_value=True)
+        result = self.service.update_equipment(equipment_id=1, data={"type_id": 2})
+        self.assertTrue(result[0])
+        self.assertEqual(cursor.executemany.call_args[0][1], [(1, -1), (2, 1)])
+
+    def test_get_equipment_total_uses_counters(self):
+        self.mock_db.execute.return_value = {"total": 5}
+        self.assertEqual(self.service.get_equipment_total({"type_id": "2"}), (5, True))
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertIn("equipment_type_counter", query)
+        self.assertEqual(params, (2,))
+
+    def test_reconcile_counts_without_locks_and_applies_delta(self):
+        self.mock_db.execute.return_value = [{"id": 2}]
+        cursor = self._update_cursor()
+        cursor.fetchone.side_effect = [(10,), (7,)]
+        self.assertEqual(self.service.reconcile_equipment_counters(), {2: {"stored": 10, "actual": 7}})
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        self.assertFalse(any("FOR UPDATE" in query for query in queries))
+        self.assertIn("active_count = active_count + VALUES(active_count)", cursor.executemany.call_args[0][0])
+        self.assertEqual(cursor.executemany.call_args[0][1], [(2, -3)])
+
+    def test_get_equipment_total_text_filter_is_cached(self):
+        self.mock_db.execute.return_value = {"total": 3}
+        self.assertEqual(self.service.get_equipment_total({"note": "spare"}), (3, False))
+        self.assertEqual(self.service.get_equipment_total({"note": "spare"}), (3, False))
+        self.assertEqual(self.mock_db.execute.call_count, 1)
 
     def test_soft_delete_equipment_success(self):
         self.service._check_equipment_exists = MagicMock(return_value=True)
@@ -106,5 +400,49 @@ class TestEquipmentService(unittest.TestCase):
         self.assertIsInstance(result, list)
         self.mock_db.execute.assert_called()
 
+    def test_get_all_equipment_uses_trigram_candidates(self):
+        self.mock_db.execute.return_value = []
+        self.service.get_all_equipment(page=1, limit=10, filters={"serial_number": "abcd", "note": "xy"})
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertIn("id IN (SELECT equipment_id FROM equipment_search_trigram", query)
+        self.assertEqual(query.count("equipment_search_trigram"), 1)
+        self.assertIn("serial_number LIKE %s ESCAPE '!'", query)
+        self.assertIn("note LIKE %s ESCAPE '!'", query)
+        self.assertEqual(params, ("serial_number", "abc", "bcd", 2, "%abcd%", "%xy%", 10, 0))
+
+    def test_get_equipment_by_cursor_first_page(self):
+        self.mock_db.execute.return_value = [{"id": i} for i in (1, 2, 3)]
+        result = self.service.get_equipment_by_cursor(cursor="", limit=2, filters={"type_id": 1})
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertEqual(
+            query,
+            "SELECT id, type_id, serial_number, note, is_deleted FROM equipment "
+            "WHERE is_deleted = 0 AND type_id = %s ORDER BY id LIMIT %s"
+        )
+        self.assertEqual(params, (1, 3))
+        self.assertEqual(result["items"], [{"id": 1}, {"id": 2}])
+        self.assertEqual(self.service._decode_cursor(result["next_cursor"]), 2)
+
+    def test_get_equipment_by_cursor_next_page(self):
+        self.mock_db.execute.return_value = [{"id": 5}]
+        cursor = self.service._encode_cursor(4)
+        result = self.service.get_equipment_by_cursor(cursor=cursor, limit=2)
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertIn("WHERE is_deleted = 0 AND id > %s ORDER BY id LIMIT %s", query)
+        self.assertEqual(params, (4, 3))
+        self.assertIsNone(result["next_cursor"])
+
+    def test_get_equipment_by_cursor_invalid(self):
+        with self.assertRaises(ValueError):
+            self.service.get_equipment_by_cursor(cursor="not-a-cursor", limit=2)
+
+    def test_get_equipment_types_by_cursor(self):
+        self.mock_db.execute.return_value = []
+        result = self.service.get_equipment_types_by_cursor(cursor=self.service._encode_cursor(7), limit=10)
+        query, params = self.mock_db.execute.call_args[0]
+        self.assertEqual(query, "SELECT id, name, serial_mask FROM equipment_type WHERE id > %s ORDER BY id LIMIT %s")
+        self.assertEqual(params, (7, 11))
+        self.assertEqual(result, {"items": [], "next_cursor": None})
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
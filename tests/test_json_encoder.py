@@ -0,0 +1,42 @@
+import datetime
+import decimal
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from Utils import json_encoder
+
+
+class TestJsonEncoder(unittest.TestCase):
+    VALUE = {
+        "id": 1,
+        "note": "Стойка",
+        "price": decimal.Decimal("1.5"),
+        "updated_at": datetime.datetime(2026, 1, 2, 3, 4, 5),
+    }
+
+    def test_backends_produce_equivalent_json(self):
+        for name, encoder in json_encoder.ENCODERS.items():
+            with self.subTest(backend=name):
+                result = encoder(self.VALUE)
+                self.assertIsInstance(result, bytes)
+                self.assertEqual(json.loads(result), {
+                    "id": 1, "note": "Стойка", "price": 1.5, "updated_at": "2026-01-02T03:04:05",
+                })
+
+    def test_stdlib_fallback(self):
+        self.assertIs(json_encoder.get_encoder("json"), json_encoder._stdlib_dumps)
+        self.assertIn(json_encoder.get_encoder("missing"), json_encoder.ENCODERS.values())
+
+    def test_unsupported_type_raises(self):
+        with self.assertRaises(TypeError):
+            json_encoder._stdlib_dumps({"value": object()})
+
+    @patch("cherrypy.serving")
+    def test_json_handler_uses_encoder(self, mock_serving):
+        mock_serving.request._json_inner_handler = MagicMock(return_value={"a": 1})
+        handler = json_encoder.make_json_handler(json_encoder.get_encoder("json"))
+        self.assertEqual(handler(), b'{"a":1}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from launcher import HEARTBEAT_FD_ENV, PreforkMaster, RequestPoolCheck, subscribe_heartbeat
+
+# Воркер-заглушка: отвечает своим PID на соединения с унаследованного сокета
+# и присылает FAKE_WORKER_BEATS heartbeat (0 — без ограничения)
+FAKE_WORKER = r"""
+import os, signal, socket, sys, threading, time
+signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+listener = socket.socket(fileno=3)
+listener.settimeout(None)
+heartbeat_fd = int(os.environ["SERVER_HEARTBEAT_FD"])
+beats = int(os.environ.get("FAKE_WORKER_BEATS", "0"))
+
+def serve():
+    while True:
+        connection, _ = listener.accept()
+        connection.sendall(str(os.getpid()).encode())
+        connection.close()
+
+threading.Thread(target=serve, daemon=True).start()
+sent = 0
+while not beats or sent < beats:
+    os.write(heartbeat_fd, b".")
+    sent += 1
+    time.sleep(0.05)
+time.sleep(60)
+"""
+
+
+def wait_until(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestPreforkMaster(unittest.TestCase):
+    def setUp(self):
+        self.master = PreforkMaster(
+            workers=2,
+            port=0,
+            command=[sys.executable, "-c", FAKE_WORKER],
+            heartbeat_interval=0.05,
+            heartbeat_timeout=0.5,
+            startup_timeout=5,
+            graceful_timeout=2,
+            respawn_delay=0.1,
+        )
+        self.master.bind()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.master.run, kwargs={"install_signals": False})
+        self.thread.start()
+        self.addCleanup(self.stop)
+        self.assertTrue(wait_until(self.all_ready))
+
+    def stop(self):
+        self.master.request_stop()
+        self.thread.join(10)
+
+    def all_ready(self) -> bool:
+        workers = self.master.stats()["workers"]
+        return len(workers) == 2 and all(worker["ready"] for worker in workers)
+
+    def pids(self) -> set:
+        return {worker["pid"] for worker in self.master.stats()["workers"]}
+
+    def test_workers_share_listening_socket(self):
+        self.start()
+        with socket.create_connection(("127.0.0.1", self.master.port), timeout=5) as connection:
+            self.assertIn(int(connection.recv(32)), self.pids())
+
+    def test_crashed_worker_is_respawned(self):
+        self.start()
+        crashed = self.master.slots[0].process
+        crashed.kill()
+        self.assertTrue(wait_until(lambda: self.all_ready() and crashed.pid not in self.pids()))
+
+    def test_rolling_restart_replaces_all_workers(self):
+        self.start()
+        old = self.pids()
+        self.master.request_reload()
+        self.assertTrue(wait_until(lambda: self.all_ready() and not (self.pids() & old) and not self.master.retiring))
+
+    def test_stop_terminates_workers(self):
+        self.start()
+        processes = [worker.process for worker in self.master.slots]
+        self.stop()
+        self.assertFalse(self.thread.is_alive())
+        self.assertTrue(all(process.poll() is not None for process in processes))
+
+    def test_unresponsive_worker_is_replaced(self):
+        with patch.dict(os.environ, {"FAKE_WORKER_BEATS": "3"}):
+            self.start()
+            first = self.pids()
+            self.assertTrue(wait_until(lambda: first.isdisjoint(self.pids()) and len(self.pids()) == 2))
+
+
+class TestHeartbeat(unittest.TestCase):
+    def subscribe(self, health_checks):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        os.set_blocking(read_fd, False)
+        with patch.dict(os.environ, {HEARTBEAT_FD_ENV: str(write_fd)}), \
+                patch("cherrypy.process.plugins.Monitor") as MockMonitor:
+            subscribe_heartbeat(MagicMock(), health_checks)
+        beat = MockMonitor.call_args[0][1]
+        return beat, read_fd
+
+    @patch("cherrypy.server")
+    def test_heartbeat_skipped_when_health_check_fails(self, server):
+        server.running = True
+        healthy = [True]
+
+        def check():
+            if not healthy[0]:
+                raise RuntimeError("pool exhausted")
+
+        beat, read_fd = self.subscribe([check])
+        beat()
+        self.assertEqual(os.read(read_fd, 16), b".")
+        healthy[0] = False
+        beat()
+        with self.assertRaises(BlockingIOError):
+            os.read(read_fd, 16)
+
+    def test_request_pool_check_detects_stalled_threads(self):
+        check = RequestPoolCheck(MagicMock(), threads=2, stall_timeout=0.05)
+        check.request_started()
+        check.request_started()
+        check()
+        time.sleep(0.1)
+        with self.assertRaises(RuntimeError):
+            check()
+        check.request_finished()
+        check()
+
+
+if __name__ == "__main__":
+    unittest.main()
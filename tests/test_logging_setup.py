@@ -0,0 +1,71 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from Utils.logging_setup import DroppingQueueHandler, StructuredFormatter, parse_sample_rates, setup_logging
+
+
+class TestLoggingSetup(unittest.TestCase):
+    def test_structured_formatter(self):
+        record = logging.LogRecord("app", logging.INFO, __file__, 1, "done %s", ("x",), None)
+        record.operation = "Fetching equipment by ID"
+        record.duration_ms = 1.5
+        data = json.loads(StructuredFormatter().format(record))
+        self.assertEqual(data["message"], "done x")
+        self.assertEqual(data["operation"], "Fetching equipment by ID")
+        self.assertEqual(data["duration_ms"], 1.5)
+        self.assertNotIn("status", data)
+
+    def test_dropping_queue_handler(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("app", logging.INFO, __file__, 1, "msg", None, None)
+        handler.emit(record)
+        handler.emit(record)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_errors_are_not_dropped_when_queue_is_full(self):
+        fallback = logging.Handler()
+        fallback.emit = MagicMock()
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1), fallback=fallback)
+        handler.emit(logging.LogRecord("app", logging.INFO, __file__, 1, "msg", None, None))
+        error = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", None, None)
+        handler.emit(error)
+        fallback.emit.assert_called_once_with(error)
+        self.assertEqual(handler.dropped, 0)
+
+    def test_parse_sample_rates(self):
+        self.assertEqual(
+            parse_sample_rates("Paginating query=0.01; Fetching equipment by ID=0.5;"),
+            {"Paginating query": 0.01, "Fetching equipment by ID": 0.5}
+        )
+        self.assertEqual(parse_sample_rates(None), {})
+        with self.assertRaises(ValueError):
+            parse_sample_rates("0.5")
+
+    def test_setup_logging_writes_in_background(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "app.log")
+            listener = setup_logging(filename, structured=True)
+            try:
+                logging.getLogger("test").info("hello", extra={"operation": "op"})
+            finally:
+                listener.stop()
+                for handler in list(root.handlers):
+                    root.removeHandler(handler)
+                for handler in listener.handlers:
+                    handler.close()
+                for handler in handlers:
+                    root.addHandler(handler)
+                root.setLevel(level)
+            with open(filename, encoding="utf-8") as file:
+                data = json.loads(file.readline())
+        self.assertEqual((data["message"], data["operation"]), ("hello", "op"))
+
+
+if __name__ == "__main__":
+    unittest.main()
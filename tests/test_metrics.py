@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from Utils.metrics import MetricsRegistry, fingerprint, observe_query, QUERY_ERRORS, QUERY_ROWS, REGISTRY
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_merges_thread_shards(self):
+        counter = self.registry.counter("jobs_total", "Jobs.", ("kind",))
+
+        def worker():
+            for _ in range(1000):
+                counter.inc("a")
+            counter.inc("b", amount=2)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        output = self.registry.render()
+        self.assertIn("# TYPE jobs_total counter", output)
+        self.assertIn('jobs_total{kind="a"} 8000', output)
+        self.assertIn('jobs_total{kind="b"} 16', output)
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value, "GET")
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{endpoint="GET",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{endpoint="GET",le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{endpoint="GET",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum{endpoint="GET"} 6.05', lines)
+        self.assertIn('latency_seconds_count{endpoint="GET"} 4', lines)
+
+    def test_same_name_returns_registered_metric(self):
+        first = self.registry.counter("jobs_total", "Jobs.")
+        self.assertIs(self.registry.counter("jobs_total", "Jobs."), first)
+
+    def test_collector_and_label_escaping(self):
+        self.registry.register_collector(lambda: [("pool_size", "gauge", "Pool size.", [({"pool": 'a"b'}, 3)])])
+        output = self.registry.render()
+        self.assertIn("# TYPE pool_size gauge", output)
+        self.assertIn('pool_size{pool="a\\"b"} 3', output)
+
+    def test_fingerprint_normalizes_queries(self):
+        self.assertEqual(
+            fingerprint("SELECT *  FROM equipment\n WHERE id IN (%s, %s, %s) AND is_deleted = 0 LIMIT 10"),
+            "SELECT * FROM equipment WHERE id IN (%s, ...) AND is_deleted = ? LIMIT ?"
+        )
+        self.assertEqual(
+            fingerprint("SELECT id FROM equipment WHERE (type_id, serial_number) IN ((%s, %s), (%s, %s))"),
+            fingerprint("SELECT id FROM equipment WHERE (type_id, serial_number) IN ((%s, %s), (%s, %s), (%s, %s))")
+        )
+        self.assertEqual(
+            fingerprint("UPDATE equipment SET note = CASE id WHEN %s THEN %s WHEN %s THEN %s ELSE note END"),
+            "UPDATE equipment SET note = CASE id WHEN %s THEN %s ... ELSE note END"
+        )
+        self.assertEqual(fingerprint("SELECT 'abc' FROM t"), "SELECT ? FROM t")
+
+    def test_observe_query(self):
+        query = "SELECT id FROM metrics_test WHERE id = %s"
+        label = fingerprint(query)
+        observe_query(query, time.perf_counter(), [{"id": 1}, {"id": 2}])
+        observe_query(query, time.perf_counter(), None, failed=True)
+
+        rows = QUERY_ROWS._merged()[(label,)]
+        self.assertEqual(rows[-1], 2)
+        self.assertEqual(QUERY_ERRORS._merged()[(label,)], [1])
+
+    def test_disabled_registry_skips_observations(self):
+        query = "SELECT id FROM metrics_disabled_test"
+        with patch.object(REGISTRY, "enabled", False):
+            observe_query(query, time.perf_counter(), [])
+        self.assertNotIn((fingerprint(query),), QUERY_ROWS._merged())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from Database.backends import SQLiteBackend
+from migrations import migrate
+
+# Python-миграция: заполняет doubled пачками, FAIL_AFTER_KEY имитирует сбой
+BACKFILL = """
+TABLE = "item"
+WHERE = "doubled IS NULL"
+BATCH_SIZE = 3
+FAIL_AFTER_KEY = None
+calls = []
+
+def migrate_batch(cursor, keys):
+    calls.append(list(keys))
+    if FAIL_AFTER_KEY is not None and keys[-1] > FAIL_AFTER_KEY:
+        raise RuntimeError("backfill failed")
+    placeholders = ", ".join(["%s"] * len(keys))
+    cursor.execute(f"UPDATE item SET doubled = value * 2 WHERE id IN ({placeholders})", keys)
+"""
+
+
+class TestOnlineMigrationSql(unittest.TestCase):
+    def test_parse_online_header(self):
+        self.assertIsNone(migrate.parse_online_header("ALTER TABLE equipment ADD COLUMN a INT;"))
+        self.assertEqual(migrate.parse_online_header("-- migrate: online\nALTER TABLE t ADD COLUMN a INT"), {})
+        self.assertEqual(
+            migrate.parse_online_header("-- migrate: online chunk_size=500 max_rows_per_second=2000\nALTER TABLE t"),
+            {"chunk_size": 500, "max_rows_per_second": 2000}
+        )
+
+    def test_parse_alter_table(self):
+        sql = "-- migrate: online\nALTER TABLE `equipment` ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;"
+        self.assertEqual(
+            migrate.parse_alter_table(sql),
+            ("equipment", "ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        )
+        with self.assertRaises(ValueError):
+            migrate.parse_alter_table("-- migrate: online\nALTER TABLE t ADD COLUMN a INT; DROP TABLE t;")
+        with self.assertRaises(ValueError):
+            migrate.parse_alter_table("-- migrate: online\nCREATE INDEX i ON t (a)")
+
+    def test_shadow_table_ddl_renames_table_and_constraints(self):
+        create_sql = (
+            "CREATE TABLE `equipment` (\n  `id` int NOT NULL AUTO_INCREMENT,\n  `type_id` int NOT NULL,\n"
+            "  PRIMARY KEY (`id`),\n"
+            "  CONSTRAINT `equipment_ibfk_1` FOREIGN KEY (`type_id`) REFERENCES `equipment_type` (`id`)\n)"
+        )
+        ddl = migrate.shadow_table_ddl(create_sql, "equipment", "_equipment_new")
+        self.assertTrue(ddl.startswith("CREATE TABLE `_equipment_new`"))
+        self.assertIn("CONSTRAINT `_equipment_ibfk_1`", ddl)
+        self.assertIn("REFERENCES `equipment_type`", ddl)
+        # После повторной онлайн-миграции префикс снимается
+        self.assertIn("CONSTRAINT `equipment_ibfk_1`", migrate.shadow_table_ddl(ddl, "_equipment_new", "x"))
+
+    def test_trigger_statements(self):
+        insert, update, delete = migrate.trigger_statements("t", "_t_new", "id", ["id", "a"])
+        self.assertEqual(
+            insert,
+            "CREATE TRIGGER `_t_osc_ins` AFTER INSERT ON `t` FOR EACH ROW "
+            "REPLACE INTO `_t_new` (`id`, `a`) VALUES (NEW.`id`, NEW.`a`)"
+        )
+        self.assertIn("DELETE IGNORE FROM `_t_new` WHERE `id` = OLD.`id` AND OLD.`id` <> NEW.`id`;", update)
+        self.assertIn("REPLACE INTO `_t_new` (`id`, `a`) VALUES (NEW.`id`, NEW.`a`); END", update)
+        self.assertTrue(delete.endswith("DELETE IGNORE FROM `_t_new` WHERE `id` = OLD.`id`"))
+
+
+class TestProgress(unittest.TestCase):
+    @patch("migrations.migrate.time")
+    def test_throttles_to_rows_per_second(self, mock_time):
+        mock_time.monotonic.side_effect = [0.0, 0.5, 2.0, 2.5, 2.5]
+        progress = migrate.Progress("m", total=100, max_rows_per_second=10)
+        progress.add(20)
+        mock_time.sleep.assert_called_once_with(1.5)
+        progress.add(5)
+        mock_time.sleep.assert_called_once()
+        self.assertEqual(progress.rows_done, 25)
+
+    @patch("migrations.migrate.time")
+    def test_unlimited_rate_does_not_sleep(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        progress = migrate.Progress("m", total=None, rows_done=10)
+        progress.add(1000)
+        mock_time.sleep.assert_not_called()
+        self.assertEqual(progress.rows_done, 1010)
+
+
+class TestPythonMigration(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.connection = SQLiteBackend().connect({"database": os.path.join(self.directory, "test.db")})
+        self.addCleanup(self.connection.close)
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, value INTEGER NOT NULL, doubled INTEGER)")
+        cursor.executemany("INSERT INTO item (id, value) VALUES (%s, %s)", [(key, key) for key in range(1, 11)])
+        cursor.close()
+        migrate.get_applied_migrations(self.connection)
+        self.path = os.path.join(self.directory, "008_backfill_item.py")
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(BACKFILL)
+
+    def rows(self, query: str):
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def test_backfills_in_batches_and_records_migration(self):
+        module = migrate.load_python_migration(self.path)
+        with patch.object(migrate, "load_python_migration", return_value=module):
+            migrate.apply_python_migration(self.connection, "008_backfill_item.py", self.path, 1000, 0)
+        self.assertEqual(module.calls, [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10]])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM item WHERE doubled = value * 2"), [(10,)])
+        self.assertEqual(self.rows("SELECT migration_name FROM migrations"), [("008_backfill_item.py",)])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM migration_progress"), [(0,)])
+
+    def test_resumes_after_failure(self):
+        module = migrate.load_python_migration(self.path)
+        module.FAIL_AFTER_KEY = 6
+        with patch.object(migrate, "load_python_migration", return_value=module):
+            with self.assertRaises(RuntimeError):
+                migrate.apply_python_migration(self.connection, "008_backfill_item.py", self.path, 1000, 0)
+        # Пачки 1-3 и 4-6 зафиксированы вместе с прогрессом, пачка 7-9 откатилась
+        self.assertEqual(self.rows("SELECT MAX(id) FROM item WHERE doubled IS NOT NULL"), [(6,)])
+        self.assertEqual(self.rows("SELECT last_key, rows_done FROM migration_progress"), [(6, 6)])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM migrations"), [(0,)])
+
+        module.FAIL_AFTER_KEY = None
+        module.calls.clear()
+        with patch.object(migrate, "load_python_migration", return_value=module):
+            migrate.apply_python_migration(self.connection, "008_backfill_item.py", self.path, 1000, 0)
+        self.assertEqual(module.calls, [[7, 8, 9], [10]])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM item WHERE doubled = value * 2"), [(10,)])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM migration_progress"), [(0,)])
+
+    def test_requires_table_and_migrate_batch(self):
+        path = os.path.join(self.directory, "009_broken.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("TABLE = 'item'\n")
+        with self.assertRaises(ValueError):
+            migrate.load_python_migration(path)
+
+
+class TestOnlineMigrationResume(unittest.TestCase):
+    SQL = "-- migrate: online\nALTER TABLE item ADD COLUMN note VARCHAR(255)"
+
+    def run_migration(self, shadow_exists, triggers, old_exists=True, definitions=None):
+        connection = MagicMock(in_transaction=False)
+        cursor = connection.cursor.return_value
+        exists = {"_item_new": shadow_exists, "_item_old": old_exists}
+        with patch.multiple(
+            migrate,
+            ensure_progress_table=MagicMock(),
+            primary_key_column=MagicMock(return_value="id"),
+            check_no_referencing_tables=MagicMock(),
+            load_progress=MagicMock(return_value=(10, 10)),
+            table_exists=MagicMock(side_effect=lambda cursor, table: exists.get(table, True)),
+            trigger_tables=MagicMock(return_value=triggers),
+            table_columns=MagicMock(return_value=["id", "value"]),
+            column_definitions=MagicMock(side_effect=lambda cursor, table: (definitions or {}).get(table, [])),
+            shadow_table_ddl=MagicMock(side_effect=lambda create_sql, table, shadow: f"CREATE TABLE `{shadow}` (...)"),
+            next_chunk_end=MagicMock(return_value=None),
+            Progress=MagicMock(),
+        ):
+            migrate.apply_online_migration(connection, "010_item_note.sql", self.SQL, 1000, 0)
+        return [c[0][0] for c in cursor.execute.call_args_list]
+
+    def assertSwapFinished(self, statements):
+        self.assertFalse(any(statement.startswith(("RENAME", "INSERT IGNORE")) for statement in statements))
+        self.assertNotIn("CREATE TABLE `_item_new` (...)", statements)
+        # Старая таблица удаляется после записи миграции
+        self.assertEqual(statements[-3:], [
+            "DELETE FROM migration_progress WHERE migration_name = %s",
+            "INSERT INTO migrations (migration_name) VALUES (%s)",
+            "DROP TABLE IF EXISTS `_item_old`",
+        ])
+
+    def assertCopyRestarted(self, statements):
+        self.assertNotIn("INSERT INTO migrations (migration_name) VALUES (%s)", statements[:statements.index(
+            "RENAME TABLE `item` TO `_item_old`, `_item_new` TO `item`"
+        )])
+        self.assertLess(
+            statements.index("DELETE FROM migration_progress WHERE migration_name = %s"),
+            statements.index("ALTER TABLE `_item_new` ADD COLUMN note VARCHAR(255)")
+        )
+
+    def test_finishes_cleanup_after_swap(self):
+        # Сбой после RENAME TABLE: триггеры переехали на _item_old, _item_new уже стала item
+        triggers = {name: "_item_old" for name in migrate.trigger_names("item")}
+        self.assertSwapFinished(self.run_migration(shadow_exists=False, triggers=triggers))
+
+    def test_old_table_confirms_swap(self):
+        # Сбой после удаления триггеров, но до записи миграции
+        self.assertSwapFinished(self.run_migration(shadow_exists=False, triggers={}, old_exists=True))
+
+    def test_matching_structure_confirms_swap(self):
+        columns = [("id", "int", "NO", None, "auto_increment"), ("note", "varchar(255)", "YES", None, "")]
+        statements = self.run_migration(
+            shadow_exists=False, triggers={}, old_exists=False,
+            definitions={"item": columns, "_item_probe": columns}
+        )
+        self.assertIn("ALTER TABLE `_item_probe` ADD COLUMN note VARCHAR(255)", statements)
+        self.assertIn("DROP TABLE IF EXISTS `_item_probe`", statements)
+        self.assertSwapFinished(statements)
+
+    def test_restarts_when_swap_is_not_confirmed(self):
+        # Теневая таблица и триггеры удалены вручную до обмена: ALTER ещё не применён
+        statements = self.run_migration(
+            shadow_exists=False, triggers={}, old_exists=False,
+            definitions={"item": [("id", "int", "NO", None, "")], "_item_probe": [
+                ("id", "int", "NO", None, ""), ("note", "varchar(255)", "YES", None, "")
+            ]}
+        )
+        self.assertCopyRestarted(statements)
+
+    def test_restarts_when_shadow_table_is_missing(self):
+        triggers = {name: "item" for name in migrate.trigger_names("item")}
+        statements = self.run_migration(shadow_exists=False, triggers=triggers)
+        self.assertNotIn("ALTER TABLE `_item_probe` ADD COLUMN note VARCHAR(255)", statements)
+        self.assertCopyRestarted(statements)
+
+    def test_resumes_copy_when_shadow_and_triggers_exist(self):
+        triggers = {name: "item" for name in migrate.trigger_names("item")}
+        statements = self.run_migration(shadow_exists=True, triggers=triggers)
+        self.assertNotIn("SHOW CREATE TABLE `item`", statements)
+        self.assertIn("RENAME TABLE `item` TO `_item_old`, `_item_new` TO `item`", statements)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import mysql.connector
+from Database.query_executor import QueryExecutor
+from Database.prepared_statement_cache import PreparedStatementCache
+
+class TestQueryExecutor(unittest.TestCase):
+    @patch("Database.query_executor.TransactionManager")
+    def make_executor(self, pool_config, MockTransactionManager):
+        executor = QueryExecutor({}, pool_config)
+        self.connection = MagicMock()
+        self.cache = PreparedStatementCache(self.connection, max_size=2)
+        self.connection.statement_cache.return_value = self.cache
+        executor.transaction_manager.transaction_context.return_value.__enter__.return_value = self.connection
+        return executor
+
+    def test_text_mode_by_default(self):
+        executor = self.make_executor(None)
+        cursor = self.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = {"id": 1}
+        self.assertEqual(executor.execute("SELECT id FROM equipment WHERE id = %s", (1,), fetchone=True), {"id": 1})
+        self.connection.cursor.assert_called_once_with(dictionary=True)
+        self.connection.statement_cache.assert_not_called()
+
+    def test_prepared_mode_reuses_statement(self):
+        executor = self.make_executor({"statement_cache_size": 2})
+        query = "SELECT id FROM equipment WHERE id = %s"
+        for equipment_id in range(3):
+            executor.execute("".join(["SELECT id FROM equipment ", "WHERE id = %s"]), (equipment_id,), fetchone=True)
+        self.connection.cursor.assert_called_once_with(prepared=True, dictionary=True)
+        cursor = self.connection.cursor.return_value
+        executed = [c[0][0] for c in cursor.execute.call_args_list]
+        self.assertTrue(all(sql is executed[0] for sql in executed))
+        self.assertEqual(executed[0], query)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_prepared_cache_is_lru_bounded(self):
+        executor = self.make_executor({"statement_cache_size": 2})
+        cursors = [MagicMock(), MagicMock(), MagicMock()]
+        self.connection.cursor.side_effect = cursors
+        for query in ("SELECT 1", "SELECT 2", "SELECT 3"):
+            executor.execute(query, fetchall=True)
+        self.assertEqual(len(self.cache), 2)
+        cursors[0].close.assert_called_once()
+
+    def test_prepared_statement_discarded_on_error(self):
+        executor = self.make_executor({"statement_cache_size": 2})
+        self.connection.cursor.return_value.execute.side_effect = mysql.connector.Error("boom")
+        with self.assertRaises(mysql.connector.Error):
+            executor.execute("SELECT 1", fetchone=True)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_read_only_skips_transaction(self):
+        executor = self.make_executor(None)
+        read_connection = executor.transaction_manager.read_context.return_value.__enter__.return_value
+        read_connection.cursor.return_value.__enter__.return_value.fetchall.return_value = [{"id": 1}]
+        result = executor.execute("SELECT id FROM equipment", fetchall=True, read_only=True)
+        self.assertEqual(result, [{"id": 1}])
+        executor.transaction_manager.transaction_context.assert_not_called()
+
+    def test_read_retried_on_primary_after_replica_failure(self):
+        executor = self.make_executor(None)
+        manager = executor.transaction_manager
+        replica_connection, primary_connection = MagicMock(), MagicMock()
+        replica_connection.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            mysql.connector.errors.OperationalError("Lost connection")
+        )
+        primary_connection.cursor.return_value.__enter__.return_value.fetchone.return_value = {"id": 1}
+        contexts = [MagicMock(), MagicMock()]
+        contexts[0].__enter__.return_value = replica_connection
+        contexts[0].__exit__.return_value = False
+        contexts[1].__enter__.return_value = primary_connection
+        manager.read_context.side_effect = contexts
+        manager.last_read_from_replica.return_value = True
+        self.assertEqual(executor.execute("SELECT 1", fetchone=True, read_only=True), {"id": 1})
+        self.assertEqual(manager.read_context.call_args_list[1][1], {"use_primary": True})
+
+        # Ошибка на primary не повторяется
+        manager.read_context.side_effect = None
+        manager.read_context.return_value.__enter__.return_value = replica_connection
+        manager.read_context.return_value.__exit__.return_value = False
+        manager.last_read_from_replica.return_value = False
+        with self.assertRaises(mysql.connector.errors.OperationalError):
+            executor.execute("SELECT 1", fetchone=True, read_only=True)
+
+    def test_read_only_cannot_commit(self):
+        executor = self.make_executor(None)
+        with self.assertRaises(ValueError):
+            executor.execute("UPDATE equipment SET note = ''", commit=True, read_only=True)
+
+    def test_ping_returns_connection_on_failure(self):
+        executor = self.make_executor(None)
+        connection = executor.transaction_manager.connection_pool.get_connection.return_value
+        connection.ping.side_effect = mysql.connector.errors.OperationalError("gone away")
+        with self.assertRaises(mysql.connector.errors.OperationalError):
+            executor.ping()
+        connection.ping.assert_called_once_with(reconnect=False)
+        connection.close.assert_called_once()
+
+
+class TestTransactionManager(unittest.TestCase):
+    @patch("Database.transaction_manager.ConnectionPoolManager")
+    def test_read_pool_uses_autocommit(self, MockPool):
+        from Database.transaction_manager import TransactionManager
+        manager = TransactionManager({"host": "h"}, {"pool_name": "app", "read_max_size": 3})
+        read_args = MockPool.call_args_list[1][0]
+        self.assertEqual(read_args[0], {"host": "h", "autocommit": True})
+        self.assertEqual(read_args[1]["pool_name"], "app_read")
+        self.assertEqual(read_args[1]["max_size"], 3)
+
+        connection = manager.read_pool.get_connection.return_value
+        with manager.read_context() as borrowed:
+            self.assertIs(borrowed, connection)
+        connection.start_transaction.assert_not_called()
+        connection.commit.assert_not_called()
+        connection.close.assert_called_once()
+
+    @patch("Database.transaction_manager.ConnectionPoolManager")
+    def test_pinned_reads_use_one_pool(self, MockPool):
+        from Database.transaction_manager import TransactionManager
+        from Database.replica_router import set_client_last_write
+        set_client_last_write(None)
+        MockPool.side_effect = lambda *args: MagicMock()
+        manager = TransactionManager({"host": "h"}, {}, [{"host": "r1"}, {"host": "r2"}])
+        with manager.pinned_reads():
+            for _ in range(3):
+                with manager.read_context():
+                    self.assertTrue(manager.last_read_from_replica())
+        replica_calls = [pool.get_connection.call_count for pool in manager.router.replica_pools]
+        self.assertEqual(sorted(replica_calls), [0, 3])
+
+        # Отказ закреплённой реплики переводит оставшиеся чтения на primary
+        for pool in manager.router.replica_pools:
+            pool.get_connection.reset_mock()
+            pool.get_connection.side_effect = mysql.connector.errors.InterfaceError("down")
+        with manager.pinned_reads():
+            for _ in range(2):
+                with manager.read_context():
+                    self.assertFalse(manager.last_read_from_replica())
+        self.assertEqual(manager.read_pool.get_connection.call_count, 2)
+        self.assertEqual(sum(pool.get_connection.call_count for pool in manager.router.replica_pools), 1)
+
+if __name__ == "__main__":
+    unittest.main()
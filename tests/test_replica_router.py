@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import mysql.connector
+from Database.replica_router import ReplicaRouter, get_client_last_write, set_client_last_write, set_session_key
+from Database.transaction_manager import TransactionManager
+
+def make_pool(name, in_use=0):
+    pool = MagicMock()
+    pool.pool_name = name
+    pool.stats.return_value = {"in_use": in_use, "waiting": 0}
+    return pool
+
+class TestReplicaRouter(unittest.TestCase):
+    def setUp(self):
+        set_session_key(None)
+        set_client_last_write(None)
+        self.primary = make_pool("primary")
+        self.replicas = [make_pool("replica0"), make_pool("replica1")]
+        self.router = ReplicaRouter(self.primary, self.replicas, sticky_seconds=5, retry_after=30)
+
+    def test_without_replicas_uses_primary(self):
+        router = ReplicaRouter(self.primary)
+        self.assertIs(router.choose_pool(), self.primary)
+
+    def test_round_robin(self):
+        chosen = [self.router.choose_pool() for _ in range(4)]
+        self.assertEqual(chosen, self.replicas * 2)
+
+    def test_least_loaded(self):
+        replicas = [make_pool("busy", in_use=4), make_pool("idle", in_use=1)]
+        router = ReplicaRouter(self.primary, replicas, strategy="least_loaded")
+        self.assertIs(router.choose_pool(), replicas[1])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            ReplicaRouter(self.primary, self.replicas, strategy="random")
+
+    def test_read_your_writes_is_per_session(self):
+        set_session_key("writer")
+        self.router.mark_write()
+        self.assertIs(self.router.choose_pool(), self.primary)
+        # Новый запрос другой сессии, без cookie с временем записи
+        set_session_key("reader")
+        set_client_last_write(None)
+        self.assertIn(self.router.choose_pool(), self.replicas)
+
+    def test_sticky_window_expires(self):
+        set_session_key("writer")
+        with patch("Database.replica_router.time.monotonic", return_value=100):
+            self.router.mark_write()
+        set_client_last_write(None)
+        with patch("Database.replica_router.time.monotonic", return_value=106):
+            self.assertIn(self.router.choose_pool(), self.replicas)
+
+    def test_client_last_write_pins_reads_in_other_process(self):
+        set_session_key("writer")
+        with patch("Database.replica_router.time.time", return_value=1000.0):
+            self.router.mark_write()
+        self.assertEqual(get_client_last_write(), 1000.0)
+
+        # Другой процесс о записи не знает, но получил её время от клиента
+        other = ReplicaRouter(self.primary, self.replicas, sticky_seconds=5)
+        with patch("Database.replica_router.time.time", return_value=1003.0):
+            self.assertIs(other.choose_pool(), self.primary)
+        with patch("Database.replica_router.time.time", return_value=1006.0):
+            self.assertIn(other.choose_pool(), self.replicas)
+        # Время из будущего окно не продлевает
+        with patch("Database.replica_router.time.time", return_value=990.0):
+            self.assertIn(other.choose_pool(), self.replicas)
+
+    @patch("Utils.db_session.cherrypy")
+    def test_db_session_tool_round_trips_last_write_cookie(self, mock_cherrypy):
+        from http.cookies import SimpleCookie
+        from Utils.db_session import LAST_WRITE_COOKIE, bind_db_session
+        mock_cherrypy.request.headers = {"Authorization": "Bearer t"}
+        mock_cherrypy.request.cookie = SimpleCookie({LAST_WRITE_COOKIE: "1000.5"})
+        mock_cherrypy.response.cookie = SimpleCookie()
+        bind_db_session(sticky_seconds=5)
+        self.assertEqual(get_client_last_write(), 1000.5)
+        send_last_write = mock_cherrypy.request.hooks.attach.call_args[0][1]
+
+        # Без новой записи cookie не переустанавливается
+        send_last_write()
+        self.assertNotIn(LAST_WRITE_COOKIE, mock_cherrypy.response.cookie)
+
+        self.router.mark_write()
+        send_last_write()
+        morsel = mock_cherrypy.response.cookie[LAST_WRITE_COOKIE]
+        self.assertAlmostEqual(float(morsel.value), get_client_last_write(), places=2)
+        self.assertEqual(morsel["max-age"], 5)
+
+    def test_failed_replica_taken_out_of_rotation(self):
+        self.replicas[0].get_connection.side_effect = mysql.connector.Error("down")
+        self.router.check_health()
+        self.assertEqual([self.router.choose_pool() for _ in range(3)], [self.replicas[1]] * 3)
+        self.replicas[0].get_connection.side_effect = None
+        self.router.check_health()
+        self.assertEqual(len(self.router.healthy_replicas()), 2)
+
+    def test_all_replicas_down_uses_primary(self):
+        for replica in self.replicas:
+            self.router.report_failure(replica)
+        self.assertIs(self.router.choose_pool(), self.primary)
+
+
+class TestTransactionManagerRouting(unittest.TestCase):
+    @patch("Database.transaction_manager.ConnectionPoolManager")
+    def setUp(self, MockPool):
+        set_session_key(None)
+        MockPool.side_effect = lambda db_config, pool_config: make_pool(pool_config.get("pool_name", "db_pool"))
+        self.manager = TransactionManager({"host": "primary"}, {}, [{"host": "r0"}, {"host": "r1"}])
+
+    def test_replica_pools_created(self):
+        names = [pool.pool_name for pool in self.manager.router.replica_pools]
+        self.assertEqual(names, ["db_pool_replica0", "db_pool_replica1"])
+
+    def test_read_falls_back_to_primary(self):
+        replica = self.manager.router.replica_pools[0]
+        replica.get_connection.side_effect = mysql.connector.Error("down")
+        with self.manager.read_context() as connection:
+            self.assertIs(connection, self.manager.read_pool.get_connection.return_value)
+        self.assertNotIn(replica, self.manager.router.healthy_replicas())
+
+    def test_query_error_on_replica_takes_it_out_of_rotation(self):
+        replica = self.manager.router.replica_pools[0]
+        with self.assertRaises(mysql.connector.errors.OperationalError):
+            with self.manager.read_context():
+                self.assertTrue(self.manager.last_read_from_replica())
+                raise mysql.connector.errors.OperationalError("Lost connection")
+        self.assertNotIn(replica, self.manager.router.healthy_replicas())
+        # Ошибка в самом запросе не означает, что реплика неисправна
+        with self.assertRaises(mysql.connector.errors.ProgrammingError):
+            with self.manager.read_context():
+                raise mysql.connector.errors.ProgrammingError("syntax")
+        self.assertEqual(self.manager.router.healthy_replicas(), [self.manager.router.replica_pools[1]])
+
+    def test_use_primary(self):
+        with self.manager.read_context(use_primary=True) as connection:
+            self.assertIs(connection, self.manager.read_pool.get_connection.return_value)
+        self.assertFalse(self.manager.last_read_from_replica())
+
+    def test_write_makes_session_sticky(self):
+        set_session_key("client")
+        with self.manager.transaction_context():
+            pass
+        with self.manager.read_context() as connection:
+            self.assertIs(connection, self.manager.read_pool.get_connection.return_value)
+
+if __name__ == "__main__":
+    unittest.main()
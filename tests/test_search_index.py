@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock
+from Services.search_index import TrigramSearchIndex, escape_like, extract_trigrams
+
+class TestTrigramSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramSearchIndex(batch_size=4)
+        self.cursor = MagicMock()
+
+    def test_extract_trigrams(self):
+        self.assertEqual(extract_trigrams("AbCd"), {"abc", "bcd"})
+        self.assertEqual(extract_trigrams("ab"), set())
+        self.assertEqual(extract_trigrams(None), set())
+
+    def test_candidate_condition(self):
+        condition, params = self.index.candidate_condition("note", "Rack")
+        self.assertIn("HAVING COUNT(DISTINCT trigram) = %s", condition)
+        self.assertEqual(params, ("note", "ack", "rac", 2))
+        self.assertIsNone(self.index.candidate_condition("note", "ra"))
+
+    def test_candidate_condition_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.index.candidate_condition("type_id", "123")
+
+    def test_add_batches_rows(self):
+        self.index.batch_size = 3
+        total = self.index.add(self.cursor, [(1, "ABCDE", None), (2, "xyz", "note")])
+        self.assertEqual(total, 6)
+        self.assertEqual(self.cursor.executemany.call_count, 2)
+        first_batch = self.cursor.executemany.call_args_list[0][0][1]
+        self.assertIn(("serial_number", "abc", 1), first_batch)
+
+    def test_reindex_skips_deleted(self):
+        self.cursor.fetchall.return_value = [(1, "ABC", None, 0), (2, "DEF", None, 1)]
+        self.index.reindex(self.cursor, "id IN (%s, %s)", (1, 2))
+        delete_call = self.cursor.execute.call_args_list[1]
+        self.assertEqual(delete_call[0][1], (1, 2))
+        inserted = self.cursor.executemany.call_args[0][1]
+        self.assertEqual(inserted, [("serial_number", "abc", 1)])
+
+    def test_escape_like(self):
+        self.assertEqual(escape_like("50%_a!"), "50!%!_a!!")
+
+    def test_rebuild_replaces_index_by_id_ranges(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchall.side_effect = [[(1, "ABC", None, 0), (5, "DEF", None, 1)], [(9, "GHI", None, 0)], []]
+        indexed = self.index.rebuild(connection, batch_size=2)
+        self.assertEqual(indexed, 2)
+        statements = [(c[0][0].split()[0], c[0][1]) for c in cursor.execute.call_args_list]
+        # Записи индекса диапазона удаляются в той же транзакции, что и добавляются
+        self.assertEqual(statements, [
+            ("SELECT", (0, 2)), ("DELETE", (0, 5)),
+            ("SELECT", (5, 2)), ("DELETE", (5, 9)),
+            ("SELECT", (9, 2)), ("DELETE", (9,)),
+        ])
+        self.assertEqual(connection.commit.call_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
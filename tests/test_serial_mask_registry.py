@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from Services.serial_mask_registry import SerialMaskRegistry, mask_to_regex
+from Services.equipment_service import EquipmentService
+
+class TestSerialMaskRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loader = MagicMock(return_value=[
+            {"id": 1, "serial_mask": "NAAZXX"},
+            {"id": 2, "serial_mask": "aaNN"},
+        ])
+        self.registry = SerialMaskRegistry(self.loader, ttl=300, min_reload_interval=300)
+
+    def test_mask_to_regex(self):
+        self.assertEqual(mask_to_regex("NAZ"), "[0-9][A-Z][-_@]")
+        self.assertEqual(mask_to_regex("X.a"), "[A-Z0-9]\\.[a-z]")
+
+    def test_get_compiles_once(self):
+        for _ in range(1000):
+            mask, pattern = self.registry.get(1)
+        self.assertEqual(mask, "NAAZXX")
+        self.assertTrue(pattern.fullmatch("1AB-C9"))
+        self.assertFalse(pattern.fullmatch("1AB-c9"))
+        self.loader.assert_called_once()
+
+    def test_unknown_type_is_throttled(self):
+        self.registry.get(1)
+        self.assertIsNone(self.registry.get(99))
+        self.assertIsNone(self.registry.get(99))
+        self.loader.assert_called_once()
+
+    def test_invalidate_reloads(self):
+        self.registry.get(1)
+        self.loader.return_value = [{"id": 3, "serial_mask": "NN"}]
+        self.registry.invalidate()
+        self.assertIsNone(self.registry.get(1))
+        self.assertEqual(self.registry.get(3)[0], "NN")
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_ttl_expiry_reloads(self):
+        with patch("Services.serial_mask_registry.time.monotonic", side_effect=[0, 0, 400, 400]):
+            self.registry.get(1)
+            self.registry.get(1)
+        self.assertEqual(self.loader.call_count, 2)
+
+
+class TestEquipmentServiceSerialMasks(unittest.TestCase):
+    @patch("Services.equipment_service.QueryExecutor")
+    def setUp(self, MockQueryExecutor):
+        self.mock_db = MagicMock()
+        self.service = EquipmentService(config={})
+        self.service.db = self.mock_db
+        self.mock_db.execute.return_value = [{"id": 1, "serial_mask": "NAAZXX"}]
+
+    def test_validate_serial_by_type_uses_single_query(self):
+        for _ in range(1000):
+            is_valid, _ = self.service._validate_serial_by_type(1, "1AB-C9")
+            self.assertTrue(is_valid)
+        self.assertEqual(self.mock_db.execute.call_count, 1)
+
+    def test_validate_serial_by_type_mismatch(self):
+        is_valid, msg = self.service._validate_serial_by_type(1, "BAD")
+        self.assertFalse(is_valid)
+        self.assertIn("does not match mask", msg)
+
+    def test_validate_and_get_type_id(self):
+        self.assertEqual(self.service._validate_and_get_type_id("1AB_C9"), (True, 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import cherrypy
+from Utils import authentication
+from Utils.token_store import TokenStore, hash_token, sign_token, file_token_loader, db_token_loader, HASH_PREFIX
+
+
+class TestTokenStore(unittest.TestCase):
+    def test_static_and_hashed_entries(self):
+        store = TokenStore(loader=lambda: ["plain-token", HASH_PREFIX + hash_token("hashed-token")])
+        store.reload()
+        self.assertTrue(store.is_valid("plain-token"))
+        self.assertTrue(store.is_valid("hashed-token"))
+        self.assertFalse(store.is_valid("other"))
+        self.assertFalse(store.is_valid(""))
+
+    def test_reload_replaces_tokens_and_keeps_static(self):
+        tokens = ["a"]
+        store = TokenStore(loader=lambda: list(tokens), static_tokens=["static"])
+        store.reload()
+        tokens[:] = ["b"]
+        store.reload()
+        self.assertFalse(store.is_valid("a"))
+        self.assertTrue(store.is_valid("b"))
+        self.assertTrue(store.is_valid("static"))
+
+    def test_failed_reload_keeps_previous_tokens(self):
+        loader = MagicMock(side_effect=[["a"], OSError("gone")])
+        store = TokenStore(loader=loader)
+        self.assertTrue(store.reload())
+        self.assertFalse(store.reload())
+        self.assertTrue(store.is_valid("a"))
+
+    def test_file_loader(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("# service tokens\ntoken-1\n\n" + HASH_PREFIX + hash_token("token-2") + "\n")
+        try:
+            store = TokenStore(loader=file_token_loader(file.name))
+            store.reload()
+            self.assertTrue(store.is_valid("token-1"))
+            self.assertTrue(store.is_valid("token-2"))
+            self.assertEqual(len(store), 2)
+        finally:
+            os.unlink(file.name)
+
+    def test_db_loader(self):
+        db = MagicMock()
+        db.execute.return_value = [{"token_hash": hash_token("db-token")}]
+        store = TokenStore(loader=db_token_loader(db))
+        store.reload()
+        self.assertTrue(store.is_valid("db-token"))
+        self.assertIn("revoked = 0", db.execute.call_args[0][0])
+
+    def test_signed_tokens(self):
+        store = TokenStore(signing_key=b"secret")
+        token = sign_token("billing", b"secret", ttl=60)
+        self.assertTrue(store.is_valid(token))
+        self.assertTrue(store.is_valid(token))
+        self.assertEqual(store.verification_stats()["hits"], 1)
+        self.assertFalse(store.is_valid(sign_token("billing", b"other", ttl=60)))
+        self.assertFalse(store.is_valid(token[:-2] + "xx"))
+        self.assertFalse(store.is_valid("v1.garbage"))
+
+    def test_signed_token_expiry(self):
+        store = TokenStore(signing_key=b"secret")
+        with patch("Utils.token_store.time.time", return_value=1000):
+            token = sign_token("billing", b"secret", ttl=60)
+            self.assertTrue(store.is_valid(token))
+        with patch("Utils.token_store.time.time", return_value=1061):
+            self.assertFalse(store.is_valid(token))
+
+    def test_signed_tokens_rejected_without_key(self):
+        store = TokenStore()
+        self.assertFalse(store.is_valid(sign_token("billing", b"secret")))
+
+
+class TestValidateBearerToken(unittest.TestCase):
+    def setUp(self):
+        self.original_store = authentication.token_store
+        authentication.set_token_store(TokenStore(static_tokens=["good"]))
+
+    def tearDown(self):
+        authentication.set_token_store(self.original_store)
+
+    @patch("cherrypy.request")
+    def test_valid_token(self, mock_request):
+        mock_request.headers = {"Authorization": "Bearer good"}
+        authentication.validate_bearer_token()
+
+    @patch("cherrypy.request")
+    def test_invalid_token(self, mock_request):
+        mock_request.headers = {"Authorization": "Bearer bad"}
+        with self.assertRaises(cherrypy.HTTPError) as context:
+            authentication.validate_bearer_token()
+        self.assertEqual(context.exception.status, 403)
+
+    @patch("cherrypy.request")
+    def test_missing_header(self, mock_request):
+        mock_request.headers = {}
+        with self.assertRaises(cherrypy.HTTPError) as context:
+            authentication.validate_bearer_token()
+        self.assertEqual(context.exception.status, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()